@@ -0,0 +1,189 @@
+"""
+Administrative routes for Fast-Aurelian's local storage.
+
+Every route requires the configured ``admin_token`` in the ``X-Admin-Token``
+header. Without a token the routes are refused, unless ``admin_open`` opts in to
+serving them unchecked.
+"""
+
+import asyncio
+import secrets
+from typing import TYPE_CHECKING, Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from ..config import get_settings
+from ..middleware.profiling import find_profile, profile_directory
+from ..services.snapshot_sources import SnapshotError
+from ..utils.responses import FastJSONResponse
+from .paperqa import get_paperqa_service
+
+if TYPE_CHECKING:
+    from ..services.paperqa import PaperQAService
+
+
+def require_admin_token(x_admin_token: str | None = Header(None)) -> None:
+    """Refuse admin requests without the configured admin token."""
+    settings = get_settings()
+    token = settings.admin_token
+    if token is None:
+        if settings.admin_open:
+            return
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin routes are disabled; set FAST_AURELIAN_ADMIN_TOKEN to enable them",
+        )
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid admin token"
+        )
+
+
+router = APIRouter(
+    prefix="/api/paperqa/admin",
+    tags=["Admin"],
+    default_response_class=FastJSONResponse,
+    dependencies=[Depends(require_admin_token)],
+)
+
+
+class DownloadEviction(BaseModel):
+    """Model for shrinking the download store."""
+
+    max_bytes: int | None = Field(
+        None, ge=0, description="Size to evict down to (the configured limit if omitted)"
+    )
+
+
+class SnapshotBuild(BaseModel):
+    """Model for packing a directory's index into a snapshot."""
+
+    directory: str | None = Field(None, description="Paper directory (default if omitted)")
+
+
+class SnapshotLoad(BaseModel):
+    """Model for loading a snapshot into a paper directory."""
+
+    source: str = Field(
+        ...,
+        description="URL or local path of the snapshot file, under a configured snapshot source",
+    )
+    directory: str | None = Field(None, description="Paper directory (default if omitted)")
+
+
+def require_download_store(service: "PaperQAService"):
+    if service.download_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="The download store is disabled"
+        )
+    return service.download_store
+
+
+@router.get("/downloads", response_model=dict[str, Any])
+async def download_store_usage(service: "PaperQAService" = Depends(get_paperqa_service)):
+    """
+    Report download store disk usage.
+
+    Includes how many stored papers are also linked into paper directories (and
+    so free no space when evicted), hit counts and evictions so far.
+    """
+    store = require_download_store(service)
+    return await asyncio.to_thread(store.usage)
+
+
+@router.post("/downloads/evict", response_model=dict[str, Any])
+async def evict_downloads(
+    eviction: DownloadEviction, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    Evict least recently used papers from the download store.
+
+    Papers already placed in a paper directory stay there; only the shared copy
+    is removed, so a later add of the same source downloads it again.
+    """
+    store = require_download_store(service)
+    evicted = await asyncio.to_thread(store.evict, eviction.max_bytes)
+    return {"evicted": evicted, "usage": await asyncio.to_thread(store.usage)}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """
+    Fetch a stored request profile by the ``X-Profile-ID`` its response carried.
+
+    Profiles from pyinstrument are HTML pages; cProfile profiles are plain text.
+    """
+    settings = get_settings()
+    if not settings.profiling_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Request profiling is disabled"
+        )
+    path = await asyncio.to_thread(
+        find_profile, profile_directory(settings.profiling_dir), profile_id
+    )
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"No profile {profile_id}"
+        )
+    media_type = "text/html" if path.suffix == ".html" else "text/plain"
+    return FileResponse(path, media_type=media_type)
+
+
+@router.post("/snapshots", response_model=dict[str, Any])
+async def build_snapshot(
+    request: SnapshotBuild, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    Pack a directory's published index into one checksummed snapshot file.
+
+    The snapshot holds the PaperQA index with the chunk texts, document metadata
+    and embedding matrix; evidence searches memory-map it instead of loading the
+    index. Building again for the same version returns the existing snapshot.
+    """
+    try:
+        return await service.build_snapshot(request.directory)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+@router.get("/snapshots/download")
+async def download_snapshot(
+    directory: str | None = None, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """Download the snapshot of a directory's published index version."""
+    path = await asyncio.to_thread(service.snapshot_path, directory)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No snapshot of the published index; build one first",
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@router.post("/snapshots/load", response_model=dict[str, Any])
+async def load_snapshot(
+    request: SnapshotLoad, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    Publish a snapshot (by URL or local path) as a directory's index.
+
+    The packed index holds pickled documents, so only sources under the configured
+    ``snapshot_sources`` are loaded; others are refused, as are snapshots embedded
+    with another embedding model.
+    """
+    try:
+        return await service.load_snapshot(request.source, request.directory)
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e)) from e
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except SnapshotError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
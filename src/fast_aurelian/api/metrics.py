@@ -0,0 +1,31 @@
+"""
+Prometheus metrics endpoint.
+"""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from ..utils.metrics import get_metrics
+from .paperqa import get_paperqa_service
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """
+    Export metrics in the Prometheus text format.
+
+    Request latency, in-flight and LLM series are recorded as requests run;
+    cache, coalescing and admission series are read from their owners here.
+    """
+    registry = get_metrics()
+    # Only report on the PaperQA service once something has created it
+    if get_paperqa_service.cache_info().currsize:
+        registry.update_service(get_paperqa_service().get_stats())
+    admission = getattr(request.app.state, "admission", None)
+    if admission is not None:
+        registry.update_admission(admission.stats())
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -28,6 +28,28 @@ class AddPaperRequest(BaseModel):
     authors: list[str] | None = Field(default=None, description="List of authors")
 
 
+class BulkPaperItem(BaseModel):
+    """Request model for one paper in a bulk add."""
+
+    path: str = Field(..., description="Path to the paper file or URL")
+    citation: str | None = Field(default=None, description="Optional citation for the paper")
+
+
+class EvidenceRequest(BaseModel):
+    """Request model for retrieval-only evidence search."""
+
+    query: str = Field(..., description="The question to find evidence for")
+    directory: str | None = Field(default=None, description="Paper directory to search")
+    limit: int = Field(default=10, ge=1, le=100, description="Maximum number of chunks")
+    offset: int = Field(default=0, ge=0, description="Chunks to skip, for paging")
+    cursor: str | None = Field(
+        default=None, description="next_cursor of the previous page (replaces offset)"
+    )
+    keyword: bool = Field(
+        default=False, description="Fuse a keyword search of the documents into the ranking"
+    )
+
+
 class IndexRequest(BaseModel):
     """Request model for indexing papers."""
 
@@ -48,6 +70,16 @@ class PaperSource(BaseModel):
     excerpt: str | None = None
 
 
+class EvidenceSource(PaperSource):
+    """Model for one retrieved chunk and the paper it comes from."""
+
+    citation: str
+    chunk: str
+    document: str
+    score: float
+    keyword_rank: int | None = None
+
+
 class QueryResponse(BaseModel):
     """Response model for paper queries."""
 
@@ -63,6 +95,18 @@ class SearchResponse(BaseModel):
     metadata: dict[str, Any]
 
 
+class EvidenceResponse(BaseModel):
+    """Response model for evidence search."""
+
+    results: list[EvidenceSource]
+    total: int
+    offset: int
+    limit: int
+    next_offset: int | None = None
+    next_cursor: str | None = None
+    metadata: dict[str, Any]
+
+
 class AddPaperResponse(BaseModel):
     """Response model for adding papers."""
 
@@ -80,6 +124,27 @@ class IndexResponse(BaseModel):
     message: str
 
 
+class ListedPaper(BaseModel):
+    """Model for one document in a paper directory."""
+
+    file: str
+    type: str | None = None
+    # "indexed", "failed" or "not_indexed"
+    index_status: str
+
+
+class PaperPageResponse(BaseModel):
+    """Response model for one page of the papers in a collection."""
+
+    directory: str
+    papers: list[ListedPaper]
+    total: int
+    indexed_count: int
+    document_counts: dict[str, int]
+    index_exists: bool
+    next_cursor: str | None = None
+
+
 class ListPapersResponse(BaseModel):
     """Response model for listing papers."""
 
@@ -2,20 +2,69 @@
 FastAPI routes for PaperQA operations.
 """
 
-from typing import Any
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from loguru import logger
 from pydantic import BaseModel, Field
 
-from ..services.paperqa import PaperQAService
+from ..config import get_settings
+from ..services.jobs import Job, JobManager, JobStore
+from ..utils.responses import (
+    CursorError,
+    FastJSONResponse,
+    StaleCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from ..utils.streaming import NDJSON_MEDIA_TYPE, format_ndjson, format_sse
+from .models import BulkPaperItem, EvidenceRequest, EvidenceResponse, PaperPageResponse
 
-router = APIRouter(prefix="/api/paperqa", tags=["PaperQA"])
+if TYPE_CHECKING:
+    # Imported on first use: it pulls in Aurelian, PaperQA and LiteLLM
+    from ..services.paperqa import PaperQAService
+
+router = APIRouter(
+    prefix="/api/paperqa", tags=["PaperQA"], default_response_class=FastJSONResponse
+)
 
 
 class PaperQuery(BaseModel):
     """Model for querying papers."""
 
     query: str = Field(..., description="The question to answer based on papers")
+    directory: str | None = Field(None, description="Paper directory to query (default if omitted)")
+
+
+class BatchQuery(BaseModel):
+    """Model for answering many questions against one collection."""
+
+    queries: list[str] = Field(..., min_length=1, description="Questions to answer")
+    directory: str | None = Field(None, description="Paper directory to query (default if omitted)")
+    max_sources: int | None = Field(None, description="Maximum sources cited per answer")
+    temperature: float | None = Field(None, description="LLM temperature for answers")
+    evidence_k: int | None = Field(None, description="Evidence pieces retrieved per question")
+    concurrency: int | None = Field(
+        None, ge=1, description="Questions answered at once (capped by the server limit)"
+    )
+
+
+class FederatedQuery(BaseModel):
+    """Model for answering a question from several paper collections."""
+
+    query: str = Field(..., description="The question to answer based on papers")
+    directories: list[str] = Field(
+        ..., min_length=1, description="Paper directories (shards) to retrieve evidence from"
+    )
+    shard_timeout: float | None = Field(
+        None, gt=0, description="Seconds each directory may take before it is skipped"
+    )
+    max_sources: int | None = Field(None, description="Maximum sources cited in the answer")
+    temperature: float | None = Field(None, description="LLM temperature for the answer")
+    evidence_k: int | None = Field(None, description="Evidence pieces kept across all directories")
 
 
 class PaperSearch(BaseModel):
@@ -23,6 +72,9 @@ class PaperSearch(BaseModel):
 
     query: str = Field(..., description="The search query for finding papers")
     max_papers: int | None = Field(None, description="Maximum number of papers to return")
+    directory: str | None = Field(
+        None, description="Paper directory to search (default if omitted)"
+    )
 
 
 class PaperAdd(BaseModel):
@@ -30,12 +82,35 @@ class PaperAdd(BaseModel):
 
     path: str = Field(..., description="Path to the paper file or URL")
     citation: str | None = Field(None, description="Optional citation for the paper")
+    directory: str | None = Field(
+        None, description="Paper directory to add to (default if omitted)"
+    )
+    auto_index: bool = Field(True, description="Rebuild the index after adding the paper")
+    wait: bool = Field(
+        False, description="Wait for indexing to finish instead of returning a job id"
+    )
+
+
+class BulkPaperAdd(BaseModel):
+    """Model for adding many papers with a single index build."""
+
+    papers: list[BulkPaperItem] = Field(..., min_length=1, description="Papers to add")
+    directory: str | None = Field(
+        None, description="Paper directory to add to (default if omitted)"
+    )
+    auto_index: bool = Field(True, description="Index the directory once the papers are added")
+    wait: bool = Field(
+        False, description="Wait for the downloads and index build instead of returning a job id"
+    )
 
 
 class DirectoryIndex(BaseModel):
     """Model for indexing a directory of papers."""
 
     directory: str | None = Field(None, description="Directory containing papers to index")
+    wait: bool = Field(
+        False, description="Wait for the build to finish instead of returning a job id"
+    )
 
 
 class AgentQuery(BaseModel):
@@ -44,26 +119,102 @@ class AgentQuery(BaseModel):
     query: str = Field(..., description="Complex research question for the agent to handle")
     context: str | None = Field(None, description="Additional context for the research")
     max_papers: int | None = Field(10, description="Maximum papers to consider")
+    directory: str | None = Field(
+        None, description="Paper directory to work in (default if omitted)"
+    )
 
 
 from functools import lru_cache
 
-@lru_cache()
+
+@lru_cache
 def get_paperqa_service():
     """
     Dependency that provides a PaperQA service instance.
-    
+
     Uses lru_cache to ensure the same service instance is reused,
     maintaining the index state across requests.
 
     Returns:
         Configured PaperQA service
     """
+    from ..services.paperqa import PaperQAService
+
     return PaperQAService()
 
 
+@lru_cache
+def get_job_manager():
+    """
+    Dependency that provides the background job manager.
+
+    Index and add jobs run against the shared PaperQA service, and job state
+    is persisted next to the default papers directory unless configured.
+
+    Returns:
+        Configured job manager
+    """
+    settings = get_settings()
+    service = get_paperqa_service()
+    store_path = settings.job_store_path or str(Path(service.papers_dir) / ".pqa" / "jobs.sqlite")
+    manager = JobManager(
+        workers=settings.job_workers,
+        store=JobStore(store_path, retention=settings.job_retention),
+        retention=settings.job_retention,
+        lease=settings.job_lease,
+    )
+    manager.register(
+        "index",
+        lambda job: service.index_papers(job.params.get("directory"), progress=job.update_progress),
+    )
+    manager.register(
+        "add",
+        lambda job: service.add_paper(
+            job.params["path"],
+            paper_directory=job.params.get("directory"),
+            citation=job.params.get("citation"),
+            progress=job.update_progress,
+        ),
+    )
+    manager.register(
+        "add_bulk",
+        lambda job: service.add_papers_bulk(
+            job.params["papers"],
+            paper_directory=job.params.get("directory"),
+            auto_index=job.params.get("auto_index", True),
+            progress=job.update_progress,
+        ),
+    )
+    return manager
+
+
+async def start_job_manager():
+    await get_job_manager().start()
+
+
+async def stop_job_manager():
+    if get_job_manager.cache_info().currsize:
+        await get_job_manager().stop()
+    if get_paperqa_service.cache_info().currsize:
+        from ..services.parsing import shutdown_parse_executor
+
+        await get_paperqa_service().aclose()
+        shutdown_parse_executor()
+
+
+def job_accepted(job: Job, response: Response) -> dict[str, Any]:
+    """Build the response for a freshly submitted job."""
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": str(job.status),
+        "status_url": f"{router.prefix}/jobs/{job.id}",
+    }
+
+
 @router.post("/query", response_model=dict[str, Any])
-async def query_papers(query: PaperQuery, service: PaperQAService = Depends(get_paperqa_service)):
+async def query_papers(query: PaperQuery, service: "PaperQAService" = Depends(get_paperqa_service)):
     """
     Query papers to answer a specific question.
 
@@ -71,15 +222,178 @@ async def query_papers(query: PaperQuery, service: PaperQAService = Depends(get_
     an evidence-based answer to your question.
     """
     try:
-        result = await service.query_papers(query.query)
+        result = await service.query_papers(query.query, query.directory)
         return result
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+def event_stream_response(events: AsyncIterator[tuple[str, Any]]) -> StreamingResponse:
+    """
+    Send (event, data) pairs to the client as Server-Sent Events.
+
+    Failures are reported as an ``error`` event since the response status has
+    already been sent; every stream ends with a ``done`` event.
+    """
+
+    async def body():
+        try:
+            async for event, data in events:
+                yield format_sse(event, data)
+        except Exception as e:
+            logger.exception("Event stream failed")
+            yield format_sse("error", {"detail": str(e)})
+        yield format_sse("done")
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/query/stream")
+async def stream_query(query: PaperQuery, service: "PaperQAService" = Depends(get_paperqa_service)):
+    """
+    Query papers, streaming progress and the answer as Server-Sent Events.
+
+    Emits tool calls, gathered evidence with source scores and answer tokens as
+    they are produced, then the full result. Disconnecting cancels the query.
+    """
+    return event_stream_response(service.stream_query(query.query, query.directory))
+
+
+@router.post("/agent/stream")
+async def stream_agent(
+    agent_query: AgentQuery, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    Run the PaperQA agent, streaming its output and tool calls as Server-Sent Events.
+
+    Disconnecting cancels the agent run.
+    """
+    prompt = agent_query.query
+    if agent_query.context:
+        prompt = f"{prompt}\n\nContext: {agent_query.context}"
+    return event_stream_response(
+        service.stream_agent(prompt, agent_query.directory, search_count=agent_query.max_papers)
+    )
+
+
+@router.post("/query/federated", response_model=dict[str, Any])
+async def query_federated(
+    federated: FederatedQuery, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    Answer a question from several paper directories at once.
+
+    Evidence is retrieved from every directory concurrently, merged by relevance
+    and answered in one response. Directories that are missing or slower than the
+    shard timeout are skipped; the response reports each directory's status and
+    timing.
+    """
+    max_shards = get_settings().federated_max_shards
+    if len(federated.directories) > max_shards:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {max_shards} directories are allowed per federated query",
+        )
+    try:
+        return await service.query_federated(
+            federated.query,
+            federated.directories,
+            shard_timeout=federated.shard_timeout,
+            max_sources=federated.max_sources,
+            temperature=federated.temperature,
+            evidence_k=federated.evidence_k,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+@router.post("/query/batch")
+async def query_batch(batch: BatchQuery, service: "PaperQAService" = Depends(get_paperqa_service)):
+    """
+    Answer a batch of questions against one collection.
+
+    Results stream back as newline-delimited JSON in completion order, one line
+    per question with its position in the request, its result or error and how
+    long it took. Questions share one directory context and a single batched
+    embedding call.
+    """
+    max_size = get_settings().batch_query_max_size
+    if len(batch.queries) > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {max_size} queries are allowed per batch",
+        )
+
+    results = service.query_batch(
+        batch.queries,
+        batch.directory,
+        concurrency=batch.concurrency,
+        max_sources=batch.max_sources,
+        temperature=batch.temperature,
+        evidence_k=batch.evidence_k,
+    )
+
+    async def body():
+        try:
+            async for item in results:
+                yield format_ndjson(item)
+        except Exception as e:
+            logger.exception("Batch query failed")
+            yield format_ndjson({"success": False, "error": str(e)})
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post("/evidence", response_model=EvidenceResponse)
+async def search_evidence(
+    evidence: EvidenceRequest, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    Find the passages most relevant to a question, without generating an answer.
+
+    This endpoint ranks the indexed chunks by embedding similarity (optionally
+    fused with a keyword search) and returns them with their papers' metadata
+    and scores. No LLM is called, so it answers in milliseconds rather than
+    the seconds a full query takes. Pass ``next_cursor`` back as ``cursor`` (or
+    ``next_offset`` as ``offset``) to fetch the next page; a cursor is refused
+    once the index has changed, since the ranking it pages through has too.
+    """
+    offset, version = evidence.offset, None
+    if evidence.cursor is not None:
+        try:
+            position = decode_cursor(evidence.cursor, offset=int, index_version=str)
+        except CursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+        offset, version = position["offset"], position["index_version"]
+    try:
+        result = await service.search_evidence(
+            evidence.query,
+            evidence.directory,
+            limit=evidence.limit,
+            offset=offset,
+            keyword=evidence.keyword,
+            index_version=version,
+        )
+    except StaleCursorError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+    index_version = result["metadata"]["index_version"]
+    if result["next_offset"] is not None:
+        result["next_cursor"] = encode_cursor(
+            {"offset": result["next_offset"], "index_version": index_version}
+        )
+    return result
 
 
 @router.post("/search", response_model=dict[str, Any])
 async def search_papers(
-    search: PaperSearch, service: PaperQAService = Depends(get_paperqa_service)
+    search: PaperSearch, service: "PaperQAService" = Depends(get_paperqa_service)
 ):
     """
     Search for papers relevant to a query.
@@ -88,56 +402,249 @@ async def search_papers(
     and returns the most relevant results.
     """
     try:
-        result = await service.search_papers(search.query, max_papers=search.max_papers)
+        result = await service.search_papers(
+            search.query, search.directory, max_papers=search.max_papers
+        )
         return result
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
 @router.post("/add", response_model=dict[str, Any])
-async def add_paper(paper: PaperAdd, service: PaperQAService = Depends(get_paperqa_service)):
+async def add_paper(
+    paper: PaperAdd,
+    response: Response,
+    service: "PaperQAService" = Depends(get_paperqa_service),
+    jobs: JobManager = Depends(get_job_manager),
+):
     """
     Add a paper to the collection.
 
     This endpoint adds a paper from a file path or URL to your collection
-    for searching and querying.
+    for searching and querying. When the index is rebuilt afterwards, the
+    work runs as a background job and its id is returned immediately.
     """
     try:
-        result = await service.add_paper(paper.path, paper.citation)
+        if paper.auto_index and not paper.wait:
+            job = await jobs.submit(
+                "add", path=paper.path, directory=paper.directory, citation=paper.citation
+            )
+            return job_accepted(job, response)
+        result = await service.add_paper(
+            paper.path, paper.directory, citation=paper.citation, auto_index=paper.auto_index
+        )
         return result
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+@router.post("/add/bulk", response_model=dict[str, Any])
+async def add_papers_bulk(
+    bulk: BulkPaperAdd,
+    response: Response,
+    service: "PaperQAService" = Depends(get_paperqa_service),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    """
+    Add many papers to the collection at once.
+
+    Papers are downloaded concurrently, repeated URLs and content already in the
+    collection are skipped, and the index is rebuilt once at the end. Each paper
+    gets its own status in the report. Unless ``wait`` is set, the work runs as a
+    background job and its id is returned immediately.
+    """
+    max_size = get_settings().bulk_add_max_size
+    if len(bulk.papers) > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A bulk add takes at most {max_size} papers",
+        )
+    papers = [paper.model_dump() for paper in bulk.papers]
+    try:
+        if not bulk.wait:
+            job = await jobs.submit(
+                "add_bulk", papers=papers, directory=bulk.directory, auto_index=bulk.auto_index
+            )
+            return job_accepted(job, response)
+        return await service.add_papers_bulk(papers, bulk.directory, auto_index=bulk.auto_index)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
 @router.post("/index", response_model=dict[str, Any])
 async def index_papers(
-    index_request: DirectoryIndex, service: PaperQAService = Depends(get_paperqa_service)
+    index_request: DirectoryIndex,
+    response: Response,
+    service: "PaperQAService" = Depends(get_paperqa_service),
+    jobs: JobManager = Depends(get_job_manager),
 ):
     """
     Index papers in a directory.
 
     This endpoint builds a search index for all papers in the specified directory.
-    The index is required for searching and querying papers.
+    The index is required for searching and querying papers. The build runs as a
+    background job; poll the returned job id for progress and the result.
     """
     try:
+        if not index_request.wait:
+            job = await jobs.submit("index", directory=index_request.directory)
+            return job_accepted(job, response)
         result = await service.index_papers(index_request.directory)
         return result
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
-@router.get("/list", response_model=dict[str, Any])
+@router.get("/list", response_model=dict[str, Any], deprecated=True)
 async def list_papers(
-    directory: str | None = None, service: PaperQAService = Depends(get_paperqa_service)
+    response: Response,
+    directory: str | None = None,
+    service: "PaperQAService" = Depends(get_paperqa_service),
 ):
     """
     List all papers in the collection.
 
-    This endpoint returns a list of all papers in your collection along
-    with their metadata.
+    Deprecated: this returns the whole collection several times over in one
+    response. Use ``/papers`` to read it a page at a time, or ``/papers/stream``.
     """
+    response.headers["Deprecation"] = "true"
+    response.headers["Link"] = f'<{router.prefix}/papers>; rel="successor-version"'
     try:
-        result = await service.list_papers(directory)
-        return result
+        return await service.list_papers(directory)
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+@router.get("/papers", response_model=PaperPageResponse)
+async def list_paper_page(
+    directory: str | None = None,
+    limit: int | None = Query(None, ge=1, le=10_000, description="Papers per page"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    service: "PaperQAService" = Depends(get_paperqa_service),
+):
+    """
+    List the papers in the collection, one page at a time.
+
+    This endpoint returns a page of papers ordered by file name, with whether
+    each is indexed and the collection's totals. Pass ``next_cursor`` back as
+    ``cursor`` for the next page; use ``/papers/stream`` to read every paper at once.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, after=str)["after"]
+        except CursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    try:
+        result = await service.list_paper_page(
+            directory, after=after, limit=limit or get_settings().list_page_size
+        )
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+    next_after = result.pop("next_after")
+    if next_after is not None:
+        result["next_cursor"] = encode_cursor({"after": next_after})
+    return result
+
+
+@router.get("/papers/stream")
+async def stream_papers(
+    directory: str | None = None, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    List every paper in the collection as newline-delimited JSON.
+
+    Each line is one paper as in ``/papers`` pages, ordered by file name, so
+    clients can process a large collection without holding the whole listing.
+    """
+
+    async def body():
+        try:
+            async for paper in service.iter_papers(directory):
+                yield format_ndjson(paper)
+        except Exception as e:
+            logger.exception("Paper listing failed")
+            yield format_ndjson({"success": False, "error": str(e)})
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/status", response_model=dict[str, Any])
+async def get_status(
+    directory: str | None = None, service: "PaperQAService" = Depends(get_paperqa_service)
+):
+    """
+    Get the status of a paper collection.
+
+    This endpoint reports how many papers the directory holds, how many are
+    indexed, and how current the directory's cached listing is.
+    """
+    try:
+        return await service.get_status(directory)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+
+
+@router.get("/stats", response_model=dict[str, Any])
+async def get_stats(request: Request, service: "PaperQAService" = Depends(get_paperqa_service)):
+    """
+    Get service statistics.
+
+    This endpoint reports answer cache hit and miss counts, how many concurrent
+    queries and index builds were coalesced, and admission control counters.
+    """
+    stats = service.get_stats()
+    admission = getattr(request.app.state, "admission", None)
+    stats["admission"] = admission.stats() if admission is not None else None
+    return stats
+
+
+@router.get("/jobs", response_model=dict[str, Any])
+async def list_jobs(
+    job_status: str | None = Query(None, alias="status", description="Only jobs in this state"),
+    limit: int = Query(100, ge=1, le=1000),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    """
+    List background jobs.
+
+    This endpoint returns the most recent jobs with their status and progress.
+    """
+    return {
+        "jobs": [
+            {key: value for key, value in job.to_dict().items() if key != "result"}
+            for job in await jobs.list_jobs(job_status, limit)
+        ]
+    }
+
+
+@router.get("/jobs/{job_id}", response_model=dict[str, Any])
+async def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Get a background job.
+
+    This endpoint reports a job's status, progress (files done/total),
+    duration and, once finished, its result.
+    """
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=dict[str, Any])
+async def cancel_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Cancel a queued background job.
+
+    Jobs that have already started running cannot be cancelled.
+    """
+    try:
+        job = await jobs.cancel(job_id)
+    except KeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found"
+        ) from e
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    return job.to_dict()
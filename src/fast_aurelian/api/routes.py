@@ -4,7 +4,8 @@ Routes registration for Fast-Aurelian.
 
 from fastapi import FastAPI
 
-from . import paperqa
+from ..config import get_settings
+from . import admin, metrics, paperqa
 
 
 def register_routes(app: FastAPI) -> None:
@@ -15,3 +16,6 @@ def register_routes(app: FastAPI) -> None:
         app: FastAPI application instance
     """
     app.include_router(paperqa.router)
+    app.include_router(admin.router)
+    if get_settings().metrics_enabled:
+        app.include_router(metrics.router)
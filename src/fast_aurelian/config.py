@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Any
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,6 +24,27 @@ class Settings(BaseSettings):
         description="Log format string",
     )
 
+    log_json: bool = Field(default=False, description="Write logs as JSON lines")
+    log_async: bool = Field(
+        default=True, description="Write logs from a background thread instead of the caller"
+    )
+    log_queue_size: int = Field(
+        default=10_000, ge=1, description="Log records queued for the writer thread before dropping"
+    )
+    log_batch_size: int = Field(
+        default=256, ge=1, description="Most queued log records written at once"
+    )
+    log_sample_ratio: float = Field(
+        default=1.0,
+        ge=0,
+        le=1,
+        description="Fraction of successful requests whose info and debug logs are kept",
+    )
+    log_route_levels: dict[str, str] = Field(
+        default_factory=lambda: {"/health": "WARNING", "/ready": "WARNING", "/metrics": "WARNING"},
+        description="Logging level by request path prefix",
+    )
+
     cors_origins: list[str] = Field(
         default_factory=lambda: ["*"], description="CORS allowed origins"
     )
@@ -33,6 +55,15 @@ class Settings(BaseSettings):
         default_factory=lambda: ["*"], description="CORS allowed headers"
     )
 
+    compression_enabled: bool = Field(
+        default=True, description="Compress large responses for clients accepting brotli or gzip"
+    )
+    compression_min_size: int = Field(
+        default=1024, ge=0, description="Bytes a response body must reach to be compressed"
+    )
+    compression_gzip_level: int = Field(default=6, ge=1, le=9, description="gzip level")
+    compression_brotli_quality: int = Field(default=4, ge=0, le=11, description="Brotli quality")
+
     aurelian_workdir: str | None = Field(default=None, description="Aurelian working directory")
     openai_api_key: str | None = Field(default=None, description="OpenAI API key")
 
@@ -40,10 +71,270 @@ class Settings(BaseSettings):
     app_version: str = Field(default="0.1.0", description="Application version")
     docs_url: str = Field(default="/docs", description="Swagger UI docs URL")
     redoc_url: str = Field(default="/redoc", description="ReDoc docs URL")
+    metrics_enabled: bool = Field(default=True, description="Record and serve /metrics")
+    tracing_exporter: str = Field(
+        default="none",
+        pattern="^(none|file|otlp)$",
+        description="Where request traces go: nowhere, a JSON Lines file, or an OTLP/HTTP collector",
+    )
+    tracing_file: str = Field(
+        default="traces.jsonl", description="File the file exporter appends OTLP/JSON batches to"
+    )
+    tracing_otlp_endpoint: str = Field(
+        default="http://localhost:4318/v1/traces",
+        description="OTLP/HTTP traces endpoint (spans are sent JSON encoded)",
+    )
+    tracing_sample_ratio: float = Field(
+        default=1.0, ge=0, le=1, description="Fraction of requests traced"
+    )
+    tracing_export_interval: float = Field(
+        default=5.0, gt=0, description="Seconds between span exports"
+    )
+    tracing_max_queue: int = Field(
+        default=10_000, ge=1, description="Finished spans buffered between exports"
+    )
+    profiling_enabled: bool = Field(
+        default=False,
+        description="Profile requests sent with an X-Profile header or profile query parameter",
+    )
+    profiling_token: str | None = Field(
+        default=None, description="Value the X-Profile header or profile parameter must carry"
+    )
+    profiling_dir: str | None = Field(
+        default=None,
+        description="Where request profiles are stored (defaults to fast-aurelian-profiles "
+        "in the temp directory)",
+    )
+    profiling_interval: float = Field(
+        default=0.001, gt=0, description="Sampling interval of request profiles in seconds"
+    )
+    profiling_max_files: int = Field(default=50, ge=1, description="Request profiles kept")
+    admin_token: str | None = Field(
+        default=None,
+        description="Value the X-Admin-Token header of admin requests must carry "
+        "(admin routes are refused when unset, unless admin_open is set)",
+    )
+    admin_open: bool = Field(
+        default=False,
+        description="Serve admin routes without a token when admin_token is unset "
+        "(only for services no untrusted client can reach)",
+    )
+    snapshot_sources: list[str] = Field(
+        default_factory=list,
+        description="URL prefixes and local directories snapshots may be loaded from "
+        "(loading is refused when empty)",
+    )
+    warmup_index: bool = Field(
+        default=True,
+        description="Open the default directory's context and index in the background at startup",
+    )
+
+    llm_provider: str = Field(
+        default="live",
+        pattern="^(live|standin|record|replay)$",
+        description="Where LLM and embedding calls go: live APIs, a local deterministic "
+        "stand-in, live APIs with every exchange recorded, or replay of recorded exchanges",
+    )
+    llm_recording_dir: str | None = Field(
+        default=None,
+        description="Recorded exchanges for record/replay "
+        "(defaults to .pqa/llm_recordings in the papers directory)",
+    )
+    llm_standin_latency: float = Field(
+        default=0.05, ge=0, description="Seconds the stand-in waits before each response"
+    )
+    llm_standin_tokens_per_second: float = Field(
+        default=200.0, ge=0, description="Stand-in completion throughput (0 for instant)"
+    )
+    llm_standin_embedding_dim: int = Field(
+        default=1536, ge=1, description="Dimensions of stand-in embeddings"
+    )
+    llm_standin_completion_words: int = Field(
+        default=48, ge=1, description="Length of stand-in completions in words"
+    )
 
     max_concurrent_requests: int = Field(default=10, description="Maximum concurrent requests")
     request_timeout: int = Field(default=300, description="Request timeout in seconds")
 
+    admission_queue_size: int = Field(
+        default=32, ge=0, description="Requests allowed to wait for a slot, per limit"
+    )
+    admission_queue_timeout: float = Field(
+        default=10.0, gt=0, description="Seconds a request may wait for a slot before a 503"
+    )
+    admission_exempt_paths: list[str] = Field(
+        default_factory=lambda: ["/health", "/ready", "/metrics"],
+        description="Paths that bypass admission control",
+    )
+    # Keep the route limits below max_concurrent_requests so cheap routes keep a share
+    query_concurrency_limit: int = Field(
+        default=4, ge=1, description="Concurrent /query and /agent requests"
+    )
+    batch_concurrency_limit: int = Field(
+        default=1, ge=1, description="Concurrent /query/batch requests"
+    )
+    index_concurrency_limit: int = Field(
+        default=2, ge=1, description="Concurrent /index and /add requests"
+    )
+    search_concurrency_limit: int = Field(
+        default=2, ge=1, description="Concurrent /search requests"
+    )
+    batch_request_timeout: int = Field(
+        default=3600, description="Deadline in seconds for /query/batch requests"
+    )
+    index_request_timeout: int = Field(
+        default=1800, description="Deadline in seconds for /index and /add requests"
+    )
+
+    paperqa_context_pool_size: int = Field(
+        default=16, ge=1, description="Maximum number of per-directory PaperQA contexts kept warm"
+    )
+    catalog_watch_enabled: bool = Field(
+        default=True,
+        description="Keep paper directory listings current from file-system notifications",
+    )
+    catalog_reconcile_interval: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds between full rescans of each cataloged paper directory",
+    )
+
+    answer_cache_enabled: bool = Field(
+        default=True, description="Cache answers to repeated queries"
+    )
+    answer_cache_size: int = Field(
+        default=256, ge=1, description="Maximum in-memory cached answers"
+    )
+    answer_cache_ttl: int = Field(
+        default=3600, ge=0, description="Answer cache entry lifetime in seconds"
+    )
+    answer_cache_path: str | None = Field(
+        default=None, description="Optional sqlite file for an answer cache that survives restarts"
+    )
+
+    adaptive_query_enabled: bool = Field(
+        default=False,
+        description="Answer with cheaper settings while query latency exceeds its target",
+    )
+    adaptive_latency_target: float = Field(
+        default=30.0, gt=0, description="Seconds a query should take, including queueing"
+    )
+    adaptive_route_latency_targets: dict[str, float] = Field(
+        default_factory=dict,
+        description="Latency targets by query route (query, stream, federated, batch)",
+    )
+    adaptive_query_tiers: list[dict[str, Any]] = Field(
+        default_factory=lambda: [
+            {"name": "reduced", "evidence_k": 5, "answer_max_sources": 3},
+            {
+                "name": "minimal",
+                "evidence_k": 3,
+                "answer_max_sources": 2,
+                "summary_llm": "gpt-4.1-mini",
+            },
+        ],
+        description="Degraded tiers from least to most degraded: name and caps on evidence_k "
+        "and answer_max_sources, or replacement summary_llm and llm models",
+    )
+    adaptive_route_tiers: dict[str, list[dict[str, Any]]] = Field(
+        default_factory=dict, description="Degraded tiers by query route, replacing the default"
+    )
+    adaptive_window: int = Field(
+        default=50, ge=1, description="Recent answers the latency percentile is taken over"
+    )
+    adaptive_cooldown: float = Field(
+        default=15.0, ge=0, description="Minimum seconds between tier changes"
+    )
+    adaptive_recover_ratio: float = Field(
+        default=0.5,
+        gt=0,
+        lt=1,
+        description="Fraction of the target predicted latency must fall below to step back up",
+    )
+
+    evidence_query_cache_size: int = Field(
+        default=1024, ge=1, description="Question embeddings kept for repeated evidence searches"
+    )
+    evidence_keyword_documents: int = Field(
+        default=50, ge=1, description="Keyword search hits fused into hybrid evidence rankings"
+    )
+
+    federated_shard_timeout: float = Field(
+        default=5.0, gt=0, description="Seconds each directory of a federated query may take"
+    )
+    # Shards beyond the context pool size are reloaded on every federated query
+    federated_max_shards: int = Field(
+        default=16, ge=1, description="Maximum number of directories in one federated query"
+    )
+
+    job_workers: int = Field(default=2, ge=1, description="Number of background job workers")
+    job_store_path: str | None = Field(
+        default=None,
+        description="sqlite file persisting background jobs (defaults to the papers .pqa folder)",
+    )
+    job_retention: int = Field(default=500, ge=1, description="Finished jobs kept for inspection")
+    job_lease: float = Field(
+        default=60.0,
+        gt=0,
+        description="Seconds without a heartbeat after which a running job's worker is "
+        "considered dead and the job is queued again",
+    )
+
+    batch_query_concurrency: int = Field(
+        default=4, ge=1, description="Maximum questions of a batch query answered at once"
+    )
+    batch_query_max_size: int = Field(
+        default=500, ge=1, description="Maximum number of questions in one batch query"
+    )
+
+    list_page_size: int = Field(
+        default=1000, ge=1, description="Papers per /papers page when the request sets no limit"
+    )
+
+    embedding_cache_enabled: bool = Field(
+        default=True, description="Reuse chunk embeddings across index builds and directories"
+    )
+    embedding_cache_dir: str | None = Field(
+        default=None,
+        description="Embedding cache directory (defaults to .pqa/embeddings in the papers directory)",
+    )
+    embedding_cache_max_entries: int = Field(
+        default=100_000, ge=1, description="Maximum cached embeddings per embedding model"
+    )
+
+    index_parse_workers: int | None = Field(
+        default=None,
+        ge=0,
+        description="Processes parsing and chunking documents during index builds "
+        "(defaults to the CPU count, 0 parses in-process)",
+    )
+    index_embedding_batch_size: int = Field(
+        default=100, ge=1, description="Number of chunks embedded per embedding call"
+    )
+
+    bulk_add_max_size: int = Field(
+        default=500, ge=1, description="Maximum number of papers in one bulk add"
+    )
+    bulk_add_concurrency: int = Field(
+        default=8, ge=1, description="Concurrent downloads (and pooled connections) for bulk adds"
+    )
+    bulk_add_max_file_size: int = Field(
+        default=100 * 1024 * 1024, ge=1, description="Largest paper a bulk add downloads, in bytes"
+    )
+    download_store_enabled: bool = Field(
+        default=True, description="Keep downloaded papers in a shared content-addressed store"
+    )
+    download_store_dir: str | None = Field(
+        default=None,
+        description="Download store directory (defaults to .pqa/downloads in the papers directory)",
+    )
+    download_store_max_bytes: int = Field(
+        default=5 * 1024**3, ge=0, description="Size the download store is evicted down to"
+    )
+    download_timeout: float = Field(
+        default=60.0, gt=0, description="Seconds to wait on a download connection or read"
+    )
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import os
 import sys
 
@@ -9,7 +11,19 @@ from loguru import logger
 # Use a try/except here since config.py might not exist yet in this implementation
 try:
     from .config import Settings, get_settings
+    from .middleware.admission import (
+        AdmissionController,
+        AdmissionControlMiddleware,
+        RouteClass,
+    )
+    from .middleware.compression import CompressionMiddleware
     from .middleware.logging import logging_middleware
+    from .middleware.metrics import MetricsMiddleware
+    from .middleware.profiling import ProfilingMiddleware, profile_directory
+    from .middleware.tracing import TracingMiddleware
+    from .utils.logs import configure_logging
+    from .utils.metrics import get_metrics
+    from .utils.tracing import get_tracer
 
     has_config = True
 except ImportError:
@@ -32,7 +46,10 @@ except ImportError:
         return Settings()
 
 
+from .api.paperqa import get_paperqa_service, start_job_manager, stop_job_manager
 from .api.routes import register_routes
+from .services.adaptive import get_query_governor
+from .services.warmup import Warmup
 
 
 def setup_paperqa_environment(settings):
@@ -56,6 +73,80 @@ def setup_paperqa_environment(settings):
         logger.info(f"Set AURELIAN_WORKDIR and PQA_HOME to: {workdir_path}")
 
 
+def build_admission_controller(settings) -> "AdmissionController":
+    """Build the admission controller separating expensive PaperQA work from cheap routes."""
+    api = "/api/paperqa"
+    route_classes = [
+        RouteClass(
+            "query",
+            (f"{api}/query", f"{api}/agent"),
+            settings.query_concurrency_limit,
+            settings.request_timeout,
+        ),
+        RouteClass(
+            "batch",
+            (f"{api}/query/batch",),
+            settings.batch_concurrency_limit,
+            settings.batch_request_timeout,
+        ),
+        RouteClass(
+            "index",
+            (f"{api}/index", f"{api}/add"),
+            settings.index_concurrency_limit,
+            settings.index_request_timeout,
+        ),
+        RouteClass(
+            "search",
+            (f"{api}/search",),
+            settings.search_concurrency_limit,
+            settings.request_timeout,
+        ),
+    ]
+    return AdmissionController(
+        global_limit=settings.max_concurrent_requests,
+        route_classes=route_classes,
+        default_timeout=settings.request_timeout,
+        max_queue=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout,
+        exempt_paths=tuple(settings.admission_exempt_paths),
+    )
+
+
+def build_warmup(settings) -> Warmup:
+    """
+    Build the start-up steps run in the background once the app is serving.
+
+    PaperQA and Aurelian are only imported here, so the app answers /health
+    within seconds of starting and reports /ready once they are loaded.
+    """
+    steps = [
+        # Imports and builds the service off the event loop
+        ("service", lambda: asyncio.to_thread(get_paperqa_service)),
+        # Resumes jobs left queued by a previous run
+        ("jobs", start_job_manager),
+    ]
+    if getattr(settings, "warmup_index", False):
+        steps.append(("index", lambda: get_paperqa_service().warm_up()))
+    return Warmup(steps)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run warm-up in the background while serving, and release resources on shutdown."""
+    tasks = [asyncio.create_task(app.state.warmup.run())]
+    tracer = app.state.tracer
+    if tracer is not None and tracer.enabled:
+        tasks.append(asyncio.create_task(tracer.run(get_settings().tracing_export_interval)))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await stop_job_manager()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     settings = get_settings()
@@ -63,10 +154,14 @@ def create_app() -> FastAPI:
     # Setup PaperQA environment at startup
     setup_paperqa_environment(settings)
     
-    logger.remove()
-    logger.add(
-        sys.stderr, format=settings.log_format, level=settings.log_level.upper(), colorize=True
-    )
+    if has_config:
+        log_sink = configure_logging(settings)
+    else:
+        log_sink = None
+        logger.remove()
+        logger.add(
+            sys.stderr, format=settings.log_format, level=settings.log_level.upper(), colorize=True
+        )
 
     app = FastAPI(
         title=settings.app_name,
@@ -74,7 +169,40 @@ def create_app() -> FastAPI:
         docs_url=settings.docs_url,
         redoc_url=settings.redoc_url,
         debug=settings.debug,
+        lifespan=lifespan,
     )
+    app.state.warmup = build_warmup(settings)
+    app.state.log_sink = log_sink
+    app.state.tracer = None
+
+    if has_config:
+        # Added first so it runs innermost: rejections still get CORS and logging
+        app.state.admission = build_admission_controller(settings)
+        app.add_middleware(AdmissionControlMiddleware, controller=app.state.admission)
+        if (governor := get_query_governor()) is not None:
+            governor.attach(app.state.admission)
+        if settings.metrics_enabled:
+            # Outside admission control, so queueing time and rejections are measured
+            app.add_middleware(MetricsMiddleware, metrics=get_metrics(), router=app.router)
+        app.state.tracer = get_tracer()
+        if app.state.tracer.enabled:
+            # Inside the logging middleware, which assigns the correlation id the trace is named by
+            app.add_middleware(TracingMiddleware, tracer=app.state.tracer)
+        if settings.profiling_enabled:
+            app.add_middleware(
+                ProfilingMiddleware,
+                directory=profile_directory(settings.profiling_dir),
+                token=settings.profiling_token,
+                interval=settings.profiling_interval,
+                max_files=settings.profiling_max_files,
+            )
+        if settings.compression_enabled:
+            app.add_middleware(
+                CompressionMiddleware,
+                min_size=settings.compression_min_size,
+                gzip_level=settings.compression_gzip_level,
+                brotli_quality=settings.compression_brotli_quality,
+            )
 
     app.add_middleware(
         CORSMiddleware,
@@ -111,6 +239,12 @@ def create_app() -> FastAPI:
         """Health check endpoint."""
         return {"status": "healthy", "service": settings.app_name}
 
+    @app.get("/ready")
+    async def readiness_check():
+        """Readiness probe: 200 once warm-up has finished, 503 until then."""
+        report = app.state.warmup.report()
+        return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
     @app.get("/")
     async def root():
         """Root endpoint with basic info."""
@@ -125,12 +259,18 @@ def create_app() -> FastAPI:
     return app
 
 
-app = create_app()
+def __getattr__(name: str):
+    """Create the app on first access, so importing this module has no side effects."""
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     import uvicorn
 
     host = os.environ.get("FAST_AURELIAN_HOST", "127.0.0.1")
     port = int(os.environ.get("FAST_AURELIAN_PORT", 8000))
-    logger.info(f"Starting {app.title} on {host}:{port}")
+    logger.info(f"Starting {get_settings().app_name} on {host}:{port}")
     uvicorn.run("fast_aurelian.main:app", host=host, port=port, reload=True)
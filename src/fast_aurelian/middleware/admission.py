@@ -0,0 +1,277 @@
+"""
+Admission control: bounded concurrency, wait queues and deadlines per route class.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP response to send."""
+
+    def __init__(self, status_code: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Concurrency limit with a bounded FIFO wait queue.
+
+    Slots are handed directly to the longest waiting request on release, so
+    queued requests are admitted in arrival order.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # Exponentially weighted average seconds a request holds a slot
+        self.avg_duration = 1.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a slot frees up for a new request."""
+        return max(1, math.ceil(self.avg_duration * (self.queued + 1) / self.limit))
+
+    async def acquire(self, timeout: float | None) -> None:
+        """
+        Take a slot, waiting in the queue for at most ``timeout`` seconds.
+
+        Raises:
+            asyncio.QueueFull: The wait queue is already full
+            TimeoutError: No slot freed up in time
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise asyncio.QueueFull(self.name)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                self.timed_out += 1
+            raise
+        self.admitted += 1
+
+    def release(self, duration: float | None = None) -> None:
+        if duration is not None:
+            self.avg_duration = 0.8 * self.avg_duration + 0.2 * duration
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_duration": round(self.avg_duration, 3),
+        }
+
+
+@dataclass
+class RouteClass:
+    """Requests whose path starts with one of ``prefixes`` share a limiter and deadline."""
+
+    name: str
+    prefixes: tuple[str, ...]
+    limit: int | None
+    timeout: float | None
+
+
+class AdmissionController:
+    """
+    Decides whether requests are admitted and how long they may run.
+
+    Every admitted request holds a slot of its route class (if the class is
+    limited) and a global slot. A full class queue is answered with 429, a
+    full global queue or a queue wait that runs out with 503, both with a
+    Retry-After estimate.
+    """
+
+    def __init__(
+        self,
+        global_limit: int,
+        route_classes: list[RouteClass],
+        default_timeout: float | None,
+        max_queue: int = 32,
+        queue_timeout: float | None = 10.0,
+        exempt_paths: tuple[str, ...] = (),
+    ):
+        self.global_limiter = ConcurrencyLimiter("global", global_limit, max_queue)
+        # Longest prefix first, so /query/batch is matched before /query
+        self.route_classes = sorted(
+            route_classes, key=lambda rc: max(map(len, rc.prefixes)), reverse=True
+        )
+        self.class_limiters = {
+            rc.name: ConcurrencyLimiter(rc.name, rc.limit, max_queue)
+            for rc in route_classes
+            if rc.limit
+        }
+        self.default_timeout = default_timeout
+        self.queue_timeout = queue_timeout
+        self.exempt_paths = exempt_paths
+        self.deadline_exceeded = 0
+
+    def classify(self, path: str) -> RouteClass | None:
+        for route_class in self.route_classes:
+            if path.startswith(route_class.prefixes):
+                return route_class
+        return None
+
+    def is_exempt(self, path: str) -> bool:
+        return path in self.exempt_paths
+
+    async def admit(self, route_class: RouteClass | None) -> list[ConcurrencyLimiter]:
+        """
+        Acquire the class and global slots for a request.
+
+        Returns:
+            The limiters holding a slot, to be released when the request ends
+
+        Raises:
+            AdmissionRejected: The request should be turned away
+        """
+        limiters = []
+        class_limiter = self.class_limiters.get(route_class.name) if route_class else None
+        try:
+            for limiter in (class_limiter, self.global_limiter):
+                if limiter is None:
+                    continue
+                try:
+                    await limiter.acquire(self.queue_timeout)
+                except asyncio.QueueFull:
+                    status_code = 503 if limiter is self.global_limiter else 429
+                    raise AdmissionRejected(
+                        status_code, f"Too many {limiter.name} requests", limiter.retry_after()
+                    ) from None
+                except TimeoutError:
+                    raise AdmissionRejected(
+                        503, f"Timed out waiting for a {limiter.name} slot", limiter.retry_after()
+                    ) from None
+                limiters.append(limiter)
+        except BaseException:
+            for limiter in limiters:
+                limiter.release()
+            raise
+        return limiters
+
+    def timeout_for(self, route_class: RouteClass | None) -> float | None:
+        if route_class is not None and route_class.timeout is not None:
+            return route_class.timeout
+        return self.default_timeout
+
+    def stats(self) -> dict:
+        return {
+            "global": self.global_limiter.stats(),
+            "routes": {name: limiter.stats() for name, limiter in self.class_limiters.items()},
+            "deadline_exceeded": self.deadline_exceeded,
+        }
+
+
+async def send_error(
+    send: Send, status_code: int, message: str, error_type: str, headers: dict | None = None
+):
+    """Send a JSON error in the same shape as the app's exception handler."""
+    body = json.dumps(
+        {"status": "error", "error": {"message": message, "type": error_type}}
+    ).encode()
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        *((key.encode(), str(value).encode()) for key, value in (headers or {}).items()),
+    ]
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to HTTP requests.
+
+    Implemented at the ASGI level rather than with ``call_next`` so that slots and
+    deadlines cover the whole response, including streamed bodies.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.controller.is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        route_class = self.controller.classify(path)
+        try:
+            limiters = await self.controller.admit(route_class)
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected {scope['method']} {path} with {e.status_code}: {e}")
+            await send_error(
+                send, e.status_code, str(e), type(e).__name__, {"retry-after": e.retry_after}
+            )
+            return
+
+        response_started = False
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        started = time.perf_counter()
+        timeout = self.controller.timeout_for(route_class)
+        deadline = asyncio.timeout(timeout)
+        try:
+            async with deadline:
+                await self.app(scope, receive, tracking_send)
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            self.controller.deadline_exceeded += 1
+            logger.warning(f"{scope['method']} {path} exceeded its {timeout}s deadline")
+            if not response_started:
+                await send_error(
+                    send, 504, f"Request exceeded its {timeout}s deadline", "DeadlineExceeded"
+                )
+        finally:
+            duration = time.perf_counter() - started
+            for limiter in limiters:
+                limiter.release(duration)
@@ -0,0 +1,147 @@
+"""
+Response compression: brotli when installed and accepted, else gzip.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Server-sent events must reach the client as soon as they are sent
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick the best supported encoding an ``Accept-Encoding`` header allows, if any."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    for encoding in supported:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class Encoder:
+    """An incremental brotli or gzip compressor."""
+
+    def __init__(self, encoding: str, gzip_level: int = 6, brotli_quality: int = 4):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far, so a streamed chunk reaches the client whole."""
+        if self.encoding == "br":
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON, NDJSON and text responses.
+
+    Whole bodies are compressed once they reach ``min_size`` bytes; streamed
+    bodies are compressed chunk by chunk, each flushed so NDJSON lines are not
+    held back. Server-sent events and already encoded bodies pass through.
+
+    Args:
+        app: The ASGI application
+        min_size: Bytes a body must reach to be compressed
+        gzip_level: gzip compression level
+        brotli_quality: Brotli quality
+    """
+
+    def __init__(
+        self, app: ASGIApp, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder: Encoder | None = None
+        passthrough = False
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not self._compressible(headers, len(body), more_body):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = Encoder(encoding, self.gzip_level, self.brotli_quality)
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                await send(start)
+            if more_body:
+                data = encoder.compress(body) + encoder.flush()
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+            else:
+                data = encoder.compress(body) + encoder.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": False})
+
+        await self.app(scope, receive, compressing_send)
+
+    def _compressible(self, headers: MutableHeaders, size: int, more_body: bool) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if content_type.startswith(UNCOMPRESSED_TYPES) or not content_type.startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            return False
+        length = headers.get("content-length")
+        if length is not None:
+            return int(length) >= self.min_size
+        # A streamed body of unknown length is compressed whatever its first chunk's size
+        return more_body or size >= self.min_size
@@ -19,40 +19,33 @@ async def logging_middleware(request: Request, call_next: Callable) -> Response:
     """
     correlation_id = str(uuid.uuid4())
     request.state.correlation_id = correlation_id
-    start_time = time.time()
-    logger.info(
-        "Request started",
-        extra={
-            "correlation_id": correlation_id,
-            "method": request.method,
-            "url": str(request.url),
-            "user_agent": request.headers.get("user-agent"),
-            "client_ip": request.client.host if request.client else None,
-        },
-    )
-
-    try:
-        response = await call_next(request)
-        duration = time.time() - start_time
-        logger.info(
-            "Request completed",
-            extra={
-                "correlation_id": correlation_id,
-                "status_code": response.status_code,
-                "duration_ms": round(duration * 1000, 2),
-            },
+    start_time = time.perf_counter()
+    # Log records made while handling the request carry its correlation ID and path too
+    with logger.contextualize(correlation_id=correlation_id, path=request.url.path):
+        logger.debug(
+            "Request started",
+            method=request.method,
+            query=request.url.query or None,
+            user_agent=request.headers.get("user-agent"),
+            client_ip=request.client.host if request.client else None,
         )
-        response.headers["X-Correlation-ID"] = correlation_id
-        return response
+        try:
+            response = await call_next(request)
+        except Exception as e:
+            logger.error(
+                "Request failed",
+                method=request.method,
+                error=str(e),
+                duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
+            )
+            raise
 
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(
-            "Request failed",
-            extra={
-                "correlation_id": correlation_id,
-                "error": str(e),
-                "duration_ms": round(duration * 1000, 2),
-            },
+        logger.log(
+            "ERROR" if response.status_code >= 500 else "INFO",
+            "Request completed",
+            method=request.method,
+            status_code=response.status_code,
+            duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
         )
-        raise
+    response.headers["X-Correlation-ID"] = correlation_id
+    return response
@@ -0,0 +1,92 @@
+"""
+Per-route request metrics recorded at the ASGI level.
+"""
+
+import time
+
+from starlette.routing import Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.metrics import AppMetrics, HistogramValue, Value
+
+UNMATCHED_ROUTE = "unmatched"
+OTHER_METHOD = "OTHER"
+STANDARD_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+
+class RouteSeries:
+    """The metric children of one route and method, allocated up front."""
+
+    __slots__ = ("duration", "in_flight", "responses")
+
+    def __init__(self, metrics: AppMetrics, route: str, method: str):
+        self.duration: HistogramValue = metrics.http_duration.labels(route, method)
+        self.in_flight: Value = metrics.http_in_flight.labels(route)
+        # Indexed by status code // 100
+        self.responses: tuple[Value, ...] = tuple(
+            metrics.http_responses.labels(route, method, f"{status_class}xx")
+            for status_class in range(6)
+        )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and in-flight counts per route.
+
+    Routes are labelled by their path template (``/api/paperqa/jobs/{job_id}``),
+    so label sets are bounded and created once, when the middleware stack is built.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: AppMetrics, router: Router):
+        self.app = app
+        self.metrics = metrics
+        self.static: dict[tuple[str, str], RouteSeries] = {}
+        self.templated: list[tuple[object, dict[str, RouteSeries]]] = []
+
+        for route in router.routes:
+            path_regex = getattr(route, "path_regex", None)
+            methods = getattr(route, "methods", None)
+            if path_regex is None or methods is None:
+                continue
+            series = {method: RouteSeries(metrics, route.path, method) for method in methods}
+            if getattr(route, "param_convertors", None):
+                self.templated.append((path_regex, series))
+            else:
+                for method, route_series in series.items():
+                    self.static[(method, route.path)] = route_series
+        self.unmatched = {
+            method: RouteSeries(metrics, UNMATCHED_ROUTE, method)
+            for method in (*STANDARD_METHODS, OTHER_METHOD)
+        }
+
+    def resolve(self, method: str, path: str) -> RouteSeries:
+        series = self.static.get((method, path))
+        if series is not None:
+            return series
+        for path_regex, by_method in self.templated:
+            if method in by_method and path_regex.match(path):
+                return by_method[method]
+        return self.unmatched.get(method) or self.unmatched[OTHER_METHOD]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        series = self.resolve(scope["method"], scope["path"])
+        status_code = 500
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        series.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, tracking_send)
+        finally:
+            series.duration.observe(time.perf_counter() - started)
+            series.in_flight.dec()
+            series.responses[min(status_code // 100, 5)].inc()
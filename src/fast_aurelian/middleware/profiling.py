@@ -0,0 +1,156 @@
+"""
+On-demand profiles of single requests.
+"""
+
+import asyncio
+import cProfile
+import io
+import pstats
+import re
+import tempfile
+import uuid
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+PROFILE_SUFFIXES = (".html", ".txt")
+
+
+def profile_directory(configured: str | None) -> Path:
+    return (
+        Path(configured) if configured else Path(tempfile.gettempdir()) / "fast-aurelian-profiles"
+    )
+
+
+def find_profile(directory: Path, profile_id: str) -> Path | None:
+    """The stored profile with this id, if it exists."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    for suffix in PROFILE_SUFFIXES:
+        path = directory / f"{profile_id}{suffix}"
+        if path.is_file():
+            return path
+    return None
+
+
+class RequestProfiler:
+    """
+    A sampling profile from pyinstrument when it is installed, else a cProfile profile.
+
+    pyinstrument's async mode attributes time to the request's own coroutine; the
+    cProfile fallback records everything the event loop thread ran meanwhile,
+    including other requests.
+    """
+
+    def __init__(self, interval: float):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            self.profiler = cProfile.Profile()
+            self.suffix = ".txt"
+        else:
+            self.profiler = Profiler(interval=interval, async_mode="enabled")
+            self.suffix = ".html"
+
+    def start(self) -> None:
+        if isinstance(self.profiler, cProfile.Profile):
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self) -> None:
+        if isinstance(self.profiler, cProfile.Profile):
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+
+    def render(self) -> str:
+        if not isinstance(self.profiler, cProfile.Profile):
+            return self.profiler.output_html()
+        output = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(80)
+        return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that ask for it.
+
+    A request is profiled when it carries an ``X-Profile`` header or ``profile``
+    query parameter, matching ``token`` when one is configured. One request is
+    profiled at a time. The response gets an ``X-Profile-ID`` header (the request's
+    correlation id) and the profile is stored under ``directory`` once the response
+    has been sent; ``X-Profile-Error`` explains a request that was not profiled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: Path,
+        token: str | None = None,
+        interval: float = 0.001,
+        max_files: int = 50,
+    ):
+        self.app = app
+        self.directory = directory
+        self.token = token
+        self.interval = interval
+        self.max_files = max_files
+        self._busy = False
+
+    def requested(self, scope: Scope) -> bool:
+        value = dict(scope["headers"]).get(b"x-profile", b"").decode("latin-1")
+        if not value and scope.get("query_string"):
+            value = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0]
+        if self.token is not None:
+            return value == self.token
+        return value.lower() not in ("", "0", "false")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._busy:
+            await self.app(scope, receive, self._with_headers(send, b"x-profile-error", b"busy"))
+            return
+
+        correlation_id = scope.get("state", {}).get("correlation_id")
+        try:
+            profile_id = uuid.UUID(correlation_id).hex
+        except (TypeError, ValueError):
+            profile_id = uuid.uuid4().hex
+        profiler = RequestProfiler(self.interval)
+        self._busy = True
+        profiler.start()
+        try:
+            await self.app(scope, receive, self._with_headers(send, b"x-profile-id", profile_id))
+        finally:
+            profiler.stop()
+            self._busy = False
+            path = self.directory / f"{profile_id}{profiler.suffix}"
+            await asyncio.to_thread(self._save, path, profiler.render())
+            logger.info(f"Saved profile of {scope['method']} {scope['path']} to {path}")
+
+    @staticmethod
+    def _with_headers(send: Send, name: bytes, value: str | bytes) -> Send:
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                encoded = value.encode() if isinstance(value, str) else value
+                message = {**message, "headers": [*message.get("headers", []), (name, encoded)]}
+            await send(message)
+
+        return send_with_headers
+
+    def _save(self, path: Path, content: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        profiles = sorted(
+            (p for p in self.directory.iterdir() if p.suffix in PROFILE_SUFFIXES),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for old in profiles[: max(0, len(profiles) - self.max_files)]:
+            old.unlink(missing_ok=True)
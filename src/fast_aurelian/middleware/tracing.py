@@ -0,0 +1,78 @@
+"""
+Request spans, the root of every trace recorded while serving a request.
+"""
+
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.tracing import (
+    SPAN_KIND_SERVER,
+    STATUS_ERROR,
+    STATUS_OK,
+    STATUS_UNSET,
+    NoopSpan,
+    Tracer,
+)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware running each HTTP request in a server span.
+
+    The trace id is the request's correlation id (its 32 hex digits), so a
+    correlation id from a response header or log line finds the trace.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = scope.get("state", {}).get("correlation_id")
+        try:
+            trace_id = uuid.UUID(correlation_id).hex if correlation_id else None
+        except ValueError:
+            trace_id = None
+        span, token = self.tracer.enter(
+            f"{scope['method']} {scope['path']}",
+            trace_id=trace_id,
+            kind=SPAN_KIND_SERVER,
+            correlation_id=correlation_id,
+        )
+        if isinstance(span, NoopSpan):
+            # Not sampled: the request still runs under the no-op span, so nothing below records
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.tracer.exit(span, token)
+            return
+
+        span.set(**{"http.request.method": scope["method"], "url.path": scope["path"]})
+        status_code = 500
+
+        async def tracing_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, tracing_send)
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                span.name = f"{scope['method']} {route}"
+            span.set(**{"http.route": route, "http.response.status_code": status_code})
+            if status_code >= 500 and span.status != STATUS_ERROR:
+                span.fail(f"HTTP {status_code}")
+            elif span.status == STATUS_UNSET:
+                span.status = STATUS_OK
+            self.tracer.exit(span, token)
@@ -0,0 +1,231 @@
+"""
+Latency-aware query tiers: cheaper answer settings while a latency target is at risk.
+
+Each query route has a ladder of tiers, starting with ``full`` (the configured
+settings). A route steps one tier down when its predicted latency, the recent
+90th percentile answer time plus the expected wait for a query slot, exceeds its
+target, and one tier back up once the prediction falls well below it. Steps are
+at least a cooldown apart, and the latency window restarts on each step so the
+new tier is judged on its own answers.
+"""
+
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from ..utils.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from ..middleware.admission import AdmissionController, ConcurrencyLimiter
+
+# Query routes with tiers, and the admission route class whose queue each waits in
+QUERY_ROUTES = {"query": "query", "stream": "query", "federated": "query", "batch": "batch"}
+# Answers a window needs before its percentile is trusted
+MIN_SAMPLES = 5
+
+
+@dataclass(frozen=True)
+class QueryTier:
+    """
+    Answer settings of one tier; ``None`` keeps the configured value.
+
+    ``evidence_k`` and ``answer_max_sources`` are caps, so a request asking for
+    less keeps its value; the models replace the configured ones.
+    """
+
+    name: str
+    evidence_k: int | None = None
+    answer_max_sources: int | None = None
+    summary_llm: str | None = None
+    llm: str | None = None
+
+    def overrides(self, deps, requested: dict[str, Any]) -> dict[str, Any]:
+        """
+        PaperQADependencies overrides applying this tier on top of a request's own.
+
+        Args:
+            deps: The directory's configured dependencies
+            requested: Overrides already asked for by the request
+        """
+        overrides = {}
+        for field in ("evidence_k", "answer_max_sources"):
+            cap = getattr(self, field)
+            if cap is not None:
+                overrides[field] = min(requested.get(field, getattr(deps, field)), cap)
+        for field in ("summary_llm", "llm"):
+            if getattr(self, field) is not None:
+                overrides[field] = getattr(self, field)
+        return overrides
+
+    def describe(self) -> dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+FULL_TIER = QueryTier("full")
+
+
+class TierSelector:
+    """
+    Chooses one route's tier from its recent latency and queue depth.
+
+    Args:
+        route: Route name, for logs and metrics
+        tiers: Degraded tiers, from least to most degraded
+        latency_target: Seconds a query on this route should take at most
+        window: Most recent answers the latency percentile is taken over
+        window_seconds: Age after which answers leave the window
+        cooldown: Minimum seconds between tier changes
+        recover_ratio: Fraction of the target the prediction must fall below to step up
+    """
+
+    def __init__(
+        self,
+        route: str,
+        tiers: list[QueryTier],
+        latency_target: float,
+        window: int = 50,
+        window_seconds: float = 120.0,
+        cooldown: float = 15.0,
+        recover_ratio: float = 0.5,
+    ):
+        self.route = route
+        self.tiers = [FULL_TIER, *tiers]
+        self.latency_target = latency_target
+        self.window_seconds = window_seconds
+        self.cooldown = cooldown
+        self.recover_ratio = recover_ratio
+        self.limiter: ConcurrencyLimiter | None = None
+        self.level = 0
+        self.changes = 0
+        self._changed_at = 0.0
+        self._durations: deque[tuple[float, float]] = deque(maxlen=window)
+        metrics = get_metrics()
+        self._level_gauge = metrics.query_tier_level.labels(route)
+        self._tier_counters = [metrics.query_tiers.labels(route, tier.name) for tier in self.tiers]
+
+    def recent_latency(self, now: float) -> float | None:
+        """The 90th percentile of answers in the window, if it holds enough of them."""
+        while self._durations and now - self._durations[0][0] > self.window_seconds:
+            self._durations.popleft()
+        if len(self._durations) < MIN_SAMPLES:
+            return None
+        durations = sorted(duration for _, duration in self._durations)
+        return durations[int(0.9 * (len(durations) - 1))]
+
+    def queue_wait(self) -> float:
+        """Expected seconds a new query waits for a slot."""
+        if self.limiter is None or not self.limiter.queued:
+            return 0.0
+        return self.limiter.avg_duration * self.limiter.queued / self.limiter.limit
+
+    def predicted_latency(self, now: float | None = None) -> float | None:
+        latency = self.recent_latency(time.monotonic() if now is None else now)
+        wait = self.queue_wait()
+        if latency is None:
+            return wait or None
+        return latency + wait
+
+    def select(self) -> QueryTier:
+        """Pick the tier for a new query, stepping down or up if it is time to."""
+        now = time.monotonic()
+        if now - self._changed_at >= self.cooldown:
+            predicted = self.predicted_latency(now)
+            if predicted is not None:
+                if predicted > self.latency_target and self.level < len(self.tiers) - 1:
+                    self._step(now, 1, predicted)
+                elif (
+                    predicted < self.latency_target * self.recover_ratio
+                    and self.level > 0
+                    and len(self._durations) >= MIN_SAMPLES
+                ):
+                    self._step(now, -1, predicted)
+        self._tier_counters[self.level].inc()
+        return self.tiers[self.level]
+
+    def _step(self, now: float, step: int, predicted: float) -> None:
+        self.level += step
+        self.changes += 1
+        self._changed_at = now
+        self._durations.clear()
+        self._level_gauge.set(self.level)
+        tier = self.tiers[self.level]
+        message = (
+            f"{self.route} queries {'degraded' if step > 0 else 'restored'} to tier {tier.name}: "
+            f"predicted {predicted:.1f}s against a {self.latency_target:.1f}s target"
+        )
+        if step > 0:
+            logger.warning(message)
+        else:
+            logger.info(message)
+
+    def observe(self, tier: QueryTier, duration: float) -> None:
+        """Record how long a query answered at ``tier`` took."""
+        # Answers started before the last step say little about the current tier
+        if tier is self.tiers[self.level]:
+            self._durations.append((time.monotonic(), duration))
+
+    def stats(self) -> dict[str, Any]:
+        predicted = self.predicted_latency()
+        return {
+            "tier": self.tiers[self.level].name,
+            "level": self.level,
+            "latency_target": self.latency_target,
+            "predicted_latency": round(predicted, 3) if predicted is not None else None,
+            "queue_wait": round(self.queue_wait(), 3),
+            "samples": len(self._durations),
+            "changes": self.changes,
+        }
+
+
+class QueryGovernor:
+    """The tier selectors of every query route."""
+
+    def __init__(self, selectors: dict[str, TierSelector]):
+        self.selectors = selectors
+
+    @classmethod
+    def from_settings(cls, settings) -> "QueryGovernor":
+        default_tiers = [QueryTier(**tier) for tier in settings.adaptive_query_tiers]
+        selectors = {}
+        for route in QUERY_ROUTES:
+            tiers = settings.adaptive_route_tiers.get(route)
+            selectors[route] = TierSelector(
+                route,
+                [QueryTier(**tier) for tier in tiers] if tiers is not None else default_tiers,
+                settings.adaptive_route_latency_targets.get(
+                    route, settings.adaptive_latency_target
+                ),
+                window=settings.adaptive_window,
+                cooldown=settings.adaptive_cooldown,
+                recover_ratio=settings.adaptive_recover_ratio,
+            )
+        return cls(selectors)
+
+    def attach(self, admission: "AdmissionController") -> None:
+        """Watch the queues of the admission route classes the query routes wait in."""
+        for route, route_class in QUERY_ROUTES.items():
+            self.selectors[route].limiter = admission.class_limiters.get(route_class)
+
+    def select(self, route: str) -> QueryTier:
+        return self.selectors[route].select()
+
+    def observe(self, route: str, tier: QueryTier, duration: float) -> None:
+        self.selectors[route].observe(tier, duration)
+
+    def stats(self) -> dict[str, Any]:
+        return {route: selector.stats() for route, selector in self.selectors.items()}
+
+
+@lru_cache
+def get_query_governor() -> QueryGovernor | None:
+    """Get the process-wide query governor, or ``None`` when adaptive tiers are off."""
+    from ..config import get_settings
+
+    settings = get_settings()
+    if not settings.adaptive_query_enabled:
+        return None
+    return QueryGovernor.from_settings(settings)
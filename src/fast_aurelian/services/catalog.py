@@ -0,0 +1,244 @@
+"""
+In-memory catalog of a paper directory, kept current by file-system notifications.
+
+Status and listing requests read the catalog instead of rescanning the
+directory. A watcher applies changes as they happen and a periodic reconcile
+rescans the directory in case notifications were missed (or are unavailable).
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+try:
+    from watchfiles import awatch
+except ImportError:  # pragma: no cover - installed with uvicorn[standard]
+    awatch = None
+
+# Matches the document types Aurelian lists (case-insensitive, by file name)
+DOCUMENT_TYPES = ("pdf", "txt", "html", "md")
+
+
+def document_type(name: str) -> str | None:
+    """The document type of a file name (its lower-case suffix), or None for other files."""
+    _, dot, suffix = name.rpartition(".")
+    suffix = suffix.lower()
+    return suffix if dot and suffix in DOCUMENT_TYPES else None
+
+
+def is_document(name: str) -> bool:
+    """Whether a file is a document that is listed and indexed."""
+    return document_type(name) is not None
+
+
+def index_exists(fingerprint: str) -> bool:
+    """Whether an index fingerprint (see ``PaperContext.index_fingerprint``) names any files."""
+    return any(part != "-" for part in fingerprint.split("|"))
+
+
+def scan_documents(directory: Path) -> dict[str, tuple[int, int]]:
+    """Map each document file directly in a directory to its (size, mtime_ns)."""
+    documents = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if is_document(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    documents[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return documents
+
+
+class DirectoryCatalog:
+    """
+    Documents in one paper directory and the files its search index holds.
+
+    The index's file table is only reloaded when the index fingerprint changes,
+    and listings are rebuilt only after something changed, so reads are cheap
+    however large the collection is.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        fingerprint: Callable[[], str],
+        load_index: Callable[[], Awaitable[dict[str, Any]]],
+        reconcile_interval: float = 300.0,
+        watch: bool = True,
+    ):
+        """
+        Args:
+            directory: The paper directory
+            fingerprint: Returns a value that changes whenever the index changes
+            load_index: Loads the index's file table (file name to status)
+            reconcile_interval: Seconds between full rescans of the directory
+            watch: Apply file-system notifications as they arrive
+        """
+        self.directory = Path(directory)
+        self.fingerprint = fingerprint
+        self.load_index = load_index
+        self.reconcile_interval = reconcile_interval
+        self.watch = watch and awatch is not None
+        self.documents: dict[str, tuple[int, int]] = {}
+        self.indexed: dict[str, Any] = {}
+        self.updated_at: float | None = None
+        self.reconciled_at: float | None = None
+        self.events = 0
+        self.reconciles = 0
+        # Changes a reconcile found that notifications had not delivered
+        self.drift = 0
+        self._index_fingerprint: str | None = None
+        self._snapshot: dict[str, Any] | None = None
+        self._loaded = asyncio.Event()
+        self._index_lock = asyncio.Lock()
+        self._stop = asyncio.Event()
+        self._reconciler: asyncio.Task | None = None
+        self._watcher: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Load the catalog and start following changes to the directory."""
+        if self._reconciler is not None:
+            return
+        self._reconciler = asyncio.create_task(self._reconcile_loop())
+        if self.watch:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        self._stop.set()
+        tasks = [task for task in (self._reconciler, self._watcher) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def reconcile(self) -> int:
+        """
+        Rescan the directory and replace the catalog with what is on disk.
+
+        Returns:
+            Number of documents added, changed or removed
+        """
+        documents = await asyncio.to_thread(scan_documents, self.directory)
+        changed = len(documents.keys() ^ self.documents.keys()) + sum(
+            1
+            for name, entry in documents.items()
+            if name in self.documents and self.documents[name] != entry
+        )
+        if changed or not self._loaded.is_set():
+            self.documents = documents
+            self._changed()
+        self.reconciled_at = time.time()
+        self.reconciles += 1
+        self._loaded.set()
+        return changed
+
+    def apply(self, path: str | Path) -> bool:
+        """
+        Update the catalog entry for a file that was reported as changed.
+
+        Returns:
+            Whether the catalog changed
+        """
+        path = Path(path)
+        if path.parent != self.directory or not is_document(path.name):
+            return False
+        try:
+            stat = path.stat()
+            entry = (stat.st_size, stat.st_mtime_ns) if path.is_file() else None
+        except FileNotFoundError:
+            entry = None
+        if self.documents.get(path.name) == entry:
+            return False
+        if entry is None:
+            del self.documents[path.name]
+        else:
+            self.documents[path.name] = entry
+        self._changed()
+        return True
+
+    async def snapshot(self) -> dict[str, Any]:
+        """
+        Get the directory's documents by type and its indexed files.
+
+        Returns:
+            ``documents`` (lists by type, plus ``all``), ``indexed`` (file name to
+            index status) and ``index_exists``; the same object is returned until
+            the directory or index changes, so callers must not modify it
+        """
+        if not self._loaded.is_set():
+            await self.reconcile()
+        fingerprint = self.fingerprint()
+        if fingerprint != self._index_fingerprint:
+            async with self._index_lock:
+                if fingerprint != self._index_fingerprint:
+                    self.indexed = await self._read_index(fingerprint)
+                    self._index_fingerprint = fingerprint
+                    self._snapshot = None
+        if self._snapshot is None:
+            names = sorted(self.documents)
+            documents = {"all": names}
+            for doc_type in DOCUMENT_TYPES:
+                documents[doc_type] = [name for name in names if document_type(name) == doc_type]
+            self._snapshot = {
+                "documents": documents,
+                "indexed": self.indexed,
+                "index_exists": index_exists(fingerprint),
+            }
+        return self._snapshot
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "watching": self._watcher is not None and not self._watcher.done(),
+            "documents": len(self.documents),
+            "updated_at": self.updated_at,
+            "reconciled_at": self.reconciled_at,
+            "events": self.events,
+            "reconciles": self.reconciles,
+            "drift": self.drift,
+        }
+
+    def _changed(self) -> None:
+        self.updated_at = time.time()
+        self._snapshot = None
+
+    async def _read_index(self, fingerprint: str) -> dict[str, Any]:
+        if not index_exists(fingerprint):
+            return {}
+        try:
+            return dict(await self.load_index())
+        except Exception as e:
+            logger.info(f"Could not read the index for {self.directory}: {e}")
+            return {}
+
+    async def _reconcile_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                changed = await self.reconcile()
+                if changed and self.reconciles > 1:
+                    self.drift += changed
+                    logger.debug(f"Reconciled {changed} missed changes in {self.directory}")
+            except Exception as e:
+                logger.warning(f"Could not rescan {self.directory}: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    async def _watch(self) -> None:
+        await self._loaded.wait()
+        try:
+            async for changes in awatch(
+                self.directory,
+                watch_filter=lambda _, path: is_document(path),
+                debounce=200,
+                recursive=False,
+                stop_event=self._stop,
+            ):
+                self.events += len(changes)
+                for _, path in changes:
+                    self.apply(path)
+        except Exception as e:
+            # The periodic reconcile keeps the catalog current without notifications
+            logger.warning(f"Not watching {self.directory} for changes: {e}")
@@ -0,0 +1,109 @@
+"""
+Embedding model wrappers used by the PaperQA service.
+"""
+
+import asyncio
+
+import numpy as np
+from lmi import EmbeddingModel
+from pydantic import ConfigDict, Field
+
+from ..utils.embedding_cache import EmbeddingCache, text_digest
+
+
+class PrecomputedEmbeddingModel(EmbeddingModel):
+    """
+    Embedding model that serves known texts from precomputed vectors.
+
+    Texts without a precomputed vector are embedded by the wrapped model, so
+    the wrapper can be handed to PaperQA anywhere an embedding model is expected.
+    """
+
+    name: str = "precomputed"
+    inner: EmbeddingModel
+    vectors: dict[str, list[float]] = Field(default_factory=dict)
+
+    @classmethod
+    async def for_texts(
+        cls, inner: EmbeddingModel, texts: list[str]
+    ) -> "PrecomputedEmbeddingModel":
+        """
+        Embed texts in a single call and wrap the model with the results.
+
+        Args:
+            inner: Model used for the batch and for any other texts later on
+            texts: Texts to embed up front
+
+        Returns:
+            The wrapping model
+        """
+        unique = list(dict.fromkeys(texts))
+        vectors = await inner.embed_documents(unique) if unique else []
+        return cls(
+            name=inner.name,
+            ndim=inner.ndim,
+            inner=inner,
+            vectors=dict(zip(unique, vectors, strict=True)),
+        )
+
+    def set_mode(self, mode) -> None:
+        self.inner.set_mode(mode)
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        missing = [text for text in dict.fromkeys(texts) if text not in self.vectors]
+        fetched = (
+            dict(zip(missing, await self.inner.embed_documents(missing), strict=True))
+            if missing
+            else {}
+        )
+        return [self.vectors[text] if text in self.vectors else fetched[text] for text in texts]
+
+
+class CachedEmbeddingModel(EmbeddingModel):
+    """
+    Embedding model that reads and fills a shared content-addressed cache.
+
+    Chunks are looked up by the digest of their text under the wrapped model's
+    name, so identical chunks in any paper directory are only embedded once.
+    Hit and miss counts are kept per instance for reporting on a single build.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str = "cached"
+    inner: EmbeddingModel
+    cache: EmbeddingCache
+    hits: int = 0
+    misses: int = 0
+
+    @classmethod
+    def wrap(cls, inner: EmbeddingModel, cache: EmbeddingCache) -> "CachedEmbeddingModel":
+        return cls(name=inner.name, ndim=inner.ndim, inner=inner, cache=cache)
+
+    def set_mode(self, mode) -> None:
+        self.inner.set_mode(mode)
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        store = self.cache.store(self.inner.name)
+        digests = [text_digest(text) for text in texts]
+        # The store waits on a file lock other processes may hold, so off the event loop
+        vectors: list = await asyncio.to_thread(store.get_many, digests)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        self.cache.record(len(texts) - len(missing), len(missing))
+
+        if missing:
+            fresh = await self.inner.embed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(store.put_many, [digests[i] for i in missing], fresh)
+            for i, vector in zip(missing, fresh, strict=True):
+                vectors[i] = vector
+        return [vector.tolist() if isinstance(vector, np.ndarray) else vector for vector in vectors]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
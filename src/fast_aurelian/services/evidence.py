@@ -0,0 +1,251 @@
+"""
+Retrieval-only evidence search over a directory's existing PaperQA index.
+
+Chunks are ranked by cosine similarity between the question's embedding and the
+chunk embeddings stored in the index, without any LLM summarization or answer
+generation. An index version's chunks are loaded once into a normalized matrix,
+so each search costs one (cached) question embedding and a matrix product.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from lmi import EmbeddingModel
+from lmi.embeddings import EmbeddingModes
+from loguru import logger
+from paperqa.agents.search import FAILED_DOCUMENT_ADD_ID, SearchIndex
+from paperqa.settings import Settings as PQASettings
+from paperqa.types import Text
+
+# Rank offset in reciprocal rank fusion (the usual choice from the original paper)
+RRF_K = 60
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors (rows) to unit length, leaving zero vectors as they are."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def embedding_key(settings: PQASettings) -> str:
+    """Identify the embedding model (and its configuration) the settings select."""
+    return f"{settings.embedding}|{settings.embedding_config}"
+
+
+def text_source(text: Text, document: str) -> dict[str, Any]:
+    """Describe a chunk with its document's metadata, in ``PaperSource`` terms."""
+    doc = text.doc
+    return {
+        "title": getattr(doc, "title", None) or doc.docname,
+        "authors": getattr(doc, "authors", None) or [],
+        "doi": getattr(doc, "doi", None),
+        "url": getattr(doc, "url", None),
+        "year": getattr(doc, "year", None),
+        "excerpt": text.text,
+        "citation": doc.citation,
+        "chunk": text.name,
+        "document": document,
+    }
+
+
+@dataclass
+class EvidenceIndex:
+    """The embedded chunks of one index version, ready to be ranked against questions."""
+
+    search_index: SearchIndex
+    # Chunks without their embeddings, which live (normalized) in the matrix rows
+    texts: list[Text]
+    documents: np.ndarray
+    matrix: np.ndarray
+    load_time: float
+
+    @classmethod
+    async def load(cls, search_index: SearchIndex) -> "EvidenceIndex":
+        """
+        Read every indexed document's chunks and embeddings.
+
+        Args:
+            search_index: The opened index of one version
+
+        Returns:
+            The evidence index; chunks stored without embeddings are left out
+        """
+        started = time.perf_counter()
+        texts, documents, vectors = [], [], []
+        skipped = 0
+        for document, filehash in sorted((await search_index.index_files).items()):
+            if filehash == FAILED_DOCUMENT_ADD_ID:
+                continue
+            docs = await search_index.get_saved_object(document)
+            if docs is None:
+                continue
+            for text in docs.texts:
+                if text.embedding is None:
+                    skipped += 1
+                    continue
+                vectors.append(text.embedding)
+                texts.append(text.model_copy(update={"embedding": None}))
+                documents.append(document)
+        matrix = (
+            normalize(np.asarray(vectors, dtype=np.float32))
+            if vectors
+            else np.zeros((0, 0), dtype=np.float32)
+        )
+        if skipped:
+            logger.warning(f"Left {skipped} chunks without embeddings out of the evidence index")
+        return cls(
+            search_index=search_index,
+            texts=texts,
+            documents=np.asarray(documents, dtype=object),
+            matrix=matrix,
+            load_time=time.perf_counter() - started,
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def text(self, position: int) -> Text:
+        """Get a copy of a chunk with its embedding, which callers may modify."""
+        text = self.texts[position]
+        return text.model_copy(
+            update={"embedding": self.matrix[position].tolist(), "doc": text.doc.model_copy()}
+        )
+
+    async def keyword_ranks(self, query: str, top_n: int) -> dict[str, int]:
+        """Rank documents by a keyword (tantivy) search of their full text, best first."""
+        index = self.search_index
+        searcher = await index.searcher
+        parsed = (await index.index).parse_query(index.clean_query(query), index.fields)
+        hits = searcher.search(parsed, top_n).hits
+        ranks: dict[str, int] = {}
+        for _, address in hits:
+            document = searcher.doc(address)["file_location"][0]
+            ranks.setdefault(document, len(ranks))
+        return ranks
+
+    def rank(
+        self,
+        query_vector: np.ndarray,
+        limit: int,
+        offset: int = 0,
+        keyword_ranks: dict[str, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Rank chunks against a question and return one page of them.
+
+        Args:
+            query_vector: The question's embedding
+            limit: Chunks to return
+            offset: Chunks to skip from the top
+            keyword_ranks: Document ranks from a keyword search; when given, chunk
+                and document ranks are combined by reciprocal rank fusion
+
+        Returns:
+            Chunk sources with their ``score`` (cosine similarity) and ``keyword_rank``
+        """
+        return [
+            {
+                **text_source(self.texts[position], self.documents[position]),
+                "score": round(score, 6),
+                "keyword_rank": (keyword_ranks or {}).get(self.documents[position]),
+            }
+            for position, score in self.top(query_vector, limit, offset, keyword_ranks)
+        ]
+
+    def top(
+        self,
+        query_vector: np.ndarray,
+        limit: int,
+        offset: int = 0,
+        keyword_ranks: dict[str, int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Rank chunks like ``rank``, returning their positions and cosine similarities."""
+        if not len(self) or offset >= len(self):
+            return []
+        if query_vector.shape[-1] != self.matrix.shape[1]:
+            raise ValueError(
+                f"Question embedding has {query_vector.shape[-1]} dimensions but the index "
+                f"holds {self.matrix.shape[1]}; was it built with another embedding model?"
+            )
+        scores = self.matrix @ normalize(query_vector.astype(np.float32))
+        if keyword_ranks:
+            order = np.argsort(-scores, kind="stable")
+            fused = np.empty_like(scores)
+            fused[order] = 1.0 / (RRF_K + np.arange(1, len(order) + 1))
+            for document, rank in keyword_ranks.items():
+                fused[self.documents == document] += 1.0 / (RRF_K + rank + 1)
+            ranking = fused
+        else:
+            ranking = scores
+
+        end = min(offset + limit, len(self))
+        # Only the chunks up to the end of the page need sorting
+        top = np.argpartition(-ranking, end - 1)[:end]
+        top = top[np.argsort(-ranking[top], kind="stable")][offset:end]
+        return [(int(position), float(scores[position])) for position in top]
+
+
+class QueryEmbeddings:
+    """
+    Least-recently-used cache of question embeddings, per embedding model.
+
+    Embedding models are built once per configuration too, since building one
+    costs about as much as a cached search.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._vectors: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self._models: dict[str, EmbeddingModel] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def embed(self, settings: PQASettings, query: str) -> np.ndarray:
+        """
+        Embed a question with the settings' embedding model, or reuse its embedding.
+
+        Args:
+            settings: PaperQA settings naming the embedding model
+            query: The question
+
+        Returns:
+            The question's embedding
+        """
+        key = (embedding_key(settings), query)
+        vector = self._vectors.get(key)
+        if vector is not None:
+            self.hits += 1
+            self._vectors.move_to_end(key)
+            return vector
+        self.misses += 1
+        model = self.model(settings)
+        # Only affects models that embed questions differently from documents
+        model.set_mode(EmbeddingModes.QUERY)
+        try:
+            vector = np.asarray((await model.embed_documents([query]))[0], dtype=np.float32)
+        finally:
+            model.set_mode(EmbeddingModes.DOCUMENT)
+        self._vectors[key] = vector
+        while len(self._vectors) > self.maxsize:
+            self._vectors.popitem(last=False)
+        return vector
+
+    def model(self, settings: PQASettings) -> EmbeddingModel:
+        """Get the settings' embedding model, built on first use."""
+        model_key = embedding_key(settings)
+        model = self._models.get(model_key)
+        if model is None:
+            model = self._models[model_key] = settings.get_embedding_model()
+        return model
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._vectors),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,363 @@
+"""
+Versioned index snapshots shared by every worker process serving a paper directory.
+
+Each index build writes a new version next to the published one and then swaps
+a pointer file, so readers never see a half-written index and never wait for a
+build. Layout under a directory's index root::
+
+    CURRENT                 published version name, replaced atomically
+    write.lock              held (flock) by the one process building the index
+    versions/<version>/     a complete PaperQA index directory
+    versions/<version>/.readers
+                            share-locked by every process reading that version
+
+A new version starts as a copy of the published one in which unchanged files are
+hardlinks, so the tantivy segments every version and worker maps are the same
+inodes and share the page cache. Versions no process holds a read lock on are
+garbage collected after each publish.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+CURRENT_FILENAME = "CURRENT"
+VERSIONS_DIRNAME = "versions"
+READERS_FILENAME = ".readers"
+WRITE_LOCK_FILENAME = "write.lock"
+VERSION_PATTERN = re.compile(r"^v(\d+)$")
+# Rewritten in place by PaperQA, so each version needs its own copy (as do JSON files)
+COPIED_FILES = {"files.zip"}
+
+
+def replicate(source: Path, target: Path) -> int:
+    """
+    Recreate a directory tree, hardlinking files that are never modified in place.
+
+    Tantivy segments and stored documents are written once under unique names;
+    files rewritten in place are copied, and lock and temporary files skipped.
+
+    Args:
+        source: Directory to copy
+        target: Directory to create
+
+    Returns:
+        Number of files hardlinked rather than copied
+    """
+    linked = 0
+    target.mkdir(parents=True, exist_ok=True)
+    for entry in os.scandir(source):
+        path = target / entry.name
+        if entry.is_dir(follow_symlinks=False):
+            linked += replicate(Path(entry.path), path)
+        elif entry.name.startswith(".tantivy-") or entry.name.endswith((".tmp", ".lock")):
+            continue
+        elif entry.name in COPIED_FILES or entry.name.endswith(".json"):
+            shutil.copy2(entry.path, path)
+        else:
+            try:
+                os.link(entry.path, path)
+                linked += 1
+            except OSError:
+                shutil.copy2(entry.path, path)
+    return linked
+
+
+async def acquire(fd: int, max_delay: float = 1.0) -> None:
+    """Take an exclusive flock without blocking the event loop (cancellable while waiting)."""
+    delay = 0.05
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+
+def index_directories(directory: Path) -> list[Path]:
+    """PaperQA index directories (one per index name) directly under a version or root."""
+    if not directory.is_dir():
+        return []
+    return [
+        Path(entry.path)
+        for entry in os.scandir(directory)
+        if entry.is_dir(follow_symlinks=False) and entry.name != VERSIONS_DIRNAME
+    ]
+
+
+@dataclass
+class IndexWrite:
+    """An index version being built; published when the write ends unless discarded."""
+
+    version: str
+    directory: Path
+    discarded: bool = False
+
+    def discard(self) -> None:
+        self.discarded = True
+
+
+class IndexVersions:
+    """
+    Published index version and its readers and writer for one paper directory.
+
+    Read locks are counted per process, so a process holds one shared lock per
+    version however many of its requests read it.
+    """
+
+    def __init__(
+        self, root: str | Path, on_release: Callable[["IndexVersions"], None] | None = None
+    ):
+        """
+        Args:
+            root: The directory's index root
+            on_release: Called when this process may have stopped reading a
+                version, to drop anything it cached for versions no longer live
+        """
+        self.root = Path(root)
+        self.versions_dir = self.root / VERSIONS_DIRNAME
+        self.on_release = on_release
+        self.published = 0
+        self.collected = 0
+        self._pins: dict[str | None, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def current(self) -> str | None:
+        """Name of the published version, or None while the index is unversioned."""
+        try:
+            return (self.root / CURRENT_FILENAME).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def directory(self, version: str | None) -> Path:
+        """Index directory for a version (the index root itself for None)."""
+        return self.versions_dir / version if version else self.root
+
+    @contextlib.contextmanager
+    def reading(self) -> Iterator[str | None]:
+        """
+        Pin the published version while it is read, so it is not collected.
+
+        Never blocks: a version being collected is skipped in favour of the
+        newer one that replaced it.
+
+        Returns:
+            The pinned version (None for an unversioned index)
+        """
+        for _ in range(100):
+            version = self.current()
+            if self._pin(version):
+                break
+        else:
+            raise FileNotFoundError(f"Published index version {version} in {self.root} is missing")
+        try:
+            yield version
+        finally:
+            self._unpin(version)
+
+    @contextlib.asynccontextmanager
+    async def writing(self) -> AsyncIterator[IndexWrite]:
+        """
+        Build a new version while holding the directory's write lock.
+
+        Waits for a build in another process to finish, then starts from the
+        version it published. On a clean exit the new version is published
+        (unless discarded) and unused old versions are collected.
+
+        Returns:
+            The version being written
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / WRITE_LOCK_FILENAME, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            await acquire(fd)
+            base = self.current()
+            version = self._next_version()
+            write = IndexWrite(version, self.versions_dir / version)
+            linked = await asyncio.to_thread(self._prepare, base, write.directory)
+            logger.debug(f"Writing index {write.version} from {base} ({linked} files linked)")
+            try:
+                yield write
+            except BaseException:
+                await asyncio.to_thread(shutil.rmtree, write.directory, True)
+                raise
+            if write.discarded:
+                await asyncio.to_thread(shutil.rmtree, write.directory, True)
+            else:
+                await asyncio.to_thread(self._publish, write.version)
+                logger.info(f"Published index {write.version} in {self.root}")
+            await asyncio.to_thread(self.collect)
+            self._release()
+        finally:
+            os.close(fd)
+
+    @contextlib.contextmanager
+    def locked(self, name: str) -> Iterator[None]:
+        """Hold an exclusive lock named ``name`` under the index root (blocking)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / f"{name}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def collect(self) -> list[str]:
+        """
+        Delete versions other than the published one that no process is reading.
+
+        Call with the write lock held, so a version being built is not collected.
+
+        Returns:
+            Names of the collected versions
+        """
+        current = self.current()
+        collected = []
+        if current is not None and index_directories(self.root) and self._remove(self.root):
+            collected.append("(unversioned)")
+        if self.versions_dir.is_dir():
+            for entry in sorted(os.scandir(self.versions_dir), key=lambda entry: entry.name):
+                if entry.name == current or not entry.is_dir():
+                    continue
+                if entry.name.startswith(".trash-"):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                elif self._remove(Path(entry.path)):
+                    collected.append(entry.name)
+        if collected:
+            self.collected += len(collected)
+            logger.info(f"Collected index versions {collected} in {self.root}")
+        return collected
+
+    def stats(self) -> dict[str, Any]:
+        versions = []
+        if self.versions_dir.is_dir():
+            versions = sorted(
+                entry.name
+                for entry in os.scandir(self.versions_dir)
+                if VERSION_PATTERN.match(entry.name)
+            )
+        return {
+            "current": self.current(),
+            "versions": versions,
+            "pinned": sorted(version or "(unversioned)" for version in self._pins),
+            "published": self.published,
+            "collected": self.collected,
+        }
+
+    def _pin(self, version: str | None) -> bool:
+        with self._lock:
+            if version in self._pins:
+                fd, count = self._pins[version]
+                self._pins[version] = (fd, count + 1)
+                return True
+            readers = self.directory(version) / READERS_FILENAME
+            try:
+                if version is None:
+                    self.root.mkdir(parents=True, exist_ok=True)
+                    fd = os.open(readers, os.O_RDWR | os.O_CREAT, 0o644)
+                else:
+                    fd = os.open(readers, os.O_RDWR)
+            except FileNotFoundError:
+                return False
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            # A newer version may have been published, and this one collected, since
+            # CURRENT was read
+            if not readers.exists() or (version is None and self.current() is not None):
+                os.close(fd)
+                return False
+            self._pins[version] = (fd, 1)
+            return True
+
+    def _unpin(self, version: str | None) -> None:
+        with self._lock:
+            fd, count = self._pins[version]
+            if count > 1:
+                self._pins[version] = (fd, count - 1)
+                return
+            del self._pins[version]
+            os.close(fd)
+        self._release()
+
+    def live(self) -> list[Path]:
+        """Directories of the published version and of versions this process reads."""
+        with self._lock:
+            versions = {self.current(), *self._pins}
+        return [self.directory(version) for version in versions]
+
+    def _release(self) -> None:
+        if self.on_release is not None:
+            self.on_release(self)
+
+    def _next_version(self) -> str:
+        numbers = [0]
+        if self.versions_dir.is_dir():
+            numbers += [
+                int(match.group(1))
+                for entry in os.scandir(self.versions_dir)
+                if (match := VERSION_PATTERN.match(entry.name))
+            ]
+        return f"v{max(numbers) + 1:06d}"
+
+    def _prepare(self, base: str | None, directory: Path) -> int:
+        directory.mkdir(parents=True)
+        (directory / READERS_FILENAME).touch()
+        source = self.directory(base)
+        return sum(replicate(path, directory / path.name) for path in index_directories(source))
+
+    def _publish(self, version: str) -> None:
+        tmp_path = self.root / f"{CURRENT_FILENAME}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.root / CURRENT_FILENAME)
+        dir_fd = os.open(self.root, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        self.published += 1
+
+    def _remove(self, directory: Path) -> bool:
+        """
+        Delete a version unless a process is reading it.
+
+        The exclusive lock keeps new readers out until the version is gone: it is
+        renamed aside before deletion, and for the unversioned index (the root)
+        the readers file is removed with the index files.
+        """
+        readers = directory / READERS_FILENAME
+        fd = os.open(readers, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        try:
+            readers.unlink()
+            if directory == self.root:
+                for path in index_directories(directory):
+                    shutil.rmtree(path, ignore_errors=True)
+                return True
+            trash = directory.with_name(f".trash-{directory.name}")
+            os.replace(directory, trash)
+        finally:
+            os.close(fd)
+        shutil.rmtree(trash, ignore_errors=True)
+        return True
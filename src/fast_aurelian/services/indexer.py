@@ -0,0 +1,511 @@
+"""
+Directory index builds for the PaperQA service.
+
+This mirrors ``paperqa.agents.search.get_directory_index`` for a single, flat paper
+directory, but reports per-file progress so long builds can be observed and keeps a
+file manifest next to the index so rebuilds only touch files that changed.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import zlib
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import anyio
+from aurelian.agents.paperqa.paperqa_tools import create_response, get_document_files
+from aviary.core import Message
+from lmi import EmbeddingModel
+from loguru import logger
+from paperqa import Docs
+from paperqa.agents.search import (
+    SearchIndex,
+    fetch_kwargs_from_manifest,
+    maybe_get_manifest,
+)
+from paperqa.clients import DEFAULT_CLIENTS, DocMetadataClient
+from paperqa.settings import Settings as PQASettings
+from paperqa.types import Doc, DocDetails, Text
+from paperqa.utils import ImpossibleParsingError, citation_to_docname, maybe_is_text
+
+from ..utils.embedding_cache import EmbeddingCache
+from .catalog import is_document
+from .embeddings import CachedEmbeddingModel
+from .parsing import bind_texts, parse_document
+
+MANIFEST_FILENAME = "files_manifest.json"
+# Citations supplied when papers were added, applied when they are indexed
+CITATIONS_FILENAME = "citations.json"
+
+ProgressCallback = Callable[[int, int], Any]
+
+
+@dataclass
+class ManifestEntry:
+    """What was indexed for one document file."""
+
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> dict[str, ManifestEntry]:
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning(f"Ignoring unreadable index manifest {path}")
+        return {}
+    return {name: ManifestEntry(**entry) for name, entry in data.get("files", {}).items()}
+
+
+def save_manifest(path: Path, manifest: dict[str, ManifestEntry]) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps({"files": {name: asdict(entry) for name, entry in sorted(manifest.items())}})
+    )
+    os.replace(tmp_path, path)
+
+
+def load_citations(path: Path) -> dict[str, str]:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning(f"Ignoring unreadable citations file {path}")
+        return {}
+
+
+def save_citations(path: Path, citations: dict[str, str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(citations, indent=1, sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+async def plan_changes(
+    paper_directory: Path,
+    rel_paths: list[str],
+    manifest: dict[str, ManifestEntry],
+    index_files: dict[str, str],
+) -> tuple[list[str], list[str], list[str], int]:
+    """
+    Compare the directory against the manifest and index.
+
+    Files whose size and mtime match their manifest entry are skipped without being
+    read; others are hashed, and only a content change marks them for re-indexing.
+    The manifest is updated in place for every file still present.
+
+    Returns:
+        (added, updated, removed, skipped_count)
+    """
+    added, updated = [], []
+    skipped = 0
+    for rel_path in rel_paths:
+        stat = (paper_directory / rel_path).stat()
+        entry = manifest.get(rel_path)
+        indexed = rel_path in index_files
+        if (
+            indexed
+            and entry is not None
+            and entry.size == stat.st_size
+            and entry.mtime_ns == stat.st_mtime_ns
+        ):
+            skipped += 1
+            continue
+
+        digest = await asyncio.to_thread(file_sha256, paper_directory / rel_path)
+        new_entry = ManifestEntry(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=digest)
+        if not indexed:
+            added.append(rel_path)
+        elif entry is not None and entry.sha256 != digest:
+            updated.append(rel_path)
+        else:
+            # Unchanged content, or indexed before the manifest existed
+            skipped += 1
+        manifest[rel_path] = new_entry
+
+    present = set(rel_paths)
+    removed = sorted(set(index_files) - present)
+    for rel_path in set(manifest) - present:
+        del manifest[rel_path]
+    return added, updated, removed, skipped
+
+
+async def add_parsed_document(
+    docs: Docs,
+    path: Path,
+    dockey: str,
+    texts: list[Text],
+    settings: PQASettings,
+    embedding_batch_size: int = 100,
+    embedding_model: EmbeddingModel | None = None,
+    citation: str | None = None,
+    docname: str | None = None,
+    title: str | None = None,
+    doi: str | None = None,
+    authors: list[str] | None = None,
+    **kwargs: Any,
+) -> str | None:
+    """
+    Add an already parsed and chunked document to a Docs collection.
+
+    This follows ``Docs.aadd`` from the citation step onwards, so the document is
+    parsed once (in a worker process) instead of once for the citation and again
+    for the chunks, and embeds chunks in batches of ``embedding_batch_size`` with
+    ``embedding_model`` (the settings' model when None).
+    """
+    parse_config = settings.parsing
+    if not texts:
+        raise ValueError(f"Could not read document {path}. Is it empty?")
+    kwargs.pop("dockey", None)
+
+    llm_model = settings.get_llm()
+    if citation is None:
+        result = await llm_model.call_single(
+            messages=[Message(content=parse_config.citation_prompt.format(text=texts[0].text))],
+        )
+        citation = str(result.text)
+        if len(citation) < 3 or "Unknown" in citation or "insufficient" in citation:
+            citation = f"Unknown, {path.name}, {datetime.now().year}"
+
+    docname = docs._get_unique_name(docname or citation_to_docname(citation))
+    doc: Doc = Doc(docname=docname, citation=citation, dockey=dockey)
+
+    if (doi is title is None) and parse_config.use_doc_details:
+        result = await llm_model.call_single(
+            messages=[
+                Message(content=parse_config.structured_citation_prompt.format(citation=citation))
+            ],
+        )
+        clean_text = "{" + str(result.text).split("{", 1)[-1].split("}", 1)[0] + "}"
+        try:
+            citation_json = json.loads(clean_text)
+            title = citation_json.get("title") or title
+            doi = citation_json.get("doi") or doi
+            authors = citation_json.get("authors") or authors
+        except (json.JSONDecodeError, AttributeError):
+            logger.warning(f"Failed to parse title, DOI and authors from {clean_text}")
+
+    if (title or doi) and parse_config.use_doc_details:
+        metadata_client = kwargs.pop("metadata_client", None) or DocMetadataClient(
+            session=kwargs.pop("session", None),
+            clients=kwargs.pop("clients", DEFAULT_CLIENTS),
+        )
+        query_kwargs: dict[str, Any] = {}
+        if doi:
+            query_kwargs["doi"] = doi
+        if authors:
+            query_kwargs["authors"] = authors
+        if title:
+            query_kwargs["title"] = title
+        doc = await metadata_client.upgrade_doc_to_doc_details(doc, **(query_kwargs | kwargs))
+
+    bind_texts(texts, doc)
+    if len(texts[0].text) < 10 or (
+        not parse_config.disable_doc_valid_check
+        and not maybe_is_text("".join(text.text for text in texts[:5]))
+    ):
+        raise ValueError(f"This does not look like a text document: {path}.")
+
+    embedding_model = embedding_model or settings.get_embedding_model()
+    if not parse_config.defer_embedding:
+        for start in range(0, len(texts), embedding_batch_size):
+            batch = texts[start : start + embedding_batch_size]
+            embeddings = await embedding_model.embed_documents([text.text for text in batch])
+            for text, embedding in zip(batch, embeddings, strict=True):
+                text.embedding = embedding
+
+    if await docs.aadd_texts(texts, doc, settings, embedding_model):
+        return doc.docname
+    return None
+
+
+async def index_file(
+    rel_path: str,
+    search_index: SearchIndex,
+    paperqa_manifest: dict[str, Any],
+    parse_slots: asyncio.Semaphore,
+    semaphore: anyio.Semaphore,
+    settings: PQASettings,
+    processed_counter: Counter[str],
+    parse_executor: Executor | None = None,
+    embedding_batch_size: int = 100,
+    progress_update: Callable[[], Any] | None = None,
+    embedding_model: EmbeddingModel | None = None,
+    citation: str | None = None,
+) -> None:
+    """
+    Parse, embed and add one document file to the search index.
+
+    This replaces ``paperqa.agents.search.process_file``. Parsing is bounded by
+    ``parse_slots`` and runs in ``parse_executor`` (or a thread when None); only the
+    LLM, embedding and index-write steps count against the index concurrency.
+    ``citation`` is used unless the PaperQA manifest provides one.
+    """
+    index_settings = settings.agent.index
+    abs_path = Path(index_settings.paper_directory).absolute() / rel_path
+    if index_settings.use_absolute_paper_directory:
+        file_location, manifest_fallback_location = str(abs_path), rel_path
+    else:
+        file_location, manifest_fallback_location = rel_path, str(abs_path)
+
+    parse_args = (
+        str(abs_path),
+        settings.parsing.chunk_size,
+        settings.parsing.overlap,
+        settings.parsing.page_size_limit,
+    )
+    tmp_docs = Docs()
+    try:
+        async with parse_slots:
+            if parse_executor is not None:
+                loop = asyncio.get_running_loop()
+                dockey, texts = await loop.run_in_executor(
+                    parse_executor, parse_document, *parse_args
+                )
+            else:
+                dockey, texts = await asyncio.to_thread(parse_document, *parse_args)
+
+        async with semaphore:
+            kwargs = fetch_kwargs_from_manifest(
+                file_location, paperqa_manifest, manifest_fallback_location
+            )
+            if citation and not kwargs.get("citation"):
+                kwargs["citation"] = citation
+            added = await add_parsed_document(
+                tmp_docs,
+                abs_path,
+                dockey,
+                texts,
+                settings,
+                embedding_batch_size=embedding_batch_size,
+                embedding_model=embedding_model,
+                fields=["title", "author", "journal", "year"],
+                **kwargs,
+            )
+            if not added:
+                raise ValueError(f"{file_location} was filtered out of the collection")
+
+            this_doc = next(iter(tmp_docs.docs.values()))
+            if isinstance(this_doc, DocDetails):
+                title = this_doc.title or abs_path.name
+                year = this_doc.year or "Unknown year"
+            else:
+                title, year = abs_path.name, "Unknown year"
+
+            await search_index.add_document(
+                {
+                    "title": title,
+                    "year": year,
+                    "file_location": file_location,
+                    "body": "".join(t.text for t in tmp_docs.texts),
+                },
+                document=tmp_docs,
+            )
+            processed_counter["batched_save_counter"] += 1
+            if processed_counter["batched_save_counter"] == index_settings.batch_size:
+                await search_index.save_index()
+                processed_counter["batched_save_counter"] = 0
+        logger.info(f"Indexed {file_location} ({title})")
+    except Exception as e:
+        # Record the failure so the file is not retried until it changes
+        logger.exception(f"Error parsing {file_location}, skipping index for this file.")
+        await search_index.mark_failed_document(file_location)
+        await search_index.save_index()
+        if not isinstance(e, ValueError | ImpossibleParsingError):
+            raise
+    finally:
+        if progress_update:
+            progress_update()
+
+
+def open_search_index(settings: PQASettings) -> SearchIndex:
+    """Open (without building) the search index described by the settings."""
+    index_settings = settings.agent.index
+    return SearchIndex(
+        fields=[*SearchIndex.REQUIRED_FIELDS, "title", "year"],
+        index_name=index_settings.name or settings.get_index_name(),
+        index_directory=index_settings.index_directory,
+    )
+
+
+async def save_empty_index(search_index: SearchIndex) -> None:
+    """
+    Commit an index whose last file has been removed.
+
+    PaperQA's ``save_index`` (and ``index_files``) reload the file table from disk
+    whenever it is empty, which would bring back the removed files, so the empty
+    table is written here.
+    """
+    async with search_index.writer(reset=True) as writer:
+        writer.commit()
+        writer.wait_merging_threads()
+    file_index_path = await search_index.file_index_filename
+    await file_index_path.write_bytes(zlib.compress(pickle.dumps({})))
+    search_index.changed = False
+
+
+async def build_directory_index(
+    settings: PQASettings,
+    progress: ProgressCallback | None = None,
+    parse_executor: Executor | None = None,
+    embedding_batch_size: int = 100,
+    embedding_cache: EmbeddingCache | None = None,
+    citations_path: Path | None = None,
+) -> dict[str, Any]:
+    """
+    Build or update the search index for a paper directory.
+
+    Args:
+        settings: PaperQA settings for the directory
+        progress: Optional callback receiving (files_done, files_total)
+        parse_executor: Process pool for parsing and chunking (threads if None)
+        embedding_batch_size: Number of chunks embedded per embedding call
+        embedding_cache: Optional cache consulted before embedding chunks
+        citations_path: Citations recorded when papers were added (next to the
+            manifest if None)
+
+    Returns:
+        Aurelian-style index response with document counts and, when a cache is
+        used, this build's embedding cache hit rate
+    """
+    paper_directory = str(settings.agent.index.paper_directory)
+    Path(paper_directory).mkdir(parents=True, exist_ok=True)
+    doc_files = get_document_files(paper_directory)
+
+    try:
+        search_index = open_search_index(settings)
+        manifest_path = Path(await search_index.index_directory) / MANIFEST_FILENAME
+        manifest = await asyncio.to_thread(load_manifest, manifest_path)
+        citations = await asyncio.to_thread(
+            load_citations, citations_path or manifest_path.with_name(CITATIONS_FILENAME)
+        )
+        rel_paths = sorted(name for name in doc_files["all"] if is_document(name))
+
+        added, updated, removed, skipped = await plan_changes(
+            Path(paper_directory), rel_paths, manifest, await search_index.index_files
+        )
+        changes = {
+            "added": len(added),
+            "updated": len(updated),
+            "removed": len(removed),
+            "skipped": skipped,
+        }
+        logger.info(f"Indexing {paper_directory}: {changes}")
+
+        for rel_path in removed + updated:
+            await search_index.remove_from_index(rel_path)
+
+        to_process = added + updated
+        total = len(to_process)
+        done = 0
+
+        def update_progress() -> None:
+            nonlocal done
+            done += 1
+            if progress:
+                progress(done, total)
+
+        if progress:
+            progress(0, total)
+        extra: dict[str, Any] = {}
+        if to_process:
+            paperqa_manifest = await maybe_get_manifest(
+                filename=await settings.agent.index.finalize_manifest_file()
+            )
+            semaphore = anyio.Semaphore(settings.agent.index.concurrency)
+            # Keep the pool busy without holding every parsed document in memory
+            parse_workers = getattr(parse_executor, "_max_workers", None) or os.cpu_count() or 1
+            parse_slots = asyncio.Semaphore(2 * parse_workers)
+            processed_counter: Counter[str] = Counter()
+            embedding_model = settings.get_embedding_model()
+            if embedding_cache is not None:
+                embedding_model = CachedEmbeddingModel.wrap(embedding_model, embedding_cache)
+            async with anyio.create_task_group() as tg:
+                for rel_path in to_process:
+                    tg.start_soon(
+                        index_file,
+                        rel_path,
+                        search_index,
+                        paperqa_manifest,
+                        parse_slots,
+                        semaphore,
+                        settings,
+                        processed_counter,
+                        parse_executor,
+                        embedding_batch_size,
+                        update_progress,
+                        embedding_model,
+                        citations.get(rel_path),
+                    )
+            if embedding_cache is not None:
+                await asyncio.to_thread(embedding_cache.flush)
+                extra["embedding_cache"] = embedding_model.stats()
+
+        if search_index.changed and not rel_paths:
+            await save_empty_index(search_index)
+        elif search_index.changed:
+            await search_index.save_index()
+        await asyncio.to_thread(save_manifest, manifest_path, manifest)
+        index_files = await search_index.index_files if rel_paths else {}
+    except Exception as e:
+        logger.exception(f"Error indexing {paper_directory}")
+        return create_response(
+            success=False,
+            paper_directory=paper_directory,
+            doc_files=doc_files,
+            message=f"Error indexing documents: {str(e)}",
+            error=str(e),
+        )
+
+    if not doc_files["all"]:
+        # Still reported as changes, so papers removed since the last build are published
+        return create_response(
+            success=True,
+            paper_directory=paper_directory,
+            doc_files=doc_files,
+            indexed_files={},
+            changes=changes,
+            message=f"No indexable documents found in {paper_directory}. Add documents (PDF, TXT, HTML, MD) to this directory before indexing.",
+        )
+
+    if not index_files:
+        return create_response(
+            success=True,
+            paper_directory=paper_directory,
+            doc_files=doc_files,
+            indexed_files={},
+            documents_found=doc_files,
+            changes=changes,
+            **extra,
+            message=f"Found {len(doc_files['all'])} documents but none were successfully indexed. This could be due to parsing issues with the documents.",
+        )
+
+    return create_response(
+        success=True,
+        paper_directory=paper_directory,
+        doc_files=doc_files,
+        indexed_files=index_files,
+        changes=changes,
+        **extra,
+        message=f"Successfully indexed {len(index_files)} document chunks from {len(doc_files['all'])} files.",
+    )
@@ -0,0 +1,281 @@
+"""
+Bulk paper ingestion: concurrent downloads into a paper directory with deduplication.
+
+Files are only written to the directory here; indexing them is left to a single
+index build afterwards.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+import httpx
+from loguru import logger
+
+from ..utils.download_store import DownloadStore, is_doi, source_url
+from ..utils.download_store import source_key as remote_source_key
+from .catalog import is_document
+from .indexer import ManifestEntry, file_sha256
+
+CONTENT_TYPE_SUFFIXES = {
+    "application/pdf": ".pdf",
+    "text/html": ".html",
+    "text/plain": ".txt",
+    "text/markdown": ".md",
+}
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+
+def is_remote(source: str) -> bool:
+    """Whether a source is downloaded (a URL or DOI) rather than a local file."""
+    return source.startswith(("http://", "https://")) or is_doi(source)
+
+
+def source_key(source: str, paper_directory: Path) -> str:
+    """Normalize a source so the same URL, DOI or file is recognized when repeated."""
+    if is_remote(source):
+        return remote_source_key(source)
+    return str(resolve_local_path(source, paper_directory))
+
+
+def resolve_local_path(source: str, paper_directory: Path) -> Path:
+    """Resolve a local path, trying the paper directory for relative paths first."""
+    path = Path(source).expanduser()
+    if not path.is_absolute() and (paper_directory / path).exists():
+        path = paper_directory / path
+    return path.resolve()
+
+
+def download_filename(url: str, content_type: str | None) -> str:
+    """Choose a file name for a download from its URL and content type."""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", unquote(Path(urlparse(url).path).name)).strip("._")
+    if not is_document(name):
+        media_type = (content_type or "").split(";")[0].strip().lower()
+        suffix = CONTENT_TYPE_SUFFIXES.get(media_type, ".pdf")
+        name = f"{name or 'paper'}{suffix}"
+    return name
+
+
+def known_digests(paper_directory: Path, manifest: dict[str, ManifestEntry]) -> dict[str, str]:
+    """
+    Map the content hash of every document already in a directory to its file name.
+
+    Hashes recorded in the index manifest are reused for files that have not
+    changed since; only new or modified files are read.
+    """
+    digests = {}
+    for path in paper_directory.iterdir():
+        if not path.is_file() or not is_document(path.name):
+            continue
+        stat = path.stat()
+        entry = manifest.get(path.name)
+        if entry is not None and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            digests.setdefault(entry.sha256, path.name)
+        else:
+            digests.setdefault(file_sha256(path), path.name)
+    return digests
+
+
+class BulkIngest:
+    """
+    Fetch many papers into one directory, each distinct document exactly once.
+
+    Sources are deduplicated by normalized URL, DOI or path before anything is
+    fetched, and by content hash as each download completes, against both the batch
+    and the files already in the directory. With a download store, remote sources
+    fetched before are linked in from it without a network request.
+    """
+
+    def __init__(
+        self,
+        paper_directory: Path,
+        client: httpx.AsyncClient,
+        digests: dict[str, str],
+        concurrency: int = 8,
+        max_file_size: int | None = None,
+        store: DownloadStore | None = None,
+    ):
+        self.paper_directory = paper_directory
+        self.client = client
+        self.digests = digests
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_file_size = max_file_size
+        self.store = store
+        self._reserved: set[str] = set()
+        # Serialises claims, which check and then take a file name from a thread
+        self._claim_lock = asyncio.Lock()
+
+    async def run(
+        self,
+        items: list[dict[str, Any]],
+        progress: Callable[[int, int], Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Fetch every item concurrently.
+
+        Args:
+            items: Dicts with a ``path`` (URL, DOI or local file) and optional ``citation``
+            progress: Optional callback receiving (items_done, items_total)
+
+        Returns:
+            One report per item, in input order, with a ``status`` of ``added``,
+            ``exists`` (content already in the directory), ``duplicate`` (of an
+            earlier item) or ``failed``
+        """
+        reports: list[dict[str, Any]] = [
+            {"index": position, "source": item["path"]} for position, item in enumerate(items)
+        ]
+        first_seen: dict[str, int] = {}
+        unique = []
+        for position, item in enumerate(items):
+            key = source_key(item["path"], self.paper_directory)
+            if key in first_seen:
+                reports[position].update(status="duplicate", duplicate_of=first_seen[key])
+            else:
+                first_seen[key] = position
+                unique.append(position)
+
+        done = len(items) - len(unique)
+        if progress:
+            progress(done, len(items))
+
+        async def fetch(position: int) -> None:
+            nonlocal done
+            source = items[position]["path"]
+            try:
+                async with self.semaphore:
+                    if is_remote(source):
+                        reports[position].update(await self._download(source))
+                    else:
+                        reports[position].update(await self._copy(source))
+            except Exception as e:
+                logger.warning(f"Could not add {source}: {e}")
+                reports[position].update(status="failed", error=str(e))
+            done += 1
+            if progress:
+                progress(done, len(items))
+
+        await asyncio.gather(*(fetch(position) for position in unique))
+
+        for position in unique:
+            report, citation = reports[position], items[position].get("citation")
+            if citation and report["status"] in ("added", "exists"):
+                report["citation"] = citation
+        for report in reports:
+            if report["status"] == "duplicate" and "file" not in report:
+                report["file"] = reports[report["duplicate_of"]].get("file")
+        return reports
+
+    async def _claim(
+        self, digest: str, name: str, place: Callable[[Path], str | None]
+    ) -> dict[str, Any]:
+        """
+        Place fetched content under a free file name unless the directory already has it.
+
+        Claims run one at a time, so concurrent fetches cannot claim the same content
+        or file name, and in a thread, since placing the content may copy it.
+
+        Args:
+            digest: Hex digest of the content
+            name: Preferred file name
+            place: Writes the content to the given path, optionally returning how
+        """
+        async with self._claim_lock:
+            return await asyncio.to_thread(self._claim_blocking, digest, name, place)
+
+    def _claim_blocking(
+        self, digest: str, name: str, place: Callable[[Path], str | None]
+    ) -> dict[str, Any]:
+        existing = self.digests.get(digest)
+        if existing is not None:
+            status = "duplicate" if existing in self._reserved else "exists"
+            return {"status": status, "file": existing, "sha256": digest}
+
+        stem, suffix = Path(name).stem, Path(name).suffix
+        candidate, attempt = name, 0
+        while candidate in self._reserved or (self.paper_directory / candidate).exists():
+            attempt += 1
+            candidate = f"{stem}-{attempt}{suffix}"
+        self._reserved.add(candidate)
+        self.digests[digest] = candidate
+        placement = place(self.paper_directory / candidate)
+        result = {"status": "added", "file": candidate, "sha256": digest}
+        if placement is not None:
+            result["placement"] = placement
+        return result
+
+    async def _download(self, source: str) -> dict[str, Any]:
+        if self.store is not None:
+            document = await asyncio.to_thread(self.store.lookup, source)
+            if document is not None:
+                result = await self._claim(
+                    document.sha256,
+                    document.filename,
+                    lambda target: self.store.place(document, target),
+                )
+                logger.info(f"Served {source} from the download store: {result['status']}")
+                return {**result, "bytes": document.size, "cached": True}
+
+        url = source_url(source)
+        # Download next to the final location so moving the file is a rename
+        tmp_dir = self.store.root if self.store is not None else self.paper_directory
+        tmp_path = tmp_dir / f".{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        size += len(chunk)
+                        if self.max_file_size is not None and size > self.max_file_size:
+                            raise ValueError(f"Download exceeds {self.max_file_size} bytes")
+                        digest.update(chunk)
+                        f.write(chunk)
+            name = download_filename(str(response.url), response.headers.get("content-type"))
+            if self.store is not None:
+                document = await asyncio.to_thread(
+                    self.store.add, [source, str(response.url)], tmp_path, digest.hexdigest(), name
+                )
+                result = await self._claim(
+                    document.sha256, name, lambda target: self.store.place(document, target)
+                )
+            else:
+                result = await self._claim(
+                    digest.hexdigest(), name, lambda target: os.replace(tmp_path, target)
+                )
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        logger.info(f"Downloaded {url} ({size} bytes): {result['status']} {result['file']}")
+        return {**result, "bytes": size, "cached": False}
+
+    async def _copy(self, source: str) -> dict[str, Any]:
+        path = resolve_local_path(source, self.paper_directory)
+        if not path.is_file():
+            raise FileNotFoundError(f"No such file: {source}")
+        if not is_document(path.name):
+            raise ValueError(f"Unsupported file type {path.suffix or '(none)'}: {source}")
+        digest = await asyncio.to_thread(file_sha256, path)
+        size = path.stat().st_size
+
+        if path.parent == self.paper_directory.resolve():
+            async with self._claim_lock:
+                self.digests.setdefault(digest, path.name)
+            return {"status": "exists", "file": path.name, "sha256": digest, "bytes": size}
+
+        tmp_path = self.paper_directory / f".{uuid.uuid4().hex}.part"
+        try:
+            await asyncio.to_thread(shutil.copyfile, path, tmp_path)
+            result = await self._claim(
+                digest, path.name, lambda target: os.replace(tmp_path, target)
+            )
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return {**result, "bytes": size}
@@ -0,0 +1,414 @@
+"""
+Background job queue for long-running PaperQA operations.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pydantic_core import to_jsonable_python
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+@dataclass
+class Job:
+    """A unit of background work and its observable state."""
+
+    kind: str
+    params: dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    files_done: int = 0
+    files_total: int | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+
+    @property
+    def duration(self) -> float | None:
+        if self.started_at is None:
+            return None
+        return round((self.finished_at or time.time()) - self.started_at, 3)
+
+    def update_progress(self, done: int, total: int) -> None:
+        """Progress callback handed to the job's runner."""
+        self.files_done = done
+        self.files_total = total
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["status"] = str(self.status)
+        data["duration"] = self.duration
+        data["progress"] = {
+            "files_done": data.pop("files_done"),
+            "files_total": data.pop("files_total"),
+        }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Job":
+        fields = {key: data[key] for key in cls.__dataclass_fields__ if key in data}
+        fields["status"] = JobStatus(fields.get("status", JobStatus.QUEUED))
+        return cls(**fields)
+
+
+class JobStore:
+    """
+    Persists job state in a sqlite file shared by every worker process.
+
+    The store, not any one process, holds the state of each job, so every worker
+    reports every job. A queued job is claimed by exactly one worker with a
+    conditional update, and the worker running a job refreshes its heartbeat;
+    jobs whose heartbeat stops (their worker died) are queued again.
+    """
+
+    def __init__(self, path: str | Path, retention: int = 500):
+        self.path = Path(path)
+        self.retention = retention
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+            # Stores created before jobs were claimed across processes lack these
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)"
+            )
+
+    @staticmethod
+    def _encode(job: Job) -> str:
+        return json.dumps(to_jsonable_python(asdict(job), fallback=str))
+
+    @staticmethod
+    def _decode(status: str, data: str) -> Job:
+        job = Job.from_dict(json.loads(data))
+        job.status = JobStatus(status)
+        return job
+
+    def add(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job.id, str(job.status), job.created_at, self._encode(job)),
+            )
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, data FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return None if row is None else self._decode(*row)
+
+    def list_jobs(self, status: str | None = None, limit: int = 100) -> list[Job]:
+        query = "SELECT status, data FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._conn.execute(
+                f"{query} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [self._decode(*row) for row in rows]
+
+    def claim(self, owner: str, stale_before: float) -> Job | None:
+        """
+        Claim the oldest queued job for a worker.
+
+        Running jobs whose heartbeat is older than ``stale_before`` are queued
+        again first. A job goes to whichever worker's update moves it out of
+        ``queued`` first, so no two workers run it.
+
+        Args:
+            owner: The claiming worker
+            stale_before: Heartbeat time below which running jobs are abandoned
+
+        Returns:
+            The claimed job, now running, or None when nothing is queued
+        """
+        with self._lock, self._conn:
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL"
+                " WHERE status = ? AND (heartbeat IS NULL OR heartbeat < ?)",
+                (str(JobStatus.QUEUED), str(JobStatus.RUNNING), stale_before),
+            ).rowcount
+            if requeued:
+                logger.warning(f"Queued {requeued} abandoned jobs again")
+            rows = self._conn.execute(
+                "SELECT status, data FROM jobs WHERE status = ? ORDER BY created_at LIMIT 8",
+                (str(JobStatus.QUEUED),),
+            ).fetchall()
+            for row in rows:
+                job = self._decode(*row)
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, heartbeat = ?, data = ?"
+                    " WHERE id = ? AND status = ?",
+                    (
+                        str(job.status),
+                        owner,
+                        job.started_at,
+                        self._encode(job),
+                        job.id,
+                        str(JobStatus.QUEUED),
+                    ),
+                ).rowcount
+                if claimed:
+                    return job
+        return None
+
+    def update(self, job: Job, owner: str) -> bool:
+        """
+        Record the state of a job a worker is running, refreshing its heartbeat.
+
+        Returns:
+            False when the worker no longer owns the job (it was queued again)
+        """
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, heartbeat = ?, data = ?"
+                " WHERE id = ? AND owner = ?",
+                (
+                    str(job.status),
+                    owner if job.status == JobStatus.RUNNING else None,
+                    time.time(),
+                    self._encode(job),
+                    job.id,
+                    owner,
+                ),
+            ).rowcount
+            if updated and job.status in FINISHED_STATUSES:
+                self._prune()
+        return bool(updated)
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a queued job.
+
+        Raises:
+            KeyError: No such job
+            ValueError: The job is no longer queued
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT status, data FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(job_id)
+            job = self._decode(*row)
+            job.status = JobStatus.CANCELLED
+            job.finished_at = time.time()
+            cancelled = self._conn.execute(
+                "UPDATE jobs SET status = ?, data = ? WHERE id = ? AND status = ?",
+                (str(job.status), self._encode(job), job_id, str(JobStatus.QUEUED)),
+            ).rowcount
+            if not cancelled:
+                raise ValueError(f"Job {job_id} is {row[0]} and can no longer be cancelled")
+            self._prune()
+        return job
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit."""
+        self._conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?, ?) AND id NOT IN ("
+            " SELECT id FROM jobs WHERE status IN (?, ?, ?)"
+            " ORDER BY created_at DESC LIMIT ?)",
+            (*map(str, FINISHED_STATUSES), *map(str, FINISHED_STATUSES), self.retention),
+        )
+
+
+JobRunner = Callable[[Job], Awaitable[Any]]
+
+
+def failure_message(result: Any) -> str | None:
+    """The error of a runner result reporting ``success: False``, else None."""
+    if isinstance(result, dict) and result.get("success") is False:
+        return str(result.get("message") or result.get("error") or "The job reported failure")
+    return None
+
+
+class JobManager:
+    """
+    Runs queued jobs on a bounded pool of asyncio workers.
+
+    Runners are registered per job kind and receive the job, whose
+    ``update_progress`` method they can pass along as a progress callback. Jobs
+    live in the store, so managers in several processes sharing one store file
+    split the queue between them and each reports every job. Without a store,
+    jobs are kept in memory for this process only.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        store: JobStore | None = None,
+        retention: int = 500,
+        lease: float = 60.0,
+        poll_interval: float = 1.0,
+    ):
+        self.workers = workers
+        self.store = store or JobStore(":memory:", retention=retention)
+        self.retention = retention
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.runners: dict[str, JobRunner] = {}
+        # Jobs this process is running, whose progress is newer than the store's
+        self.running: dict[str, Job] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._worker_tasks: list[asyncio.Task] = []
+
+    def register(self, kind: str, runner: JobRunner) -> None:
+        self.runners[kind] = runner
+
+    async def start(self) -> None:
+        """
+        Start the workers.
+
+        Work left queued by a previous process is picked up from the store; jobs
+        it was running are queued again once their heartbeat is ``lease`` seconds old.
+        """
+        if self._worker_tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, kind: str, **params: Any) -> Job:
+        """
+        Queue a job for background execution.
+
+        Args:
+            kind: Registered job kind
+            **params: JSON-serializable parameters for the runner
+
+        Returns:
+            The queued job
+        """
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+        await self.start()
+        job = Job(kind=kind, params=params)
+        await asyncio.to_thread(self.store.add, job)
+        self._wakeup.set()
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        if job_id in self.running:
+            return self.running[job_id]
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def list_jobs(self, status: str | None = None, limit: int = 100) -> list[Job]:
+        jobs = await asyncio.to_thread(self.store.list_jobs, status, limit)
+        return [self.running.get(job.id, job) for job in jobs]
+
+    async def cancel(self, job_id: str) -> Job:
+        """Cancel a queued job; jobs that already started cannot be cancelled."""
+        return await asyncio.to_thread(self.store.cancel, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim, self.owner, time.time() - self.lease)
+            if job is None:
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(self.poll_interval):
+                        await self._wakeup.wait()
+                continue
+            await self._run(job)
+
+    async def _heartbeat(self, job: Job, runner: asyncio.Task) -> None:
+        """
+        Keep a running job's claim alive and its progress visible to other workers.
+
+        Failed updates are retried until the lease runs out. Once the claim is lost
+        (the job was queued again, and maybe claimed by another worker) the runner
+        is cancelled, so this worker stops working on the job.
+        """
+        renewed = time.time()
+        while True:
+            await asyncio.sleep(min(self.poll_interval, self.lease / 4))
+            try:
+                if await asyncio.to_thread(self.store.update, job, self.owner):
+                    renewed = time.time()
+                    continue
+            except Exception:
+                logger.exception(f"Could not refresh the heartbeat of {job.kind} job {job.id}")
+                if time.time() - renewed < self.lease:
+                    continue
+            logger.warning(f"{job.kind} job {job.id} was queued again while running; abandoning it")
+            runner.cancel()
+            return
+
+    async def _run(self, job: Job) -> None:
+        self.running[job.id] = job
+        runner = asyncio.create_task(self.runners[job.kind](job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, runner))
+        try:
+            result = await runner
+            job.result = to_jsonable_python(result, fallback=str)
+            job.error = failure_message(result)
+            job.status = JobStatus.SUCCEEDED if job.error is None else JobStatus.FAILED
+        except asyncio.CancelledError:
+            if not asyncio.current_task().cancelling():
+                # The heartbeat lost the claim: the job is no longer this worker's to record
+                return
+            # Worker shutdown: leave the job queued so the next process picks it up
+            job.status = JobStatus.QUEUED
+            job.started_at = None
+            await asyncio.shield(asyncio.to_thread(self.store.update, job, self.owner))
+            raise
+        except Exception as e:
+            logger.exception(f"{job.kind} job {job.id} failed")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            heartbeat.cancel()
+            self.running.pop(job.id, None)
+        job.finished_at = time.time()
+        await asyncio.to_thread(self.store.update, job, self.owner)
+        logger.info(f"{job.kind} job {job.id} {job.status} in {job.duration}s")
@@ -0,0 +1,72 @@
+"""
+LLM call metrics collected from LiteLLM, which PaperQA uses for every model call.
+"""
+
+import litellm
+from litellm.integrations.custom_logger import CustomLogger
+
+from ..utils.metrics import AppMetrics
+from ..utils.tracing import get_tracer
+
+
+class LLMMetricsLogger(CustomLogger):
+    """Record the latency, outcome and token usage of each LiteLLM call."""
+
+    def __init__(self, metrics: AppMetrics):
+        super().__init__()
+        self.metrics = metrics
+
+    def _record(self, kwargs: dict, response_obj, start_time, end_time, outcome: str) -> None:
+        call_type = "embedding" if "embedding" in (kwargs.get("call_type") or "") else "completion"
+        usage = getattr(response_obj, "usage", None)
+        model = kwargs.get("model") or "unknown"
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        self.metrics.record_llm_call(
+            model=model,
+            call_type=call_type,
+            outcome=outcome,
+            duration=(end_time - start_time).total_seconds(),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+        # LiteLLM runs its callbacks in a task started by the call, so the caller's span is current
+        get_tracer().record(
+            f"llm {call_type}",
+            int(start_time.timestamp() * 1e9),
+            int(end_time.timestamp() * 1e9),
+            model=model,
+            outcome=outcome,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self._record(kwargs, response_obj, start_time, end_time, "success")
+
+    async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        # Usually None; a failure only counts tokens when LiteLLM reports a usage
+        self._record(kwargs, response_obj, start_time, end_time, "failure")
+
+
+def install_llm_metrics(metrics: AppMetrics) -> None:
+    """Register the metrics logger with LiteLLM once per process."""
+    if not any(isinstance(callback, LLMMetricsLogger) for callback in litellm.callbacks):
+        litellm.callbacks.append(LLMMetricsLogger(metrics))
+
+
+def record_agent_usage(metrics: AppMetrics, model: str, usage) -> None:
+    """
+    Record the model usage of a pydantic-ai agent run.
+
+    The agent calls its model directly rather than through LiteLLM, so its calls
+    are counted from the run's usage totals instead.
+    """
+    metrics.record_llm_call(
+        model=model,
+        call_type="agent",
+        outcome="success",
+        prompt_tokens=usage.request_tokens or 0,
+        completion_tokens=usage.response_tokens or 0,
+        calls=usage.requests,
+    )
@@ -0,0 +1,501 @@
+"""
+Offline stand-in and record/replay modes for the LLM and embedding APIs.
+
+PaperQA (through LiteLLM) and the pydantic-ai agent both reach OpenAI-compatible
+endpoints over httpx, so a provider mode is an httpx transport shared by their
+clients:
+
+- ``standin`` answers ``/chat/completions`` and ``/embeddings`` locally with
+  deterministic outputs after a simulated latency and token throughput
+- ``record`` forwards requests to the real API and saves every exchange
+- ``replay`` serves the saved exchanges byte for byte and never touches the network
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+import numpy as np
+from loguru import logger
+
+PROVIDER_MODES = ("live", "standin", "record", "replay")
+# Tools the stand-in calls in this order when offered: PaperQA's agent tools, then
+# Aurelian's query tool for the pydantic-ai agent
+TOOL_PLAN = ("paper_search", "gather_evidence", "gen_answer", "complete", "query_papers")
+# Response headers not replayed: the recorded body is already decoded and complete
+UNREPLAYED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+WORD_PATTERN = re.compile(r"\w+")
+# Random ids (PaperQA session ids, for one) that reach prompts through tool results
+UUID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def digest(data: bytes | str, size: int = 8) -> int:
+    if isinstance(data, str):
+        data = data.encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=size).digest(), "big")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def message_text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def hashed_embedding(text: str, ndim: int) -> list[float]:
+    """
+    Embed text as a normalized bag of hashed words.
+
+    Deterministic, and texts sharing words get similar vectors, so retrieval
+    over stand-in embeddings still ranks related chunks first.
+    """
+    vector = np.zeros(ndim, dtype=np.float32)
+    for word in WORD_PATTERN.findall(text.lower()):
+        h = digest(word)
+        vector[h % ndim] += 1.0 if h >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+def schema_value(schema: dict, text: str) -> Any:
+    """A value satisfying a JSON schema property, using ``text`` for strings."""
+    if "default" in schema:
+        return schema["default"]
+    options = schema.get("anyOf") or schema.get("oneOf") or []
+    if any(option.get("type") == "null" for option in options):
+        return None
+    if options:
+        return schema_value(options[0], text)
+    return {
+        "string": text,
+        "integer": schema.get("minimum", 1),
+        "number": float(schema.get("minimum", 1)),
+        "boolean": True,
+        "array": [],
+        "object": {},
+    }.get(schema.get("type"), text)
+
+
+def tool_arguments(parameters: dict, text: str) -> dict:
+    """Arguments for the required parameters of a tool, from its JSON schema."""
+    properties = parameters.get("properties", {})
+    return {
+        name: schema_value(properties.get(name, {}), text)
+        for name in parameters.get("required", [])
+    }
+
+
+class StandinTransport(httpx.AsyncBaseTransport):
+    """
+    Local OpenAI-compatible API with deterministic responses.
+
+    Completions echo a deterministic window of the prompt (or a JSON summary
+    when JSON is asked for) and drive agents through their tools in a fixed
+    order. Each response waits ``latency`` seconds, then produces its words
+    at ``tokens_per_second`` (streamed responses emit them one by one).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        tokens_per_second: float = 200.0,
+        embedding_dim: int = 1536,
+        completion_words: int = 48,
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.embedding_dim = embedding_dim
+        self.completion_words = completion_words
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        body = json.loads(await request.aread() or b"{}")
+        path = request.url.path
+        if path.endswith("/embeddings"):
+            return await self._embeddings(body)
+        if path.endswith("/chat/completions"):
+            return await self._chat(body)
+        return httpx.Response(
+            404, json={"error": {"message": f"The stand-in provider does not serve {path}"}}
+        )
+
+    async def _embeddings(self, body: dict) -> httpx.Response:
+        inputs = body.get("input")
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        texts = [text if isinstance(text, str) else " ".join(map(str, text)) for text in inputs]
+        ndim = body.get("dimensions") or self.embedding_dim
+        await asyncio.sleep(self.latency)
+        data = []
+        for position, text in enumerate(texts):
+            vector = hashed_embedding(text, ndim)
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode()
+            data.append({"object": "embedding", "index": position, "embedding": vector})
+        tokens = sum(count_tokens(text) for text in texts)
+        return httpx.Response(
+            200,
+            json={
+                "object": "list",
+                "data": data,
+                "model": body.get("model"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            },
+        )
+
+    def _reply(self, body: dict) -> dict:
+        """The assistant message for a chat request: a tool call or generated content."""
+        messages = body.get("messages", [])
+        prompt = "\n".join(message_text(message) for message in messages)
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        question = message_text(user_messages[0]) if user_messages else prompt
+        tools = {
+            tool["function"]["name"]: tool["function"].get("parameters", {})
+            for tool in body.get("tools") or []
+            if tool.get("type") == "function"
+        }
+        if tools:
+            called = {
+                call["function"]["name"]
+                for message in messages
+                for call in message.get("tool_calls") or []
+            }
+            name = next((t for t in TOOL_PLAN if t in tools and t not in called), None)
+            if name is None and (
+                body.get("tool_choice") == "required"
+                or any(t.startswith("final_result") for t in tools)
+            ):
+                name = next((t for t in tools if t.startswith("final_result")), next(iter(tools)))
+            if name is not None:
+                arguments = tool_arguments(tools[name], question[:200])
+                return {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": f"call_{digest(prompt + name):016x}",
+                            "type": "function",
+                            "function": {"name": name, "arguments": json.dumps(arguments)},
+                        }
+                    ],
+                }
+
+        last = message_text(user_messages[-1]) if user_messages else prompt
+        words = WORD_PATTERN.findall(last) or ["ok"]
+        start = digest(prompt) % max(1, len(words) - self.completion_words)
+        excerpt = " ".join(words[start : start + self.completion_words])
+        response_format = (body.get("response_format") or {}).get("type", "text")
+        system = " ".join(message_text(m) for m in messages if m.get("role") == "system")
+        if response_format != "text" or "JSON" in system:
+            content = json.dumps({"summary": excerpt, "relevance_score": digest(prompt) % 10 + 1})
+        else:
+            content = f"Stand-in answer: {excerpt}"
+        return {"role": "assistant", "content": content}
+
+    async def _chat(self, body: dict) -> httpx.Response:
+        message = self._reply(body)
+        content = message["content"] or json.dumps(message.get("tool_calls"))
+        prompt_tokens = count_tokens("\n".join(message_text(m) for m in body.get("messages", [])))
+        words = content.split(" ")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        }
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        completion_id = f"chatcmpl-standin-{digest(json.dumps(body, sort_keys=True)):016x}"
+        if body.get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=self._stream(body, completion_id, message, words, finish_reason, usage),
+            )
+
+        await asyncio.sleep(self.latency + self._generation_time(len(words)))
+        return httpx.Response(
+            200,
+            json={
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": 0,
+                "model": body.get("model"),
+                "choices": [
+                    {"index": i, "message": message, "finish_reason": finish_reason}
+                    for i in range(body.get("n") or 1)
+                ],
+                "usage": usage,
+            },
+        )
+
+    def _generation_time(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    async def _stream(
+        self,
+        body: dict,
+        completion_id: str,
+        message: dict,
+        words: list[str],
+        finish_reason: str,
+        usage: dict,
+    ) -> AsyncIterator[bytes]:
+        def chunk(delta: dict, finish: str | None = None, **extra) -> bytes:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body.get("model"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode()
+
+        await asyncio.sleep(self.latency)
+        if message.get("tool_calls"):
+            await asyncio.sleep(self._generation_time(len(words)))
+            calls = [{"index": i, **call} for i, call in enumerate(message["tool_calls"])]
+            yield chunk({"role": "assistant", "tool_calls": calls})
+        else:
+            yield chunk({"role": "assistant", "content": ""})
+            for position, word in enumerate(words):
+                await asyncio.sleep(self._generation_time(1))
+                yield chunk({"content": word if position == 0 else f" {word}"})
+        yield chunk({}, finish_reason)
+        if (body.get("stream_options") or {}).get("include_usage"):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body.get("model"),
+                "choices": [],
+                "usage": usage,
+            }
+            yield f"data: {json.dumps(payload)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+
+def exchange_key(request: httpx.Request, content: bytes) -> str:
+    """
+    Identify a request by its method, host, path and (canonicalized JSON) body.
+
+    Headers are left out, so recordings do not depend on API keys or client
+    versions, and UUIDs in the body are masked, since they differ between runs.
+    """
+    try:
+        body = json.dumps(json.loads(content), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        body = content.decode(errors="replace")
+    body = UUID_PATTERN.sub("<uuid>", body)
+    identity = f"{request.method} {request.url.host}{request.url.path}\n{body}"
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+class ExchangeLog:
+    """
+    Recorded exchanges, one JSON file per distinct request.
+
+    A request made repeatedly keeps each response in order; replay cycles
+    through them, so a recorded sequence plays back in the same order.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._positions: dict[str, int] = {}
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def add(self, key: str, request: httpx.Request, content: bytes, response: dict) -> None:
+        with self._lock:
+            path = self.path(key)
+            try:
+                record = json.loads(path.read_text())
+            except FileNotFoundError:
+                try:
+                    request_body = json.loads(content)
+                except ValueError:
+                    request_body = content.decode(errors="replace")
+                record = {
+                    "request": {
+                        "method": request.method,
+                        "url": str(request.url.copy_with(query=None)),
+                        "body": request_body,
+                    },
+                    "responses": [],
+                }
+            record["responses"].append(response)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_text(json.dumps(record, indent=1))
+            os.replace(tmp_path, path)
+
+    def next(self, key: str) -> dict | None:
+        with self._lock:
+            try:
+                responses = json.loads(self.path(key).read_text())["responses"]
+            except FileNotFoundError:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return responses[position % len(responses)]
+
+    def stats(self) -> dict[str, Any]:
+        files = list(self.directory.glob("*.json")) if self.directory.is_dir() else []
+        return {"directory": str(self.directory), "exchanges": len(files)}
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to the real API and record each exchange."""
+
+    def __init__(self, log: ExchangeLog, inner: httpx.AsyncBaseTransport | None = None):
+        self.log = log
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        response = await self.inner.handle_async_request(request)
+        # Read in full (streams included), so the exact bytes can be replayed
+        body = await response.aread()
+        await response.aclose()
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in UNREPLAYED_HEADERS
+        ]
+        key = exchange_key(request, content)
+        await asyncio.to_thread(
+            self.log.add,
+            key,
+            request,
+            content,
+            {
+                "status": response.status_code,
+                "headers": headers,
+                "body": base64.b64encode(body).decode(),
+            },
+        )
+        self.recorded += 1
+        return httpx.Response(response.status_code, headers=headers, content=body)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve recorded exchanges without network access."""
+
+    def __init__(self, log: ExchangeLog):
+        self.log = log
+        self.replayed = 0
+        self.missed = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = exchange_key(request, await request.aread())
+        recorded = await asyncio.to_thread(self.log.next, key)
+        if recorded is None:
+            self.missed += 1
+            logger.warning(f"No recorded exchange for {request.method} {request.url} ({key})")
+            # Not retried by the OpenAI client, unlike connection errors
+            return httpx.Response(
+                404,
+                json={
+                    "error": {
+                        "message": f"No recorded exchange {key} for this request; record it first",
+                        "type": "replay_miss",
+                    }
+                },
+            )
+        self.replayed += 1
+        return httpx.Response(
+            recorded["status"],
+            headers=[tuple(header) for header in recorded["headers"]],
+            content=base64.b64decode(recorded["body"]),
+        )
+
+
+_transport: httpx.AsyncBaseTransport | None = None
+
+
+def install_llm_provider(
+    mode: str,
+    recording_dir: str | Path,
+    agents: list | None = None,
+    **standin_options,
+) -> httpx.AsyncBaseTransport | None:
+    """
+    Route LiteLLM's and the agents' OpenAI calls through a provider mode, once per process.
+
+    Args:
+        mode: ``live`` (no change), ``standin``, ``record`` or ``replay``
+        recording_dir: Where ``record`` saves exchanges and ``replay`` reads them
+        agents: pydantic-ai agents whose ``openai:`` model is rerouted as well
+        **standin_options: ``StandinTransport`` settings
+
+    Returns:
+        The installed transport (None in live mode)
+    """
+    global _transport
+    if mode not in PROVIDER_MODES:
+        raise ValueError(f"Unknown LLM provider mode {mode!r}, expected one of {PROVIDER_MODES}")
+    if mode == "live" or _transport is not None:
+        return _transport
+
+    import litellm
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+    if mode == "standin":
+        _transport = StandinTransport(**standin_options)
+    elif mode == "record":
+        _transport = RecordingTransport(ExchangeLog(recording_dir))
+    else:
+        _transport = ReplayTransport(ExchangeLog(recording_dir))
+    if mode != "record":
+        # The OpenAI clients refuse to start without a key, though none is sent anywhere
+        os.environ.setdefault("OPENAI_API_KEY", f"{mode}-key")
+
+    client = httpx.AsyncClient(transport=_transport, timeout=httpx.Timeout(600.0))
+    litellm.aclient_session = client
+    for agent in agents or []:
+        model = agent.model
+        if isinstance(model, str) and model.startswith("openai:"):
+            agent.model = OpenAIModel(
+                model.split(":", 1)[1], provider=OpenAIProvider(http_client=client)
+            )
+        else:
+            logger.warning(f"Agent model {model} is not routed through the {mode} provider")
+    logger.info(f"LLM and embedding calls use the {mode} provider")
+    return _transport
+
+
+def provider_stats() -> dict[str, Any] | None:
+    """Request counts of the installed provider mode (None in live mode)."""
+    if _transport is None:
+        return None
+    if isinstance(_transport, StandinTransport):
+        return {"mode": "standin", "requests": _transport.requests}
+    if isinstance(_transport, RecordingTransport):
+        return {"mode": "record", "recorded": _transport.recorded, **_transport.log.stats()}
+    return {
+        "mode": "replay",
+        "replayed": _transport.replayed,
+        "missed": _transport.missed,
+        **_transport.log.stats(),
+    }
@@ -1,27 +1,231 @@
+import asyncio
+import bisect
+import contextlib
 import os
+import shutil
+import time
+import uuid
+from collections import Counter, OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field, replace
+from functools import cached_property
 from pathlib import Path
+from typing import Any
 
+import httpx
+import numpy as np
 from aurelian.agents.paperqa import (
     PaperQADependencies,
     add_paper,
     get_config,
     paperqa_agent,
-    query_papers,
-)
-from aurelian.agents.paperqa.paperqa_tools import (
-    build_index,
-    get_document_files,
-    list_papers,
-    search_papers,
 )
+from aurelian.agents.paperqa import paperqa_tools
+from lmi import EmbeddingModel
+from paperqa import Docs
+from paperqa.agents import search as paperqa_search
+from paperqa.agents.main import DEFAULT_AGENT_TYPE
+from paperqa.agents.main import run_agent as run_paperqa_agent
+from paperqa.agents.search import get_directory_index
 from paperqa.settings import IndexSettings
+from paperqa.settings import Settings as PQASettings
+from paperqa.types import Text
 
 from loguru import logger
-from pydantic_ai import RunContext
+from pydantic_ai import Agent, RunContext
+from pydantic_ai.messages import (
+    FunctionToolCallEvent,
+    FunctionToolResultEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+    TextPart,
+    TextPartDelta,
+)
+from pydantic_core import to_jsonable_python
+
+from ..config import get_settings
+from ..utils.async_helpers import SingleFlight
+from ..utils.cache import ResponseCache, make_cache_key
+from ..utils.download_store import DownloadStore
+from ..utils.embedding_cache import EmbeddingCache
+from ..utils.metrics import get_metrics
+from ..utils.responses import StaleCursorError
+from ..utils.streaming import EventStream
+from ..utils.tracing import Tracer, current_span, get_tracer, trace_agent_tools, traced
+from .adaptive import FULL_TIER, QueryTier, get_query_governor
+from .catalog import DOCUMENT_TYPES, DirectoryCatalog, document_type, index_exists
+from .embeddings import PrecomputedEmbeddingModel
+from .evidence import EvidenceIndex, QueryEmbeddings, embedding_key
+from .index_versions import IndexVersions
+from .indexer import (
+    CITATIONS_FILENAME,
+    MANIFEST_FILENAME,
+    ProgressCallback,
+    build_directory_index,
+    load_citations,
+    load_manifest,
+    open_search_index,
+    save_citations,
+)
+from .ingest import BulkIngest, is_remote, known_digests
+from .llm_metrics import install_llm_metrics, record_agent_usage
+from .llm_provider import install_llm_provider, provider_stats
+from .parsing import get_parse_executor
+from .snapshot_sources import snapshot_source_allowed
+from .snapshots import (
+    SNAPSHOT_FILENAME,
+    SNAPSHOT_SUFFIX,
+    Snapshot,
+    SnapshotError,
+    write_snapshot,
+)
 
 AURELIAN_AVAILABLE = True
 logger.info("Aurelian imports enabled")
 
+# Request parameters that map onto differently named PaperQADependencies fields
+QUERY_OVERRIDE_FIELDS = {
+    "max_sources": "answer_max_sources",
+    "temperature": "temperature",
+    "evidence_k": "evidence_k",
+}
+
+# Number of top-scoring evidence sources reported in each streamed evidence event
+STREAMED_SOURCES = 5
+
+NO_PAPERS_RESPONSE = {
+    "message": "No papers are currently indexed. You can add papers using the add_paper function.",
+    "papers": [],
+}
+
+
+@dataclass
+class ScopedPaperQADependencies(PaperQADependencies):
+    """PaperQA dependencies whose index location is pinned to their paper directory.
+
+    The stock dependencies resolve the index directory from ``PQA_HOME`` every time
+    settings are built, which forces callers to mutate the process environment.
+    Carrying the index directory on the dependencies keeps each context isolated.
+    """
+
+    index_directory: str | None = None
+
+    def set_paperqa_settings(self):
+        settings = super().set_paperqa_settings()
+        if self.index_directory:
+            settings.agent.index.index_directory = self.index_directory
+        # Indexes are built by index_papers; queries only read a published version
+        settings.agent.rebuild_index = False
+        return settings
+
+
+def listed_paper(name: str, indexed: dict[str, str]) -> dict[str, Any]:
+    """Describe a document in a paper directory and whether the index holds it."""
+    filehash = indexed.get(name)
+    if filehash is None:
+        index_status = "not_indexed"
+    elif filehash == paperqa_search.FAILED_DOCUMENT_ADD_ID:
+        index_status = "failed"
+    else:
+        index_status = "indexed"
+    return {
+        "file": name,
+        "type": document_type(name),
+        "index_status": index_status,
+    }
+
+
+def release_opened_indexes(versions: IndexVersions) -> None:
+    """
+    Drop PaperQA's cached tantivy indexes for versions this process no longer reads.
+
+    The cache keeps every opened index (and its memory maps of files that garbage
+    collection may have deleted) until it is removed from the cache.
+    """
+    root = versions.root.absolute()
+    live = {directory.absolute() for directory in versions.live()}
+    cache = paperqa_search._OPENED_INDEX_CACHE
+    for key, (_, count) in list(cache.items()):
+        # Keys hold <index directory>/<index name>/index
+        index_directory = Path(key[1]).parent.parent
+        if count <= 0 and index_directory.is_relative_to(root) and index_directory not in live:
+            del cache[key]
+
+
+@dataclass
+class PaperContext:
+    """Prebuilt PaperQA settings, dependencies and run context for one directory."""
+
+    directory: str
+    settings: PQASettings
+    deps: ScopedPaperQADependencies
+    ctx: RunContext
+    _versioned: tuple[str, "PaperContext"] | None = field(default=None, repr=False)
+
+    def with_overrides(self, **overrides) -> "PaperContext":
+        """
+        Return a per-call copy of this context with dependency fields overridden.
+
+        Args:
+            **overrides: PaperQADependencies field values to override
+
+        Returns:
+            A new context; the pooled context is left untouched
+        """
+        if not overrides:
+            return self
+        deps = replace(self.deps, **overrides)
+        return PaperContext(
+            directory=self.directory,
+            settings=deps.set_paperqa_settings(),
+            deps=deps,
+            ctx=RunContext(deps=deps, model=None, usage=None, prompt=None),
+        )
+
+    @cached_property
+    def index_versions(self) -> IndexVersions:
+        """Published versions of this directory's index, shared with other workers."""
+        return IndexVersions(self.deps.index_directory, on_release=release_opened_indexes)
+
+    def at_version(self, version: str | None) -> "PaperContext":
+        """
+        Get this context with its index pinned to one published version.
+
+        Args:
+            version: Version name, or None for the unversioned index
+
+        Returns:
+            A context reading that version (this context for None)
+        """
+        if version is None:
+            return self
+        if self._versioned is None or self._versioned[0] != version:
+            directory = self.index_versions.directory(version)
+            self._versioned = version, self.with_overrides(index_directory=str(directory))
+        return self._versioned[1]
+
+    @cached_property
+    def index_path(self) -> Path:
+        """Location of this directory's PaperQA search index."""
+        index = self.settings.agent.index
+        return Path(index.index_directory) / (index.name or self.settings.get_index_name())
+
+    def index_fingerprint(self) -> str:
+        """
+        Fingerprint the current index state from its file table and tantivy metadata.
+
+        Both files are rewritten whenever the index changes, so their size and mtime
+        are enough to tell one index state from another without reading them.
+        """
+        parts = []
+        for name in ("files.zip", "index/meta.json"):
+            try:
+                stat = (self.index_path / name).stat()
+                parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            except FileNotFoundError:
+                parts.append("-")
+        return "|".join(parts)
+
 
 def setup_and_configure_paper_directory(directory):
     """
@@ -35,123 +239,1521 @@ def setup_and_configure_paper_directory(directory):
     """
     directory = str(Path(directory).resolve())
 
-    config = get_config()
-    config.paper_directory = directory
-    config.workdir.location = directory
-
-    os.environ["PQA_HOME"] = directory
-
     if not os.path.exists(directory):
         logger.info(f"Creating paper directory: {directory}")
         os.makedirs(directory, exist_ok=True)
 
+    base_config = get_config()
+    config = ScopedPaperQADependencies(
+        workdir=base_config.workdir,
+        paper_directory=directory,
+        index_directory=str(Path(directory) / ".pqa" / "indexes"),
+    )
+    config.workdir.location = directory
+
     settings = config.set_paperqa_settings()
     settings.agent.index = IndexSettings(
         name=config.index_name,
         paper_directory=directory,
-        recurse_subdirectories=False
+        index_directory=config.index_directory,
+        recurse_subdirectories=False,
     )
 
     return directory, settings, config
 
 
+def build_paper_context(directory: str) -> PaperContext:
+    """Build an isolated PaperQA context for a paper directory."""
+    resolved, settings, config = setup_and_configure_paper_directory(directory)
+    return PaperContext(
+        directory=resolved,
+        settings=settings,
+        deps=config,
+        ctx=RunContext(deps=config, model=None, usage=None, prompt=None),
+    )
+
+
+class PaperContextPool:
+    """LRU pool of prebuilt PaperContexts keyed by resolved paper directory."""
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._contexts: OrderedDict[str, PaperContext] = OrderedDict()
+        # Maps directory strings as given by callers to their resolved key
+        self._aliases: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def __contains__(self, directory: str) -> bool:
+        return self._aliases.get(directory, directory) in self._contexts
+
+    def get(self, directory: str) -> PaperContext:
+        """
+        Get the context for a directory, building it on first use.
+
+        Args:
+            directory: Paper directory path (can be relative)
+
+        Returns:
+            The pooled context for the resolved directory
+        """
+        key = self._aliases.get(directory)
+        if key is not None and key in self._contexts:
+            self._contexts.move_to_end(key)
+            return self._contexts[key]
+
+        key = str(Path(directory).resolve())
+        context = self._contexts.get(key)
+        if context is None:
+            context = build_paper_context(key)
+            self._contexts[key] = context
+            logger.info(f"Built PaperQA context for {key}")
+            while len(self._contexts) > self.maxsize:
+                evicted, _ = self._contexts.popitem(last=False)
+                self._aliases = {k: v for k, v in self._aliases.items() if v != evicted}
+                logger.debug(f"Evicted PaperQA context for {evicted}")
+        self._contexts.move_to_end(key)
+        self._aliases[directory] = key
+        return context
+
+    def discard(self, directory: str) -> None:
+        """Drop the context for a directory so it is rebuilt on next use."""
+        key = self._aliases.get(directory) or str(Path(directory).resolve())
+        self._contexts.pop(key, None)
+        self._aliases = {k: v for k, v in self._aliases.items() if v != key}
+
+
+def stream_callbacks(stream: EventStream) -> dict:
+    """
+    Build PaperQA agent callbacks that report progress on an event stream.
+
+    Args:
+        stream: Stream receiving ``evidence``, ``answer_started`` and ``token`` events
+
+    Returns:
+        Mapping suitable for ``settings.agent.callbacks``
+    """
+
+    async def on_evidence(state) -> None:
+        contexts = sorted(state.session.contexts, key=lambda c: c.score, reverse=True)
+        stream.emit(
+            "evidence",
+            {
+                "status": state.status,
+                "evidence_count": len(contexts),
+                "relevant_count": len(state.get_relevant_contexts()),
+                "top_sources": [
+                    {"name": c.text.name, "citation": c.text.doc.citation, "score": c.score}
+                    for c in contexts[:STREAMED_SOURCES]
+                ],
+            },
+        )
+
+    async def on_answer_started(state) -> None:
+        stream.emit("answer_started", {"status": state.status})
+
+    def on_token(chunk: str, name: str | None = None) -> None:
+        stream.emit("token", {"text": chunk, "stage": name})
+
+    return {
+        "gather_evidence_completed": [on_evidence],
+        "gen_answer_initialized": [on_answer_started],
+        "gen_answer_aget_query": [on_token],
+    }
+
+
+def agent_stream_event(event) -> tuple[str, dict] | None:
+    """
+    Translate a pydantic-ai agent stream event into a streamed (event, data) pair.
+
+    Args:
+        event: Event from a model request or tool call node stream
+
+    Returns:
+        The pair to send, or None for events that are not reported
+    """
+    if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
+        return ("token", {"text": event.part.content}) if event.part.content else None
+    if isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
+        return ("token", {"text": event.delta.content_delta}) if event.delta.content_delta else None
+    if isinstance(event, FunctionToolCallEvent):
+        return (
+            "tool_call",
+            {
+                "tool": event.part.tool_name,
+                "arguments": event.part.args,
+                "tool_call_id": event.part.tool_call_id,
+            },
+        )
+    if isinstance(event, FunctionToolResultEvent):
+        return "tool_result", {"tool": event.result.tool_name, "tool_call_id": event.tool_call_id}
+    return None
+
+
+async def has_indexed_papers(settings: PQASettings) -> bool:
+    """Check whether the index for these settings exists and holds any files."""
+    try:
+        index = await get_directory_index(settings=settings, build=False)
+        return bool(await index.index_files)
+    except Exception as e:
+        if "was empty, please rebuild it" in str(e):
+            return False
+        raise
+
+
+async def answer_query(
+    query: str,
+    settings: PQASettings,
+    docs: Docs | None = None,
+    agent_type: str | type = DEFAULT_AGENT_TYPE,
+    **runner_kwargs,
+):
+    """
+    Answer a question with the PaperQA agent.
+
+    Unlike ``paperqa.agents.agent_query``, this does not record the answer in an
+    "answers" index next to the paper index. That index is rewritten after every
+    answer, so concurrent queries read it half-written, and writing it would
+    modify published index versions. The signatures match, so Aurelian's agent
+    tools answer with this too (see ``install_read_only_agent_tools``).
+
+    Args:
+        query: The question to answer
+        settings: PaperQA settings
+        docs: Documents to start from (none if omitted)
+        agent_type: PaperQA agent to run
+        **runner_kwargs: Passed on to the agent runner (callbacks, embedding model)
+
+    Returns:
+        The PaperQA answer response
+    """
+    docs = Docs() if docs is None else docs
+    tracer = get_tracer()
+    if not tracer.recording():
+        return await run_paperqa_agent(docs, query, settings, agent_type, **runner_kwargs)
+    with tracer.span("paperqa.agent", agent_type=settings.agent.agent_type) as span:
+        response = await run_paperqa_agent(
+            docs, query, settings, agent_type, **trace_agent_steps(tracer, runner_kwargs)
+        )
+        status = getattr(response, "status", None)
+        span.set(status=getattr(status, "value", status))
+        return response
+
+
+def install_read_only_agent_tools() -> None:
+    """
+    Make the PaperQA queries of Aurelian's agent tools leave the index untouched.
+
+    The ``query_papers`` and ``search_papers`` tools the full agent calls answer
+    with ``paperqa.agent_query``, which records each answer in the pinned index
+    version's "answers" index. They answer with ``answer_query`` instead.
+    """
+    paperqa_tools.agent_query = answer_query
+
+
+def trace_agent_steps(tracer: Tracer, runner_kwargs: dict) -> dict:
+    """
+    Add runner callbacks recording each PaperQA agent step as a ``tool`` span.
+
+    A step runs from the agent choosing its tools until the environment returns
+    their results; callbacks already in ``runner_kwargs`` still run.
+    """
+    on_action = runner_kwargs.get("on_agent_action_callback")
+    on_step = runner_kwargs.get("on_env_step_callback")
+    open_step = []
+
+    def close_step() -> None:
+        if open_step:
+            tracer.exit(*open_step.pop())
+
+    async def on_agent_action(action, *args) -> None:
+        close_step()
+        message = getattr(action, "value", action)
+        tools = [call.function.name for call in getattr(message, "tool_calls", None) or []]
+        open_step.append(tracer.enter(f"tool {','.join(tools) or 'none'}", tools=tools))
+        if on_action is not None:
+            await on_action(action, *args)
+
+    async def on_env_step(*args) -> None:
+        close_step()
+        if on_step is not None:
+            await on_step(*args)
+
+    return {
+        **runner_kwargs,
+        "on_agent_action_callback": on_agent_action,
+        "on_env_step_callback": on_env_step,
+    }
+
+
+async def query_with_progress(settings: PQASettings, query: str, stream: EventStream):
+    """
+    Answer a query with the PaperQA agent, reporting its tool calls on a stream.
+
+    Mirrors aurelian's ``query_papers`` tool, which offers no way to observe the run.
+
+    Args:
+        settings: PaperQA settings, with progress callbacks already installed
+        query: The question to answer
+        stream: Stream receiving ``tool_call`` events
+
+    Returns:
+        The PaperQA answer response, or a message when nothing is indexed
+    """
+    if not await has_indexed_papers(settings):
+        return NO_PAPERS_RESPONSE
+
+    async def on_agent_action(action, *_) -> None:
+        # ldp agents wrap the tool request message in an OpResult
+        message = getattr(action, "value", action)
+        for call in getattr(message, "tool_calls", None) or []:
+            stream.emit(
+                "tool_call", {"tool": call.function.name, "arguments": call.function.arguments}
+            )
+
+    return await answer_query(query, settings, on_agent_action_callback=on_agent_action)
+
+
 class PaperQAService:
     """Service for interacting with Aurelian PaperQA tools and agent."""
 
-    def __init__(self, default_paper_directory: str | None = None):
+    def __init__(self, default_paper_directory: str | None = None, pool_size: int | None = None):
         """Initialize the PaperQA service with a default config."""
         if not AURELIAN_AVAILABLE:
             raise RuntimeError("Aurelian PaperQA components are not available")
-            
+
         # Use single papers directory for ALL operations
-        default_dir = default_paper_directory if default_paper_directory else str(Path.cwd() / "papers")
-        
-        self.papers_dir, self.settings, self.config_deps = setup_and_configure_paper_directory(default_dir)
+        default_dir = (
+            default_paper_directory if default_paper_directory else str(Path.cwd() / "papers")
+        )
+
+        self.contexts = PaperContextPool(pool_size or get_settings().paperqa_context_pool_size)
+        default_context = self.contexts.get(default_dir)
+        self.papers_dir = default_context.directory
+        self.settings = default_context.settings
+        self.config_deps = default_context.deps
+        self.ctx = default_context.ctx
+
+        app_settings = get_settings()
+        self.answer_cache = (
+            ResponseCache(
+                maxsize=app_settings.answer_cache_size,
+                ttl=app_settings.answer_cache_ttl,
+                path=app_settings.answer_cache_path,
+            )
+            if app_settings.answer_cache_enabled
+            else None
+        )
+        self.metrics = get_metrics()
+        self._http_client: httpx.AsyncClient | None = None
+        self.download_store = None
+        if app_settings.download_store_enabled:
+            self.download_store = DownloadStore(
+                app_settings.download_store_dir or Path(self.papers_dir) / ".pqa" / "downloads",
+                max_bytes=app_settings.download_store_max_bytes,
+            )
+        install_llm_metrics(self.metrics)
+        install_read_only_agent_tools()
+        install_llm_provider(
+            app_settings.llm_provider,
+            app_settings.llm_recording_dir or Path(self.papers_dir) / ".pqa" / "llm_recordings",
+            agents=[paperqa_agent],
+            latency=app_settings.llm_standin_latency,
+            tokens_per_second=app_settings.llm_standin_tokens_per_second,
+            embedding_dim=app_settings.llm_standin_embedding_dim,
+            completion_words=app_settings.llm_standin_completion_words,
+        )
+        self.embedding_cache = None
+        if app_settings.embedding_cache_enabled:
+            self.embedding_cache = EmbeddingCache(
+                app_settings.embedding_cache_dir or Path(self.papers_dir) / ".pqa" / "embeddings",
+                max_entries=app_settings.embedding_cache_max_entries,
+            )
+        self.catalogs: OrderedDict[str, DirectoryCatalog] = OrderedDict()
+        # Per directory: the index state an evidence index was loaded from, and the index
+        self.evidence_indexes: OrderedDict[str, tuple[str, EvidenceIndex]] = OrderedDict()
+        self.evidence_flights = SingleFlight()
+        self.query_embeddings = QueryEmbeddings(app_settings.evidence_query_cache_size)
+        # Identical concurrent queries and index builds share one in-flight run
+        self.query_flights = SingleFlight()
+        self.index_flights = SingleFlight()
+        if get_tracer().enabled:
+            trace_agent_tools(paperqa_agent)
         logger.info(f"Aurelian PaperQA config: {self.config_deps}")
         logger.info(f"Papers directory: {self.papers_dir}")
-        self.ctx = RunContext(deps=self.config_deps, model=None, usage=None, prompt=None)
-
-    def _update_directory(self, paper_directory: str | None):
-        """Update the config directory if specified, otherwise use default."""
-        if paper_directory:
-            target_dir, settings, config_deps = setup_and_configure_paper_directory(paper_directory)
-            self.config_deps = config_deps
-            self.settings = settings
-            # Update the context with new dependencies
-            self.ctx = RunContext(deps=self.config_deps, model=None, usage=None, prompt=None)
-            logger.info(f"Using directory: {target_dir}")
-        else:
-            logger.info(f"Using default directory: {self.papers_dir}")
 
+    def _get_context(self, paper_directory: str | None) -> PaperContext:
+        """Get the pooled context for a directory, or for the default directory."""
+        context = self.contexts.get(paper_directory or self.papers_dir)
+        logger.debug(f"Using directory: {context.directory}")
+        return context
+
+    async def _get_catalog(self, context: PaperContext) -> DirectoryCatalog:
+        """Get the catalog following a directory, starting one on first use."""
+        catalog = self.catalogs.get(context.directory)
+        if catalog is None:
+            app_settings = get_settings()
+
+            async def load_index():
+                with self._reading(context) as current:
+                    return await open_search_index(current.settings).index_files
+
+            catalog = DirectoryCatalog(
+                context.directory,
+                lambda: context.at_version(context.index_versions.current()).index_fingerprint(),
+                load_index,
+                reconcile_interval=app_settings.catalog_reconcile_interval,
+                watch=app_settings.catalog_watch_enabled,
+            )
+            catalog.start()
+            self.catalogs[context.directory] = catalog
+            while len(self.catalogs) > self.contexts.maxsize:
+                _, evicted = self.catalogs.popitem(last=False)
+                await evicted.stop()
+        self.catalogs.move_to_end(context.directory)
+        return catalog
+
+    @contextlib.contextmanager
+    def _reading(self, context: PaperContext) -> Iterator[PaperContext]:
+        """
+        Pin a directory's published index version for the duration of a read.
+
+        A build publishing a new version meanwhile does not affect the read, and
+        the pinned version is not garbage collected until the read is done.
+        """
+        with context.index_versions.reading() as version:
+            yield context.at_version(version)
+
+    async def _refresh_catalog(self, context: PaperContext) -> None:
+        """Rescan a directory this service just wrote to, so listings show it at once."""
+        catalog = self.catalogs.get(context.directory)
+        if catalog is not None:
+            await catalog.reconcile()
+
+    async def _invalidate_answers(self, context: PaperContext) -> None:
+        """Drop cached answers for a directory after its collection changed."""
+        if self.answer_cache is not None:
+            await self.answer_cache.invalidate(context.directory)
+
+    def _query_context(
+        self, context: PaperContext, overrides: dict, tier: QueryTier = FULL_TIER
+    ) -> PaperContext:
+        """Resolve the per-call context for a query with answer settings overridden."""
+        fields = {
+            field: overrides[key]
+            for key, field in QUERY_OVERRIDE_FIELDS.items()
+            if overrides.get(key) is not None
+        }
+        return context.with_overrides(**fields, **tier.overrides(context.deps, fields))
+
+    @staticmethod
+    def _select_tier(route: str) -> QueryTier:
+        """Pick the adaptive tier for a query on a route (``full`` when adaptive tiers are off)."""
+        governor = get_query_governor()
+        tier = governor.select(route) if governor is not None else FULL_TIER
+        current_span().set(query_tier=tier.name)
+        return tier
+
+    @staticmethod
+    def _observe_tier(route: str, tier: QueryTier, started: float) -> None:
+        governor = get_query_governor()
+        if governor is not None:
+            governor.observe(route, tier, time.perf_counter() - started)
+
+    @staticmethod
+    def _with_tier(result: dict, tier: QueryTier, context: PaperContext) -> dict:
+        """Add the tier a query was answered at, and its effective settings, to a result."""
+        if get_query_governor() is None:
+            return result
+        return {
+            **result,
+            "query_tier": {
+                "name": tier.name,
+                "evidence_k": context.deps.evidence_k,
+                "answer_max_sources": context.deps.answer_max_sources,
+                "summary_llm": context.deps.summary_llm,
+                "llm": context.deps.llm,
+            },
+        }
+
+    @staticmethod
+    def _answer_cache_key(context: PaperContext, query: str, fingerprint: str) -> str:
+        return make_cache_key(
+            " ".join(query.split()).casefold(),
+            context.deps.answer_max_sources,
+            context.deps.temperature,
+            context.deps.evidence_k,
+            context.deps.llm,
+            context.deps.summary_llm,
+            fingerprint,
+        )
+
+    async def _cached_answer(self, context: PaperContext, query: str, cache_key: str):
+        if self.answer_cache is None:
+            return None
+        with get_tracer().span("answer_cache.get") as span:
+            cached = await self.answer_cache.get(context.directory, cache_key)
+            span.set(hit=cached is not None)
+        if cached is not None:
+            logger.info(f"Answer cache hit: {query} in {context.directory}")
+        return cached
+
+    @traced("paperqa.query", "paper_directory")
     async def query_papers(self, query: str, paper_directory: str | None = None, **kwargs):
         """Query indexed papers to answer a question."""
-        self._update_directory(paper_directory)
+        tier = self._select_tier("query")
+        with self._reading(self._get_context(paper_directory)) as current:
+            context = self._query_context(current, kwargs, tier)
+            cache_key = self._answer_cache_key(context, query, current.index_fingerprint())
+            cached = await self._cached_answer(context, query, cache_key)
+            if cached is not None:
+                return self._with_tier(cached, tier, context)
+
+            started = time.perf_counter()
+            try:
+                result = await self.query_flights.do(
+                    (context.directory, cache_key),
+                    lambda: self._run_query(context, query, cache_key),
+                )
+            finally:
+                self._observe_tier("query", tier, started)
+            return self._with_tier(result, tier, context)
+
+    async def stream_query(
+        self, query: str, paper_directory: str | None = None, **kwargs
+    ) -> AsyncIterator[tuple[str, object]]:
+        """
+        Query indexed papers, yielding progress events while the answer is generated.
+
+        Events are ``start``, ``tool_call``, ``evidence``, ``answer_started``,
+        ``token`` (answer text as the LLM produces it) and finally ``result`` with
+        the same payload ``query_papers`` returns. Closing the iterator cancels the
+        underlying PaperQA run.
+
+        Args:
+            query: The question to answer
+            paper_directory: Paper directory to query (default if omitted)
+            **kwargs: Answer settings overrides (max_sources, temperature, evidence_k)
+
+        Returns:
+            Async iterator of (event, data) pairs
+        """
+        tier = self._select_tier("stream")
+        with self._reading(self._get_context(paper_directory)) as current:
+            context = self._query_context(current, kwargs, tier)
+            cache_key = self._answer_cache_key(context, query, current.index_fingerprint())
+            yield "start", self._with_tier(
+                {"query": query, "directory": context.directory}, tier, context
+            )
+
+            cached = await self._cached_answer(context, query, cache_key)
+            if cached is not None:
+                yield "result", self._with_tier(cached, tier, context)
+                return
+
+            logger.info(f"Streaming query: {query} in {context.directory}")
+            stream = EventStream()
+            settings = context.deps.set_paperqa_settings()
+            settings.agent.callbacks = stream_callbacks(stream)
+            started = time.perf_counter()
+            answer_started = None
+            try:
+                async for event in stream.run(query_with_progress(settings, query, stream)):
+                    if event[0] == "answer_started" and answer_started is None:
+                        answer_started = time.perf_counter()
+                        self.metrics.stage_duration.labels("retrieval").observe(
+                            answer_started - started
+                        )
+                    yield event
+            finally:
+                self._observe_tier("stream", tier, started)
+            finished = time.perf_counter()
+            self.metrics.stage_duration.labels("answer").observe(finished - started)
+            if answer_started is not None:
+                self.metrics.stage_duration.labels("generation").observe(finished - answer_started)
+
+            result = to_jsonable_python(stream.result, fallback=str)
+            if self.answer_cache is not None:
+                await self.answer_cache.set(context.directory, cache_key, result)
+            yield "result", self._with_tier(result, tier, context)
+
+    async def query_batch(
+        self,
+        queries: list[str],
+        paper_directory: str | None = None,
+        concurrency: int | None = None,
+        **kwargs,
+    ) -> AsyncIterator[dict]:
+        """
+        Answer many questions against one collection, yielding results as they finish.
+
+        The directory context, PaperQA settings and index check are resolved once
+        for the whole batch, and the questions are embedded in a single call. At
+        most ``concurrency`` questions are answered at once; closing the iterator
+        cancels the ones still running.
 
-        if "max_sources" in kwargs:
-            self.config_deps.answer_max_sources = kwargs["max_sources"]
-        if "temperature" in kwargs:
-            self.config_deps.temperature = kwargs["temperature"]
-        if "evidence_k" in kwargs:
-            self.config_deps.evidence_k = kwargs["evidence_k"]
+        Args:
+            queries: Questions to answer
+            paper_directory: Paper directory to query (default if omitted)
+            concurrency: Maximum questions answered at once
+            **kwargs: Answer settings overrides shared by every question
 
-        logger.info(f"Querying papers: {query} in {self.config_deps.paper_directory}")
-        return await query_papers(self.ctx, query)
+        Returns:
+            Async iterator of per-question results in completion order, each
+            carrying the question's position in ``queries``
+        """
+        with self._reading(self._get_context(paper_directory)) as current:
+            async with contextlib.aclosing(
+                self._query_batch(current, queries, concurrency, kwargs)
+            ) as results:
+                async for item in results:
+                    yield item
 
+    async def _query_batch(
+        self,
+        current: PaperContext,
+        queries: list[str],
+        concurrency: int | None,
+        overrides: dict,
+    ) -> AsyncIterator[dict]:
+        tier = self._select_tier("batch")
+        context = self._query_context(current, overrides, tier)
+        fingerprint = current.index_fingerprint()
+        settings = context.deps.set_paperqa_settings()
+        keys = [self._answer_cache_key(context, query, fingerprint) for query in queries]
+        max_concurrency = get_settings().batch_query_concurrency
+        concurrency = min(concurrency or max_concurrency, max_concurrency)
+        logger.info(
+            f"Batch query: {len(queries)} questions in {context.directory} "
+            f"(concurrency {concurrency})"
+        )
+
+        pending = []
+        for position, (query, key) in enumerate(zip(queries, keys, strict=True)):
+            cached = await self._cached_answer(context, query, key)
+            if cached is not None:
+                yield {
+                    "index": position,
+                    "query": query,
+                    "success": True,
+                    "cached": True,
+                    "result": cached,
+                }
+            else:
+                pending.append(position)
+        if not pending:
+            return
+
+        if not await has_indexed_papers(settings):
+            for position in pending:
+                yield {
+                    "index": position,
+                    "query": queries[position],
+                    "success": True,
+                    "result": NO_PAPERS_RESPONSE,
+                }
+            return
+
+        embedding_model = settings.get_embedding_model()
+        started = time.perf_counter()
+        try:
+            embedding_model = await PrecomputedEmbeddingModel.for_texts(
+                embedding_model, [queries[position] for position in pending]
+            )
+            self.metrics.stage_duration.labels("batch_embedding").observe(
+                time.perf_counter() - started
+            )
+        except Exception as e:
+            logger.warning(f"Batch question embedding failed, embedding per question: {e}")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def answer(position: int) -> dict:
+            query = queries[position]
+            started = time.perf_counter()
+            try:
+                async with semaphore:
+                    result = await self.query_flights.do(
+                        (context.directory, keys[position]),
+                        lambda: self._run_batch_query(
+                            context, settings, embedding_model, query, keys[position]
+                        ),
+                    )
+                item = {
+                    "index": position,
+                    "query": query,
+                    "success": True,
+                    "cached": False,
+                    "result": result,
+                }
+            except Exception as e:
+                logger.error(f"Batch question {position} failed: {e}")
+                item = {"index": position, "query": query, "success": False, "error": str(e)}
+            finally:
+                self._observe_tier("batch", tier, started)
+            item["duration"] = round(time.perf_counter() - started, 3)
+            return self._with_tier(item, tier, context)
+
+        tasks = [asyncio.ensure_future(answer(position)) for position in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_batch_query(
+        self,
+        context: PaperContext,
+        settings: PQASettings,
+        embedding_model: EmbeddingModel,
+        query: str,
+        cache_key: str,
+    ):
+        """Answer one batch question with the batch's shared settings and embeddings."""
+        logger.info(f"Querying papers: {query} in {context.directory}")
+        started = time.perf_counter()
+        response = await answer_query(query, settings, embedding_model=embedding_model)
+        self.metrics.stage_duration.labels("answer").observe(time.perf_counter() - started)
+        with get_tracer().span("serialize"):
+            result = to_jsonable_python(response, fallback=str)
+        if self.answer_cache is not None:
+            await self.answer_cache.set(context.directory, cache_key, result)
+        return result
+
+    async def _run_query(self, context: PaperContext, query: str, cache_key: str):
+        """Run the PaperQA answer pipeline and cache its result."""
+        logger.info(f"Querying papers: {query} in {context.directory}")
+        started = time.perf_counter()
+        settings = context.deps.set_paperqa_settings()
+        if await has_indexed_papers(settings):
+            response = await answer_query(query, settings)
+        else:
+            response = NO_PAPERS_RESPONSE
+        self.metrics.stage_duration.labels("answer").observe(time.perf_counter() - started)
+        with get_tracer().span("serialize"):
+            result = to_jsonable_python(response, fallback=str)
+        if self.answer_cache is not None:
+            await self.answer_cache.set(context.directory, cache_key, result)
+        return result
+
+    @traced("paperqa.search_papers", "paper_directory", "max_papers")
     async def search_papers(
         self, query: str, paper_directory: str | None = None, max_papers: int | None = None
     ):
-        """Search for papers from the web and download them."""
-        self._update_directory(paper_directory)
-        return await search_papers(self.ctx, query, max_papers)
+        """
+        Find the indexed papers about a topic with the PaperQA agent.
+
+        Like Aurelian's ``search_papers`` tool, but reading the published index
+        only: an empty index is reported rather than built, and the answer is not
+        recorded in the index.
+        """
+        with self._reading(self._get_context(paper_directory)) as context:
+            settings = context.deps.set_paperqa_settings()
+            if max_papers is not None:
+                settings.agent.search_count = max_papers
+            if not await has_indexed_papers(settings):
+                return NO_PAPERS_RESPONSE
+            return await answer_query(f"Find scientific papers about: {query}", settings)
 
+    @traced("paperqa.evidence", "paper_directory", "limit", "offset", "keyword")
+    async def search_evidence(
+        self,
+        query: str,
+        paper_directory: str | None = None,
+        limit: int = 10,
+        offset: int = 0,
+        keyword: bool = False,
+        index_version: str | None = None,
+    ) -> dict:
+        """
+        Find the indexed chunks most relevant to a question, without generating an answer.
+
+        Chunks are ranked by the similarity of their stored embeddings to the
+        question's, optionally fused with a keyword search of the documents. No
+        LLM is called; the only network call is embedding a question not seen before.
+
+        Args:
+            query: The question to find evidence for
+            paper_directory: Paper directory to search (default if omitted)
+            limit: Chunks to return
+            offset: Chunks to skip from the top, for paging through the ranking
+            keyword: Also rank documents by a keyword search and fuse the rankings
+            index_version: Index version the page must come from, when continuing
+                a ranking from an earlier page
+
+        Returns:
+            One page of ranked chunks, the number of chunks ranked and paging details
+
+        Raises:
+            StaleCursorError: Another index version has been published since
+        """
+        started = time.perf_counter()
+        context = self._get_context(paper_directory)
+        with context.index_versions.reading() as version:
+            if index_version is not None and version != index_version:
+                raise StaleCursorError(
+                    "The index changed since the cursor was issued; start again without it"
+                )
+            current = context.at_version(version)
+            fingerprint = current.index_fingerprint()
+            timings = {}
+            results, total = [], 0
+            if index_exists(fingerprint):
+                evidence = await self._get_evidence_index(current, fingerprint)
+                total = len(evidence)
+                if total:
+                    step = time.perf_counter()
+                    query_vector = await self.query_embeddings.embed(current.settings, query)
+                    timings["embedding"] = time.perf_counter() - step
+                    keyword_ranks = None
+                    if keyword:
+                        step = time.perf_counter()
+                        keyword_ranks = await evidence.keyword_ranks(
+                            query, get_settings().evidence_keyword_documents
+                        )
+                        timings["keyword"] = time.perf_counter() - step
+                    step = time.perf_counter()
+                    results = evidence.rank(query_vector, limit, offset, keyword_ranks)
+                    timings["ranking"] = time.perf_counter() - step
+
+        duration = time.perf_counter() - started
+        self.metrics.stage_duration.labels("evidence").observe(duration)
+        timings["total"] = duration
+        next_offset = offset + len(results)
+        return {
+            "results": results,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": next_offset if next_offset < total else None,
+            "metadata": {
+                "query": query,
+                "directory": context.directory,
+                "index_version": version,
+                "keyword": keyword,
+                "timings_ms": {name: round(value * 1000, 3) for name, value in timings.items()},
+            },
+        }
+
+    async def _get_evidence_index(self, current: PaperContext, fingerprint: str) -> EvidenceIndex:
+        """Get the evidence index for a directory's pinned index version, loading it once."""
+        state = f"{current.index_path}|{fingerprint}"
+        cached = self.evidence_indexes.get(current.directory)
+        if cached is not None and cached[0] == state:
+            self.evidence_indexes.move_to_end(current.directory)
+            return cached[1]
+
+        async def load() -> EvidenceIndex:
+            search_index = open_search_index(current.settings)
+            snapshot_path = current.index_path.parent / SNAPSHOT_FILENAME
+            evidence, source = None, current.index_path
+            # A snapshot maps the chunks and embeddings instead of unpickling every document
+            if snapshot_path.is_file():
+                try:
+                    snapshot = await asyncio.to_thread(Snapshot, snapshot_path)
+                    evidence, source = snapshot.evidence_index(search_index), snapshot_path
+                except SnapshotError as e:
+                    logger.warning(f"Ignoring snapshot of {current.index_path}: {e}")
+            if evidence is None:
+                evidence = await EvidenceIndex.load(search_index)
+            logger.info(
+                f"Loaded {len(evidence)} chunks of {source} for evidence search "
+                f"in {evidence.load_time:.2f}s"
+            )
+            self.evidence_indexes[current.directory] = state, evidence
+            self.evidence_indexes.move_to_end(current.directory)
+            while len(self.evidence_indexes) > self.contexts.maxsize:
+                self.evidence_indexes.popitem(last=False)
+            return evidence
+
+        return await self.evidence_flights.do(state, load)
+
+    @traced("paperqa.query_federated", "paper_directories")
+    async def query_federated(
+        self,
+        query: str,
+        paper_directories: list[str],
+        shard_timeout: float | None = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Answer a question from several paper directories (shards) at once.
+
+        Each shard's index is searched concurrently for the chunks closest to the
+        question, the chunks are merged by score, and the best ``evidence_k`` of
+        them are summarized and answered from in a single PaperQA answer. Shards
+        that are missing or do not respond within ``shard_timeout`` seconds are
+        left out.
+
+        Args:
+            query: The question to answer
+            paper_directories: Paper directories to retrieve evidence from
+            shard_timeout: Seconds each shard may take (server default if omitted)
+            **kwargs: Answer settings overrides (max_sources, temperature, evidence_k)
+
+        Returns:
+            The PaperQA session, the merged evidence, a report per shard (status,
+            index version, chunks retrieved, duration) and stage timings
+        """
+        started = time.perf_counter()
+        tier = self._select_tier("federated")
+        context = self._query_context(self._get_context(None), kwargs, tier)
+        settings = context.deps.set_paperqa_settings()
+        evidence_k = settings.answer.evidence_k
+        timeout = shard_timeout or get_settings().federated_shard_timeout
+        directories = list(dict.fromkeys(str(Path(d).resolve()) for d in paper_directories))
+        logger.info(f"Federated query: {query} across {len(directories)} directories")
+
+        query_vector = await self.query_embeddings.embed(settings, query)
+        shards = await asyncio.gather(
+            *(
+                self._retrieve_shard(directory, query_vector, evidence_k, timeout)
+                for directory in directories
+            )
+        )
+        reports = [report for report, _ in shards]
+        hits = sorted(
+            (hit for _, shard_hits in shards for hit in shard_hits),
+            key=lambda hit: hit[0],
+            reverse=True,
+        )[:evidence_k]
+        retrieved = time.perf_counter()
+        self.metrics.stage_duration.labels("federated_retrieval").observe(retrieved - started)
+        if not hits:
+            self._observe_tier("federated", tier, started)
+            return self._with_tier({**NO_PAPERS_RESPONSE, "shards": reports}, tier, context)
+
+        # A paper held by several shards is added once, with its chunks from all of them
+        texts_by_doc: dict[str, dict[str, Text]] = {}
+        for _, text, _, _ in hits:
+            texts_by_doc.setdefault(text.doc.dockey, {}).setdefault(text.name, text)
+        docs = Docs()
+        for texts in texts_by_doc.values():
+            doc = next(iter(texts.values())).doc
+            for text in texts.values():
+                text.doc = doc
+            await docs.aadd_texts(list(texts.values()), doc, settings=settings)
+        embedding_model = PrecomputedEmbeddingModel(
+            name=self.query_embeddings.model(settings).name,
+            ndim=len(query_vector),
+            inner=self.query_embeddings.model(settings),
+            vectors={query: query_vector.tolist()},
+        )
+        session = await docs.aquery(query, settings=settings, embedding_model=embedding_model)
+        finished = time.perf_counter()
+        self.metrics.stage_duration.labels("answer").observe(finished - retrieved)
+        self._observe_tier("federated", tier, started)
+
+        result = {
+            "session": to_jsonable_python(session, fallback=str),
+            "evidence": [
+                {
+                    "directory": directory,
+                    "document": document,
+                    "chunk": text.name,
+                    "score": round(score, 6),
+                }
+                for score, text, directory, document in hits
+            ],
+            "shards": reports,
+            "timings": {
+                "retrieval": round(retrieved - started, 3),
+                "answer": round(finished - retrieved, 3),
+                "total": round(finished - started, 3),
+            },
+        }
+        return self._with_tier(result, tier, context)
+
+    async def _retrieve_shard(
+        self, directory: str, query_vector: np.ndarray, k: int, timeout: float
+    ) -> tuple[dict, list[tuple[float, Text, str, str]]]:
+        """
+        Retrieve a federated query's top chunks from one shard, within its timeout.
+
+        Returns:
+            The shard's report and its (score, chunk, directory, document) hits
+        """
+        started = time.perf_counter()
+        report = {"directory": directory, "status": "ok", "index_version": None, "chunks": 0}
+        hits = []
+        try:
+            # Checked first, since building a context would create the directory
+            if not Path(directory).is_dir():
+                report["status"] = "missing"
+            else:
+                version, evidence = await asyncio.wait_for(
+                    # A shard that times out keeps loading, so it is warm next time
+                    asyncio.shield(self._load_shard(directory)),
+                    timeout,
+                )
+                report["index_version"] = version
+                if evidence is None:
+                    report["status"] = "missing"
+                else:
+                    hits = [
+                        (score, evidence.text(position), directory, evidence.documents[position])
+                        for position, score in evidence.top(query_vector, k)
+                    ]
+        except TimeoutError:
+            report["status"] = "timeout"
+        except Exception as e:
+            logger.warning(f"Federated query skipped {directory}: {e}")
+            report["status"] = "failed"
+            report["error"] = str(e)
+        report["chunks"] = len(hits)
+        report["duration"] = round(time.perf_counter() - started, 3)
+        return report, hits
+
+    async def _load_shard(self, directory: str) -> tuple[str | None, EvidenceIndex | None]:
+        """Load a shard's evidence index (None without an index) and the version it is from."""
+        context = self._get_context(directory)
+        with context.index_versions.reading() as version:
+            current = context.at_version(version)
+            fingerprint = current.index_fingerprint()
+            if not index_exists(fingerprint):
+                return version, None
+            return version, await self._get_evidence_index(current, fingerprint)
+
+    @traced("paperqa.add_paper", "source", "paper_directory", "auto_index")
     async def add_paper(
         self,
         source: str,
         paper_directory: str | None = None,
         citation: str | None = None,
         auto_index: bool = True,
+        progress: ProgressCallback | None = None,
         **kwargs,
     ):
-        """Add a single paper from URL or local path."""
-        self._update_directory(paper_directory)
-        return await add_paper(self.ctx, source, citation, auto_index)
+        """Add a single paper from URL, DOI or local path."""
+        context = self._get_context(paper_directory)
+        if is_remote(source):
+            # Fetch through the download store so repeated adds need no network
+            item = (await self._ingest(context, [{"path": source, "citation": citation}]))[0]
+            if item["status"] == "failed":
+                logger.warning(f"Could not download {source} ({item['error']}), using Aurelian")
+            else:
+                source = str(Path(context.directory) / item["file"])
+        result = await add_paper(context.ctx, source, citation, auto_index=False)
+        await self._refresh_catalog(context)
+        await self._invalidate_answers(context)
+
+        if auto_index and result.get("success"):
+            index_result = await self._build_index(context, progress)
+            result["index_result"] = index_result
+            if index_result.get("success"):
+                result["message"] = (
+                    "Paper added and indexed successfully. "
+                    f"{index_result.get('indexed_chunks_count', 0)} documents now in the index."
+                )
+            else:
+                result["message"] = f"Paper added but indexing failed: {index_result.get('error')}"
+        return result
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get the download client, whose connection pool is shared by all bulk adds."""
+        if self._http_client is None:
+            app_settings = get_settings()
+            self._http_client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=app_settings.download_timeout,
+                limits=httpx.Limits(
+                    max_connections=app_settings.bulk_add_concurrency,
+                    max_keepalive_connections=app_settings.bulk_add_concurrency,
+                ),
+            )
+        return self._http_client
+
+    @traced("paperqa.add_papers", "paper_directory")
+    async def add_papers_bulk(
+        self,
+        papers: list[dict],
+        paper_directory: str | None = None,
+        auto_index: bool = True,
+        progress: ProgressCallback | None = None,
+    ):
+        """
+        Add many papers from URLs or paths, then index the directory once.
+
+        Downloads run concurrently through a shared connection pool. Repeated
+        sources and content already in the directory (or earlier in the batch)
+        are skipped, and citations are recorded for the index build to use.
+
+        Args:
+            papers: Dicts with a ``path`` (URL or local file) and optional ``citation``
+            paper_directory: Paper directory to add to (default if omitted)
+            auto_index: Index the directory after the papers were fetched
+            progress: Optional callback receiving (done, total) for the downloads
+                and then for the index build
+
+        Returns:
+            Per-item reports, counts by status and the index result
+        """
+        context = self._get_context(paper_directory)
+        started = time.perf_counter()
+        items = await self._ingest(context, papers, progress)
+        counts = Counter(item["status"] for item in items)
+        logger.info(
+            f"Bulk add to {context.directory}: {dict(counts)} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        result = {
+            "success": counts["failed"] < len(items),
+            "paper_directory": context.directory,
+            "counts": {
+                status: counts[status] for status in ("added", "exists", "duplicate", "failed")
+            },
+            "items": items,
+        }
+        if counts["added"]:
+            await self._refresh_catalog(context)
+            await self._invalidate_answers(context)
+            if auto_index:
+                result["index_result"] = await self._build_index(context, progress)
+        return result
+
+    async def _ingest(
+        self,
+        context: PaperContext,
+        papers: list[dict],
+        progress: ProgressCallback | None = None,
+    ) -> list[dict]:
+        """Fetch papers into a directory and record their citations for indexing."""
+        directory = Path(context.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._reading(context) as current:
+            manifest = await asyncio.to_thread(
+                load_manifest, current.index_path / MANIFEST_FILENAME
+            )
+        digests = await asyncio.to_thread(known_digests, directory, manifest)
+
+        app_settings = get_settings()
+        ingest = BulkIngest(
+            directory,
+            self._get_http_client(),
+            digests,
+            concurrency=app_settings.bulk_add_concurrency,
+            max_file_size=app_settings.bulk_add_max_file_size,
+            store=self.download_store,
+        )
+        items = await ingest.run(papers, progress)
+
+        citations = {item["file"]: item["citation"] for item in items if item.get("citation")}
+        if citations:
+            await asyncio.to_thread(self._record_citations, context, citations)
+        return items
+
+    @staticmethod
+    def _record_citations(context: PaperContext, citations: dict[str, str]) -> None:
+        """Merge citations into the directory's record, which outlives index versions."""
+        versions = context.index_versions
+        with versions.locked("citations"):
+            citations_path = versions.root / CITATIONS_FILENAME
+            save_citations(citations_path, {**load_citations(citations_path), **citations})
 
-    async def index_papers(self, paper_directory: str | None = None, **kwargs):
+    async def aclose(self) -> None:
+        """Close the download connection pool and stop following directories."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        for catalog in self.catalogs.values():
+            await catalog.stop()
+        self.catalogs.clear()
+
+    @traced("paperqa.index", "paper_directory")
+    async def index_papers(
+        self,
+        paper_directory: str | None = None,
+        progress: ProgressCallback | None = None,
+        **kwargs,
+    ):
         """Index local PDF files in a directory."""
-        self._update_directory(paper_directory)
-        return await build_index(self.ctx)
+        context = self._get_context(paper_directory)
+        return await self._build_index(context, progress)
+
+    async def _build_index(self, context: PaperContext, progress: ProgressCallback | None = None):
+        """Build a directory's index, joining a build already running for it."""
+        return await self.index_flights.do(
+            context.directory, lambda: self._run_index_build(context, progress)
+        )
+
+    async def _run_index_build(self, context: PaperContext, progress: ProgressCallback | None):
+        """
+        Build a new index version and publish it if anything changed.
+
+        Only one worker process builds a directory's index at a time; queries keep
+        reading the published version until the new one replaces it.
+        """
+        app_settings = get_settings()
+        versions = context.index_versions
+        started = time.perf_counter()
+        async with versions.writing() as write:
+            staging = context.with_overrides(index_directory=str(write.directory))
+            result = await build_directory_index(
+                staging.settings,
+                progress,
+                parse_executor=get_parse_executor(app_settings.index_parse_workers),
+                embedding_batch_size=app_settings.index_embedding_batch_size,
+                embedding_cache=self.embedding_cache,
+                citations_path=versions.root / CITATIONS_FILENAME,
+            )
+            changes = result.get("changes") or {}
+            if not result.get("success") or not any(
+                changes.get(kind) for kind in ("added", "updated", "removed")
+            ):
+                write.discard()
+        result["index_version"] = versions.current()
+        self.metrics.record_index_build(result, time.perf_counter() - started)
+        await self._invalidate_answers(context)
+        return result
+
+    @traced("paperqa.snapshot_build", "paper_directory")
+    async def build_snapshot(self, paper_directory: str | None = None) -> dict:
+        """
+        Pack a directory's published index version into a snapshot file.
+
+        The snapshot is written into the version's directory, so it is collected
+        with the version; evidence searches of the version read it from then on.
+
+        Args:
+            paper_directory: Paper directory whose index to pack (default if omitted)
+
+        Returns:
+            The snapshot's location, size and contents
+
+        Raises:
+            ValueError: The directory has no published index version
+        """
+        context = self._get_context(paper_directory)
+        with context.index_versions.reading() as version:
+            current = context.at_version(version)
+            fingerprint = current.index_fingerprint()
+            if version is None or not index_exists(fingerprint):
+                raise ValueError(f"{context.directory} has no published index to snapshot")
+            path = current.index_path.parent / SNAPSHOT_FILENAME
+            if path.is_file():
+                snapshot = await asyncio.to_thread(Snapshot, path)
+                header = {**snapshot.header, "size": path.stat().st_size}
+                snapshot.close()
+            else:
+                evidence = await self._get_evidence_index(current, fingerprint)
+                header = await asyncio.to_thread(
+                    write_snapshot,
+                    path,
+                    evidence,
+                    current.index_path,
+                    {
+                        "directory": context.directory,
+                        "index_version": version,
+                        "index_name": current.index_path.name,
+                        "embedding": embedding_key(current.settings),
+                    },
+                )
+                logger.info(
+                    f"Wrote {header['size']} byte snapshot of {context.directory} {version} "
+                    f"in {header['build_seconds']:.2f}s"
+                )
+        header.pop("sections", None)
+        return {**header, "path": str(path)}
+
+    def snapshot_path(self, paper_directory: str | None = None) -> Path | None:
+        """The snapshot of a directory's published index version, if one was built."""
+        context = self._get_context(paper_directory)
+        version = context.index_versions.current()
+        if version is None:
+            return None
+        path = context.index_versions.directory(version) / SNAPSHOT_FILENAME
+        return path if path.is_file() else None
+
+    @traced("paperqa.snapshot_load", "paper_directory")
+    async def load_snapshot(self, source: str, paper_directory: str | None = None) -> dict:
+        """
+        Publish a snapshot as a directory's new index version.
+
+        The snapshot is checked against its checksums, its index unpacked into a
+        new version and the file kept beside it for evidence search. Only the
+        index is replaced: papers are not part of a snapshot, so add them too
+        before indexing the directory again.
+
+        Args:
+            source: URL or local path of the snapshot
+            paper_directory: Paper directory to load into (default if omitted)
+
+        Returns:
+            The published version and the snapshot's contents
+
+        Raises:
+            PermissionError: The source is not under a configured snapshot source
+            SnapshotError: The file is not a valid snapshot
+            ValueError: The snapshot was embedded with another embedding model
+        """
+        started = time.perf_counter()
+        app_settings = get_settings()
+        if not snapshot_source_allowed(source, app_settings.snapshot_sources):
+            raise PermissionError(f"{source} is not under a configured snapshot source")
+        context = self._get_context(paper_directory)
+        versions = context.index_versions
+        versions.root.mkdir(parents=True, exist_ok=True)
+        path = Path(source).expanduser()
+        downloaded = None
+        try:
+            if is_remote(source):
+                # Download next to the versions so linking the file in needs no copy
+                downloaded = path = versions.root / f".{uuid.uuid4().hex}{SNAPSHOT_SUFFIX}.part"
+                # Sources are allowed by URL, so redirects elsewhere are not followed;
+                # replicas sharing an admin token can fetch each other's snapshots
+                headers = (
+                    {"X-Admin-Token": app_settings.admin_token} if app_settings.admin_token else {}
+                )
+                async with self._get_http_client().stream(
+                    "GET", source, headers=headers, follow_redirects=False
+                ) as response:
+                    response.raise_for_status()
+                    with open(path, "wb") as f:
+                        async for chunk in response.aiter_bytes(1 << 20):
+                            f.write(chunk)
+            elif not path.is_file():
+                raise FileNotFoundError(f"No snapshot at {source}")
 
+            snapshot = await asyncio.to_thread(Snapshot, path)
+            try:
+                await asyncio.to_thread(snapshot.verify)
+                expected = embedding_key(context.settings)
+                if snapshot.header.get("embedding") != expected:
+                    raise ValueError(
+                        f"Snapshot was embedded with {snapshot.header.get('embedding')} "
+                        f"but {context.directory} uses {expected}"
+                    )
+                async with versions.writing() as write:
+                    files = await asyncio.to_thread(
+                        self._install_snapshot,
+                        snapshot,
+                        path,
+                        write.directory / context.index_path.name,
+                    )
+                header = {k: v for k, v in snapshot.header.items() if k != "sections"}
+            finally:
+                snapshot.close()
+        finally:
+            if downloaded is not None:
+                downloaded.unlink(missing_ok=True)
+
+        await self._refresh_catalog(context)
+        await self._invalidate_answers(context)
+        duration = time.perf_counter() - started
+        logger.info(
+            f"Loaded snapshot of {header.get('directory')} {header.get('index_version')} "
+            f"into {context.directory} {write.version} in {duration:.2f}s"
+        )
+        return {
+            "directory": context.directory,
+            "index_version": write.version,
+            "files": files,
+            "load_seconds": round(duration, 3),
+            "snapshot": header,
+        }
+
+    @staticmethod
+    def _install_snapshot(snapshot: Snapshot, path: Path, index_path: Path) -> int:
+        """Replace a version's prepared index with a snapshot's, keeping the file beside it."""
+        shutil.rmtree(index_path, ignore_errors=True)
+        files = snapshot.extract_index(index_path)
+        target = index_path.parent / SNAPSHOT_FILENAME
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copy2(path, target)
+        return files
+
+    @traced("paperqa.list", "paper_directory")
     async def list_papers(self, paper_directory: str | None = None, **kwargs):
-        """List papers in the collection."""
-        self._update_directory(paper_directory)
-        return await list_papers(self.ctx)
+        """
+        List every paper in the collection, read from the directory's catalog.
+
+        Deprecated in favour of ``list_paper_page`` and ``iter_papers``: this
+        repeats the whole collection in several lists, as Aurelian's tool does.
+        """
+        context = self._get_context(paper_directory)
+        snapshot = await (await self._get_catalog(context)).snapshot()
+        documents, indexed = snapshot["documents"], snapshot["indexed"]
+        return paperqa_tools.create_response(
+            success=True,
+            paper_directory=context.directory,
+            doc_files=documents,
+            indexed_files=indexed,
+            message=f"Found {len(documents['all'])} documents and {len(indexed)} indexed chunks",
+            files_in_directory=documents["all"],
+            files_by_type={doc_type: documents[doc_type] for doc_type in DOCUMENT_TYPES},
+            note=(
+                "To search papers, they must be both in the paper directory AND indexed. "
+                "If there are files in the directory but not indexed, use the CLI command "
+                "'aurelian paperqa index -d <directory>' to index them."
+            ),
+        )
+
+    @traced("paperqa.list_page", "paper_directory", "limit")
+    async def list_paper_page(
+        self,
+        paper_directory: str | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """
+        List one page of the papers in the collection, read from the directory's catalog.
+
+        Papers are ordered by file name, so a page starting after the last file of
+        the previous one neither repeats nor skips papers when others are added.
+
+        Args:
+            paper_directory: Paper directory to list (default if omitted)
+            after: List only files whose names sort after this one
+            limit: Papers to list (all if omitted)
+
+        Returns:
+            The page of papers with their index status, the collection's counts, and
+            ``next_after`` (the last file listed) when more papers follow
+        """
+        context = self._get_context(paper_directory)
+        snapshot = await (await self._get_catalog(context)).snapshot()
+        documents, indexed = snapshot["documents"], snapshot["indexed"]
+        names = documents["all"]
+        start = bisect.bisect_right(names, after) if after is not None else 0
+        end = len(names) if limit is None else min(start + limit, len(names))
+        return {
+            "directory": context.directory,
+            "papers": [listed_paper(name, indexed) for name in names[start:end]],
+            "total": len(names),
+            "indexed_count": len(indexed),
+            "document_counts": {doc_type: len(documents[doc_type]) for doc_type in DOCUMENT_TYPES},
+            "index_exists": snapshot["index_exists"],
+            "next_after": names[end - 1] if start < end < len(names) else None,
+        }
+
+    async def iter_papers(self, paper_directory: str | None = None) -> AsyncIterator[dict]:
+        """Yield every paper in the collection with its index status, ordered by file name."""
+        context = self._get_context(paper_directory)
+        # Catalog snapshots are replaced rather than modified, so this one stays consistent
+        snapshot = await (await self._get_catalog(context)).snapshot()
+        indexed = snapshot["indexed"]
+        for name in snapshot["documents"]["all"]:
+            yield listed_paper(name, indexed)
 
+    def _agent_context(self, context: PaperContext, overrides: dict) -> PaperContext:
+        return context.with_overrides(
+            **{
+                key: value
+                for key, value in overrides.items()
+                if value is not None and hasattr(context.deps, key)
+            }
+        )
+
+    @traced("paperqa.run_agent", "paper_directory")
     async def run_agent(self, prompt: str, paper_directory: str | None = None, **kwargs):
         """Run the full PaperQA agent for complex operations."""
-        self._update_directory(paper_directory)
-        for key, value in kwargs.items():
-            if hasattr(self.config_deps, key):
-                setattr(self.config_deps, key, value)
+        with self._reading(self._get_context(paper_directory)) as current:
+            context = self._agent_context(current, kwargs)
+            started = time.perf_counter()
+            result = await paperqa_agent.run(prompt, deps=context.deps)
+        self._record_agent_run(result.usage(), time.perf_counter() - started)
+        return result
 
-        return await paperqa_agent.run(prompt, deps=self.config_deps)
+    async def stream_agent(
+        self, prompt: str, paper_directory: str | None = None, **kwargs
+    ) -> AsyncIterator[tuple[str, object]]:
+        """
+        Run the full PaperQA agent, yielding its output and tool calls as they happen.
 
-    async def get_status(self, paper_directory: str | None = None):
-        """Get status of paper collection."""
-        target_dir = Path(paper_directory) if paper_directory else self.default_paper_directory
+        Events are ``start``, ``token``, ``tool_call``, ``tool_result`` and finally
+        ``result`` with the agent's output. Closing the iterator cancels the run.
 
-        try:
-            doc_files = get_document_files(str(target_dir))
-            paper_count = len(doc_files.get("all", [])) if doc_files else 0
-            papers_found = doc_files.get("all", []) if doc_files else []
-        except Exception:
-            paper_count = 0
-            papers_found = []
+        Args:
+            prompt: The request for the agent
+            paper_directory: Paper directory to work in (default if omitted)
+            **kwargs: PaperQADependencies field overrides
+
+        Returns:
+            Async iterator of (event, data) pairs
+        """
+        with self._reading(self._get_context(paper_directory)) as current:
+            context = self._agent_context(current, kwargs)
+            yield "start", {"prompt": prompt, "directory": context.directory}
+
+            started = time.perf_counter()
+            async with paperqa_agent.iter(prompt, deps=context.deps) as run:
+                async for node in run:
+                    if not (Agent.is_model_request_node(node) or Agent.is_call_tools_node(node)):
+                        continue
+                    async with node.stream(run.ctx) as node_stream:
+                        async for event in node_stream:
+                            if (item := agent_stream_event(event)) is not None:
+                                yield item
+
+            self._record_agent_run(run.usage(), time.perf_counter() - started)
+            yield "result", to_jsonable_python(run.result.output, fallback=str)
+
+    def _record_agent_run(self, usage, duration: float) -> None:
+        self.metrics.stage_duration.labels("agent").observe(duration)
+        model = paperqa_agent.model
+        record_agent_usage(self.metrics, getattr(model, "model_name", None) or str(model), usage)
+
+    async def warm_up(self, paper_directory: str | None = None) -> dict:
+        """
+        Prepare a directory so its first query does not pay start-up costs.
+
+        Builds the directory's pooled context and opens its search index, which
+        also loads the index's file table into the page cache.
+
+        Args:
+            paper_directory: Paper directory to warm (default if omitted)
+
+        Returns:
+            The directory and whether it has indexed papers
+        """
+        context = self._get_context(paper_directory)
+        with context.index_versions.reading() as version:
+            current = context.at_version(version)
+            indexed = await has_indexed_papers(current.deps.set_paperqa_settings())
+        return {"directory": context.directory, "indexed": indexed, "index_version": version}
+
+    def get_stats(self):
+        """Get cache and request coalescing statistics for the service."""
+        return {
+            "answer_cache": self.answer_cache.stats() if self.answer_cache is not None else None,
+            "embedding_cache": (
+                self.embedding_cache.stats() if self.embedding_cache is not None else None
+            ),
+            "download_cache": (
+                self.download_store.stats() if self.download_store is not None else None
+            ),
+            "evidence_query_embeddings": self.query_embeddings.stats(),
+            "llm_provider": provider_stats(),
+            "adaptive_tiers": (
+                get_query_governor().stats() if get_query_governor() is not None else None
+            ),
+            "tracing": get_tracer().stats(),
+            "coalescing": {
+                "query": self.query_flights.stats(),
+                "index": self.index_flights.stats(),
+            },
+        }
+
+    @traced("paperqa.status", "paper_directory")
+    async def get_status(self, paper_directory: str | None = None):
+        """Get status of paper collection, read from the directory's catalog."""
+        context = self._get_context(paper_directory)
+        catalog = await self._get_catalog(context)
+        snapshot = await catalog.snapshot()
+        documents = snapshot["documents"]
 
         return {
-            "directory": str(target_dir),
-            "directory_exists": target_dir.exists(),
-            "paper_count": paper_count,
-            "index_exists": (target_dir / ".pqa").exists(),
+            "directory": context.directory,
+            "directory_exists": Path(context.directory).is_dir(),
+            "paper_count": len(documents["all"]),
+            "document_counts": {doc_type: len(documents[doc_type]) for doc_type in DOCUMENT_TYPES},
+            "indexed_count": len(snapshot["indexed"]),
+            "index_exists": snapshot["index_exists"],
             "aurelian_available": AURELIAN_AVAILABLE,
-            "papers_found": papers_found,
+            "catalog": catalog.stats(),
         }
@@ -0,0 +1,112 @@
+"""
+Document parsing for index builds, run in a pool of worker processes.
+
+Parsing PDFs, HTML and text into chunks is CPU-bound, so index builds hand it to a
+ProcessPoolExecutor. This module only imports what parsing needs, because every
+spawned worker imports it.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from loguru import logger
+from paperqa.readers import read_doc
+from paperqa.types import Doc, Text
+from paperqa.utils import md5sum
+
+# Chunk names embed the docname, which is only known after parsing
+PLACEHOLDER_DOCNAME = "__fast_aurelian_pending__"
+
+_executor: ProcessPoolExecutor | None = None
+
+
+@contextlib.contextmanager
+def lower_case_suffix(path: str) -> Iterator[str]:
+    """
+    Yield a path to a file that ends in the file's lower-case suffix.
+
+    PaperQA picks a parser by the file name, case-sensitively, so a file such as
+    ``PAPER.PDF`` is read through a temporary link named ``PAPER.pdf``.
+    """
+    root, suffix = os.path.splitext(path)
+    if suffix == suffix.lower():
+        yield path
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        link = os.path.join(directory, os.path.basename(root) + suffix.lower())
+        os.symlink(path, link)
+        yield link
+
+
+def parse_document(
+    path: str, chunk_chars: int, overlap: int, page_size_limit: int | None
+) -> tuple[str, list[Text]]:
+    """
+    Parse and chunk a document file.
+
+    Args:
+        path: Absolute path to the document
+        chunk_chars: Size of chunks
+        overlap: Overlap between chunks
+        page_size_limit: Optional limit on the number of characters per page
+
+    Returns:
+        (dockey, texts) with texts bound to a placeholder Doc; see bind_texts
+    """
+    dockey = md5sum(path)
+    with lower_case_suffix(path) as readable:
+        texts = asyncio.run(
+            read_doc(
+                readable,
+                Doc(docname=PLACEHOLDER_DOCNAME, citation="", dockey=dockey),
+                chunk_chars=chunk_chars,
+                overlap=overlap,
+                page_size_limit=page_size_limit,
+            )
+        )
+    return dockey, texts
+
+
+def bind_texts(texts: list[Text], doc: Doc) -> None:
+    """Point chunks parsed against the placeholder Doc at their real Doc."""
+    for text in texts:
+        text.doc = doc
+        text.name = text.name.replace(PLACEHOLDER_DOCNAME, doc.docname)
+
+
+def get_parse_executor(workers: int | None = None) -> Executor | None:
+    """
+    Get the shared parsing process pool, creating it on first use.
+
+    Args:
+        workers: Pool size; None uses every CPU, 0 disables the pool
+
+    Returns:
+        The process pool, or None when parsing should stay in-process
+    """
+    global _executor
+    if workers == 0:
+        return None
+    if _executor is not None and getattr(_executor, "_broken", False):
+        # A worker died (e.g. OOM on a huge PDF); start a fresh pool rather than failing every build
+        logger.warning("Parse pool is broken, replacing it")
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_parse_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
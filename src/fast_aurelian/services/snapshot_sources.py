@@ -0,0 +1,52 @@
+"""
+Snapshot errors and the sources snapshots may be loaded from.
+
+Kept apart from the snapshot format so the admin routes can use them without
+importing PaperQA.
+"""
+
+from pathlib import Path
+from urllib.parse import urlsplit
+
+REMOTE_SCHEMES = ("http", "https")
+
+
+class SnapshotError(Exception):
+    """Raised for a snapshot file that is malformed, corrupt or of another format."""
+
+
+def _under(path: str, base: str) -> bool:
+    base = base.rstrip("/")
+    return not base or path == base or path.startswith(f"{base}/")
+
+
+def snapshot_source_allowed(source: str, allowed: list[str]) -> bool:
+    """
+    Whether a snapshot may be loaded from a source.
+
+    A URL must have the scheme and host of an allowed URL and fall under its
+    path; a local path must resolve inside an allowed directory. Nothing is
+    allowed when ``allowed`` is empty.
+
+    Args:
+        source: URL or local path of the snapshot
+        allowed: Allowed URL prefixes and local directories
+    """
+    url = urlsplit(source)
+    if url.scheme in REMOTE_SCHEMES:
+        for prefix in allowed:
+            base = urlsplit(prefix)
+            if (
+                base.scheme in REMOTE_SCHEMES
+                and (url.scheme, url.netloc.lower()) == (base.scheme, base.netloc.lower())
+                and _under(url.path, base.path)
+            ):
+                return True
+        return False
+
+    path = Path(source).expanduser().resolve()
+    return any(
+        urlsplit(prefix).scheme not in REMOTE_SCHEMES
+        and path.is_relative_to(Path(prefix).expanduser().resolve())
+        for prefix in allowed
+    )
@@ -0,0 +1,335 @@
+"""
+Packed, checksummed snapshots of one index version, for fast cold starts and replication.
+
+A snapshot is a single file holding everything a replica needs to serve a
+collection: the PaperQA index itself (tantivy segments, document pickles and
+file table, as an uncompressed tar) plus the chunk texts, document metadata and
+normalized embedding matrix that evidence search ranks. Layout::
+
+    PQASNAP1                      magic
+    sections, each 64-byte aligned:
+      matrix                      float32 [chunks, dim], C order
+      chunk_docs                  int32 [chunks], row of each chunk's document
+      text_offsets                uint64 [chunks + 1], into ``texts``
+      texts                       one JSON object per chunk, without doc or embedding
+      docs                        JSON list of document names and metadata
+      index                       tar of the PaperQA index directory
+    header                        JSON: sizes, embedding model, section offsets and sha256
+    trailer                       header offset and length (uint64 each), then the magic
+
+Opening a snapshot memory-maps it and reads only the header and document
+table; matrix rows and chunk texts are read from the mapping when ranked or
+returned, so a snapshot serves evidence searches in milliseconds whatever its
+size, and worker processes share its pages.
+
+The index section holds pickled documents, as PaperQA's own index does, so
+snapshots are only loaded from the configured ``snapshot_sources``.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import tarfile
+import time
+import uuid
+from collections.abc import Iterator, Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+from paperqa.agents.search import SearchIndex
+from paperqa.types import Doc, DocDetails, Text
+
+from .evidence import EvidenceIndex
+from .snapshot_sources import SnapshotError
+
+SNAPSHOT_FILENAME = "snapshot.pqasnap"
+SNAPSHOT_SUFFIX = ".pqasnap"
+MAGIC = b"PQASNAP1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+TRAILER = struct.Struct("<QQ8s")
+DOC_TYPES = {"Doc": Doc, "DocDetails": DocDetails}
+# Left out of the packed index: per-process lock and reader files
+SKIPPED_SUFFIXES = (".lock", ".tmp")
+
+
+def packable(path: Path) -> bool:
+    name = path.name
+    return not (name.startswith((".tantivy-", ".readers")) or name.endswith(SKIPPED_SUFFIXES))
+
+
+def load_doc(doc: dict[str, Any]) -> Doc:
+    """Validate a document table entry as the document type it was written from."""
+    doc_type = DOC_TYPES.get(doc["type"])
+    if doc_type is None:
+        raise ValueError(f"unknown document type {doc['type']!r}")
+    return doc_type.model_validate(doc["data"])
+
+
+class SectionWriter:
+    """Writes aligned sections, recording their offsets, lengths and checksums."""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.sections: dict[str, dict[str, Any]] = {}
+
+    def _align(self) -> None:
+        padding = -self.f.tell() % ALIGNMENT
+        if padding:
+            self.f.write(b"\0" * padding)
+
+    def add(self, name: str, chunks: bytes | Iterator[bytes]) -> None:
+        self._align()
+        offset = self.f.tell()
+        digest = hashlib.sha256()
+        for chunk in [chunks] if isinstance(chunks, bytes | memoryview) else chunks:
+            digest.update(chunk)
+            self.f.write(chunk)
+        self.sections[name] = {
+            "offset": offset,
+            "length": self.f.tell() - offset,
+            "sha256": digest.hexdigest(),
+        }
+
+
+class _HashingWriter(io.RawIOBase):
+    """A write-only stream feeding a section, for tarfile to write into."""
+
+    def __init__(self, f: BinaryIO, digest):
+        self.f = f
+        self.digest = digest
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        return self.f.write(data)
+
+
+def write_snapshot(
+    path: Path, evidence: EvidenceIndex, index_path: Path, metadata: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Pack an index version and its loaded evidence index into one snapshot file.
+
+    The file is written next to ``path`` and renamed into place, so readers
+    only ever see complete snapshots.
+
+    Args:
+        path: Snapshot file to create
+        evidence: The version's evidence index
+        index_path: The version's PaperQA index directory
+        metadata: Recorded in the header (directory, version, embedding model, ...)
+
+    Returns:
+        The snapshot's header
+    """
+    started = time.perf_counter()
+    matrix = np.ascontiguousarray(evidence.matrix, dtype=np.float32)
+    doc_rows: dict[str, int] = {}
+    docs, chunk_docs, offsets, texts = [], [], [0], []
+    for text, document in zip(evidence.texts, evidence.documents, strict=True):
+        row = doc_rows.get(document)
+        if row is None:
+            row = doc_rows[document] = len(docs)
+            docs.append(
+                {
+                    "document": document,
+                    "type": type(text.doc).__name__,
+                    "data": text.doc.model_dump(mode="json"),
+                }
+            )
+        chunk_docs.append(row)
+        encoded = json.dumps(
+            text.model_dump(mode="json", exclude={"doc", "embedding"}), separators=(",", ":")
+        ).encode()
+        texts.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            writer = SectionWriter(f)
+            writer.add("matrix", memoryview(matrix).cast("B"))
+            writer.add("chunk_docs", np.asarray(chunk_docs, dtype=np.int32).tobytes())
+            writer.add("text_offsets", np.asarray(offsets, dtype=np.uint64).tobytes())
+            writer.add("texts", iter(texts))
+            writer.add("docs", json.dumps(docs, separators=(",", ":")).encode())
+
+            writer._align()
+            offset = f.tell()
+            digest = hashlib.sha256()
+            with tarfile.open(fileobj=_HashingWriter(f, digest), mode="w|") as tar:
+                for file in sorted(index_path.rglob("*")):
+                    if file.is_file() and packable(file):
+                        tar.add(file, arcname=str(file.relative_to(index_path)), recursive=False)
+            writer.sections["index"] = {
+                "offset": offset,
+                "length": f.tell() - offset,
+                "sha256": digest.hexdigest(),
+            }
+
+            header = {
+                "format": FORMAT_VERSION,
+                "created": datetime.now(UTC).isoformat(),
+                **metadata,
+                "chunks": int(matrix.shape[0]),
+                "dimensions": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+                "documents": len(docs),
+                "sections": writer.sections,
+            }
+            encoded = json.dumps(header, separators=(",", ":")).encode()
+            header_offset = f.tell()
+            f.write(encoded)
+            f.write(TRAILER.pack(header_offset, len(encoded), MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    header["size"] = path.stat().st_size
+    header["build_seconds"] = round(time.perf_counter() - started, 3)
+    return header
+
+
+class SnapshotTexts(Sequence):
+    """The chunks of a snapshot, decoded from the memory map when accessed."""
+
+    def __init__(self, snapshot: "Snapshot"):
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self.snapshot.chunks
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        return self.snapshot.text(position)
+
+
+class Snapshot:
+    """
+    A memory-mapped snapshot file.
+
+    Args:
+        path: The snapshot file
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.header = self._read_header()
+            sections = self.header["sections"]
+            self.chunks = self.header["chunks"]
+            dimensions = self.header["dimensions"]
+            self.matrix = self._array("matrix", np.float32).reshape(self.chunks, dimensions)
+            self.chunk_docs = self._array("chunk_docs", np.int32)
+            self.text_offsets = self._array("text_offsets", np.uint64)
+            self._texts_offset = sections["texts"]["offset"]
+            docs = json.loads(bytes(self.section("docs")))
+            self.document_names = [doc["document"] for doc in docs]
+            self.docs = [load_doc(doc) for doc in docs]
+        except SnapshotError:
+            self.close()
+            raise
+        except (KeyError, TypeError, ValueError) as e:
+            self.close()
+            raise SnapshotError(f"{self.path} is not a valid snapshot: {e}") from e
+
+    def _read_header(self) -> dict[str, Any]:
+        size = len(self._mmap)
+        if size < len(MAGIC) + TRAILER.size or self._mmap[: len(MAGIC)] != MAGIC:
+            raise SnapshotError(f"{self.path} is not a snapshot file")
+        header_offset, header_length, magic = TRAILER.unpack_from(self._mmap, size - TRAILER.size)
+        if magic != MAGIC or header_offset + header_length > size - TRAILER.size:
+            raise SnapshotError(f"{self.path} is truncated")
+        header = json.loads(self._mmap[header_offset : header_offset + header_length])
+        if header.get("format") != FORMAT_VERSION:
+            raise SnapshotError(f"{self.path} has unsupported format {header.get('format')}")
+        return header
+
+    def section(self, name: str) -> memoryview:
+        section = self.header["sections"][name]
+        end = section["offset"] + section["length"]
+        if end > len(self._mmap):
+            raise SnapshotError(f"Section {name} of {self.path} is truncated")
+        return memoryview(self._mmap)[section["offset"] : end]
+
+    def _array(self, name: str, dtype) -> np.ndarray:
+        section = self.header["sections"][name]
+        return np.frombuffer(
+            self._mmap,
+            dtype=dtype,
+            count=section["length"] // np.dtype(dtype).itemsize,
+            offset=section["offset"],
+        )
+
+    def verify(self) -> None:
+        """
+        Check every section against its checksum.
+
+        Raises:
+            SnapshotError: A section does not match
+        """
+        for name, section in self.header["sections"].items():
+            digest = hashlib.sha256()
+            with self.section(name) as data:
+                for start in range(0, len(data), 1 << 24):
+                    digest.update(data[start : start + (1 << 24)])
+            if digest.hexdigest() != section["sha256"]:
+                raise SnapshotError(f"Section {name} of {self.path} fails its checksum")
+
+    def text(self, position: int) -> Text:
+        """Decode one chunk (without its embedding, which is the matrix row)."""
+        start = self._texts_offset + int(self.text_offsets[position])
+        end = self._texts_offset + int(self.text_offsets[position + 1])
+        fields = json.loads(self._mmap[start:end])
+        return Text.model_construct(
+            **fields, doc=self.docs[self.chunk_docs[position]], embedding=None
+        )
+
+    def extract_index(self, target: Path) -> int:
+        """
+        Unpack the PaperQA index into a directory.
+
+        Returns:
+            Number of files extracted
+        """
+        target.mkdir(parents=True, exist_ok=True)
+        count = 0
+        with open(self.path, "rb") as f:
+            f.seek(self.header["sections"]["index"]["offset"])
+            with tarfile.open(fileobj=f, mode="r|") as tar:
+                for member in tar:
+                    if member.isfile():
+                        tar.extract(member, target, filter="data")
+                        count += 1
+        return count
+
+    def evidence_index(self, search_index: SearchIndex) -> EvidenceIndex:
+        """An evidence index reading chunks and embeddings from this snapshot."""
+        started = time.perf_counter()
+        names = np.asarray(self.document_names, dtype=object)
+        return EvidenceIndex(
+            search_index=search_index,
+            texts=SnapshotTexts(self),
+            documents=names[self.chunk_docs] if self.chunks else names[:0],
+            matrix=self.matrix,
+            load_time=time.perf_counter() - started,
+        )
+
+    def close(self) -> None:
+        # Arrays still viewing the map keep it alive until they are released
+        with contextlib.suppress(BufferError):
+            self._mmap.close()
@@ -0,0 +1,69 @@
+"""
+Background start-up work, tracked so readiness can be reported while it runs.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from loguru import logger
+
+WarmupStep = tuple[str, Callable[[], Awaitable[Any]]]
+
+
+class Warmup:
+    """
+    Runs named start-up steps in order and records how far they got.
+
+    The app serves requests (and ``/health``) while the steps run; ``ready`` only
+    turns true once every step has finished.
+    """
+
+    def __init__(self, steps: list[WarmupStep]):
+        self.steps = steps
+        self.status = "pending"
+        self.current: str | None = None
+        self.durations: dict[str, float] = {}
+        self.results: dict[str, Any] = {}
+        self.error: str | None = None
+        self.started_at: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    async def run(self) -> None:
+        self.status = "warming"
+        self.started_at = time.time()
+        for name, step in self.steps:
+            self.current = name
+            started = time.perf_counter()
+            try:
+                result = await step()
+            except asyncio.CancelledError:
+                self.status = "cancelled"
+                raise
+            except Exception as e:
+                logger.exception(f"Warm-up step {name} failed")
+                self.status = "failed"
+                self.error = f"{name}: {e}"
+                return
+            self.durations[name] = round(time.perf_counter() - started, 3)
+            # Steps report details for /ready by returning a dict
+            if isinstance(result, dict):
+                self.results[name] = result
+            logger.info(f"Warm-up step {name} finished in {self.durations[name]}s")
+        self.current = None
+        self.status = "ready"
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "current_step": self.current,
+            "steps": [name for name, _ in self.steps],
+            "durations": self.durations,
+            "results": self.results,
+            "error": self.error,
+        }
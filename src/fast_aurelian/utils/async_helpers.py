@@ -0,0 +1,84 @@
+"""
+Async utilities for Fast-Aurelian.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def _consume_result(task: asyncio.Task) -> None:
+    """Mark a task's exception as retrieved so orphaned failures are not logged."""
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it runs await
+    the same task instead of starting a duplicate. A waiter being cancelled does not
+    cancel the shared task unless it was the last one waiting on it.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` for ``key``, or join the run already in flight for it.
+
+        Args:
+            key: Identity of the work; equal keys are coalesced
+            fn: Zero-argument coroutine factory that performs the work
+
+        Returns:
+            The result of the shared run
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(_consume_result)
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            remaining = self._waiters.get(key, 1) - 1
+            if remaining > 0:
+                self._waiters[key] = remaining
+            else:
+                self._waiters.pop(key, None)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> dict[str, Any]:
+        """Get coalescing counters."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,199 @@
+"""
+Response caching utilities for Fast-Aurelian.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+_MISSING = object()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TTLCache:
+    """In-memory LRU cache whose entries also expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[(namespace, key)]
+            return default
+        self._entries.move_to_end((namespace, key))
+        return value
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str) -> int:
+        """Drop every entry in a namespace and return how many were removed."""
+        stale = [entry_key for entry_key in self._entries if entry_key[0] == namespace]
+        for entry_key in stale:
+            del self._entries[entry_key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteCache:
+    """On-disk cache tier backed by a single sqlite file, storing JSON values."""
+
+    def __init__(self, path: str | Path, ttl: float = 3600.0):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Caches written before keys were scoped to their namespace are dropped
+            primary_key = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(entries)") if row[5]
+            }
+            if primary_key == {"key"}:
+                self._conn.execute("DROP TABLE entries")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at < time.time():
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+            return default
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, default=str), time.time() + self.ttl),
+            )
+
+    def invalidate(self, namespace: str) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: an in-memory LRU+TTL tier backed by an optional sqlite tier.
+
+    Entries are grouped into namespaces (e.g. a paper directory) so that everything
+    derived from one collection can be invalidated at once.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600.0, path: str | Path | None = None):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteCache(path, ttl=ttl) if path else None
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, namespace: str, key: str) -> Any:
+        """
+        Look up a cached value.
+
+        Args:
+            namespace: Namespace the entry belongs to
+            key: Cache key within the namespace
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        value = self.memory.get(namespace, key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, namespace, key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.set(namespace, key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        """Store a JSON-serializable value in every tier."""
+        self.memory.set(namespace, key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, namespace, key, value)
+
+    async def invalidate(self, namespace: str) -> None:
+        """Drop every cached entry in a namespace from every tier."""
+        removed = self.memory.invalidate(namespace)
+        if self.disk is not None:
+            removed += await asyncio.to_thread(self.disk.invalidate, namespace)
+        if removed:
+            self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Get hit/miss counters for the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "memory_entries": len(self.memory),
+            "disk_enabled": self.disk is not None,
+        }
@@ -0,0 +1,251 @@
+"""
+Content-addressed store of downloaded documents, shared by every paper directory.
+"""
+
+import errno
+import fcntl
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urldefrag, urlparse
+
+# Linux ioctl cloning a file's extents (a reflink) on btrfs, xfs and similar
+FICLONE = 0x40049409
+DOI_HOSTS = {"doi.org", "dx.doi.org", "www.doi.org"}
+DOI_PATTERN = re.compile(r"^10\.\d{4,9}/\S+$")
+
+
+def source_key(source: str) -> str:
+    """
+    Key a source is stored under: ``doi:<doi>`` when it names a DOI (``doi:10.1/x``,
+    ``10.1/x`` or a doi.org URL), otherwise the URL without its fragment.
+    """
+    source = source.strip()
+    doi = None
+    if source.lower().startswith("doi:"):
+        doi = source[4:].strip()
+    elif DOI_PATTERN.match(source):
+        doi = source
+    else:
+        parsed = urlparse(source)
+        if parsed.hostname in DOI_HOSTS:
+            doi = unquote(parsed.path.lstrip("/"))
+    if doi:
+        return f"doi:{doi.lower()}"
+    return urldefrag(source)[0]
+
+
+def is_doi(source: str) -> bool:
+    return source_key(source).startswith("doi:")
+
+
+def source_url(source: str) -> str:
+    """The URL to download a source from, resolving DOIs through doi.org."""
+    key = source_key(source)
+    return f"https://doi.org/{key[4:]}" if key.startswith("doi:") else key
+
+
+@dataclass
+class StoredDocument:
+    sha256: str
+    filename: str
+    size: int
+    path: Path
+
+
+class DownloadStore:
+    """
+    Downloaded documents keyed by content hash, with a source → hash mapping.
+
+    Objects live under ``objects/<hash prefix>/`` and are placed into paper
+    directories as hardlinks (or reflinks, or copies across filesystems), so a
+    document shared by several collections is stored once. When the store grows
+    past ``max_bytes`` the least recently used objects are evicted; copies already
+    linked into paper directories are unaffected.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = 5 * 1024**3):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "store.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                " sha256 TEXT PRIMARY KEY,"
+                " filename TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                " key TEXT PRIMARY KEY,"
+                " sha256 TEXT NOT NULL REFERENCES objects (sha256) ON DELETE CASCADE)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sources_sha256 ON sources (sha256)")
+
+    def object_path(self, sha256: str, filename: str) -> Path:
+        return self.root / "objects" / sha256[:2] / f"{sha256}{Path(filename).suffix}"
+
+    def lookup(self, source: str) -> StoredDocument | None:
+        """Find the stored document for a URL or DOI, marking it as recently used."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT o.sha256, o.filename, o.size FROM sources s"
+                " JOIN objects o ON o.sha256 = s.sha256 WHERE s.key = ?",
+                (source_key(source),),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE objects SET last_used = ? WHERE sha256 = ?", (time.time(), row[0])
+                )
+        if row is None or not self.object_path(row[0], row[1]).exists():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return StoredDocument(row[0], row[1], row[2], self.object_path(row[0], row[1]))
+
+    def add(self, sources: list[str], tmp_path: Path, sha256: str, filename: str) -> StoredDocument:
+        """
+        Move a downloaded file into the store and map its sources to it.
+
+        Args:
+            sources: URLs or DOIs the content was fetched from, including redirects
+            tmp_path: The downloaded file, on the store's filesystem; it is moved
+                (or dropped if the content is already stored)
+            sha256: Hex digest of the file content
+            filename: Name to use when the document is placed in a paper directory
+
+        Returns:
+            The stored document
+        """
+        path = self.object_path(sha256, filename)
+        size = tmp_path.stat().st_size
+        path.parent.mkdir(exist_ok=True)
+        if path.exists():
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, path)
+        keys = {source_key(source) for source in sources}
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO objects (sha256, filename, size, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (sha256) DO UPDATE SET last_used = excluded.last_used",
+                (sha256, filename, size, now, now),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (key, sha256) VALUES (?, ?)",
+                [(key, sha256) for key in keys],
+            )
+        self.evict(keep=sha256)
+        return StoredDocument(sha256, filename, size, path)
+
+    def place(self, document: StoredDocument, target: Path) -> str:
+        """
+        Put a stored document at ``target`` without duplicating its data if possible.
+
+        Returns:
+            How it was placed: ``hardlink``, ``reflink`` or ``copy``
+        """
+        try:
+            os.link(document.path, target)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+        try:
+            with open(document.path, "rb") as src, open(target, "xb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except OSError:
+            target.unlink(missing_ok=True)
+        shutil.copyfile(document.path, target)
+        return "copy"
+
+    def evict(self, max_bytes: int | None = None, keep: str | None = None) -> dict[str, int]:
+        """
+        Remove least recently used objects until the store fits in ``max_bytes``.
+
+        Args:
+            max_bytes: Size to shrink to (the configured limit if None)
+            keep: Hash of an object that must not be evicted
+
+        Returns:
+            Number of objects and bytes evicted
+        """
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        evicted, freed = 0, 0
+        with self._lock, self._conn:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+            if total <= budget:
+                return {"evicted": 0, "bytes": 0}
+            rows = self._conn.execute(
+                "SELECT sha256, filename, size FROM objects ORDER BY last_used"
+            ).fetchall()
+            for sha256, filename, size in rows:
+                if total <= budget:
+                    break
+                if sha256 == keep:
+                    continue
+                self.object_path(sha256, filename).unlink(missing_ok=True)
+                self._conn.execute("DELETE FROM objects WHERE sha256 = ?", (sha256,))
+                total -= size
+                evicted += 1
+                freed += size
+        self.evictions += evicted
+        self.evicted_bytes += freed
+        return {"evicted": evicted, "bytes": freed}
+
+    def stats(self) -> dict[str, Any]:
+        """Lookup and eviction counters, cheap enough to report on every request."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+    def usage(self) -> dict[str, Any]:
+        """Report disk usage, sharing with paper directories and hit counters."""
+        with self._lock:
+            rows = self._conn.execute("SELECT sha256, filename, size FROM objects").fetchall()
+            sources = self._conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+        linked, linked_bytes = 0, 0
+        for sha256, filename, size in rows:
+            try:
+                links = self.object_path(sha256, filename).stat().st_nlink
+            except FileNotFoundError:
+                continue
+            if links > 1:
+                linked += 1
+                linked_bytes += size
+        total = sum(row[2] for row in rows)
+        return {
+            "root": str(self.root),
+            "objects": len(rows),
+            "sources": sources,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            # Objects also linked into a paper directory free no space when evicted
+            "linked_objects": linked,
+            "reclaimable_bytes": total - linked_bytes,
+            **self.stats(),
+        }
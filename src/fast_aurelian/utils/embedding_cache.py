@@ -0,0 +1,249 @@
+"""
+Content-addressed embedding cache stored as memory-mapped binary matrices.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from loguru import logger
+
+DIGEST_SIZE = 32
+# Fraction of max_entries evicted at once when a store is full
+EVICTION_FRACTION = 0.05
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode()).digest()
+
+
+class EmbeddingStore:
+    """
+    Embeddings of one model, keyed by the sha256 digest of the embedded text.
+
+    Three parallel memory-mapped arrays hold up to ``max_entries`` rows: float32
+    vectors, the digest owning each row (all zeros for a free row) and a logical
+    access clock used for least-recently-used eviction. The files are created
+    sparse, so disk usage follows the rows actually written.
+
+    Any number of processes may share a store. Lookups hold a shared lock and
+    writes an exclusive one on the store's lock file; each write bumps the
+    generation in ``meta.json``, and a process whose row table is from an older
+    generation rereads it before its next lookup or write.
+    """
+
+    def __init__(self, directory: Path, max_entries: int):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ndim: int | None = None
+        self.capacity = 0
+        self.count = 0
+        self.clock = 0
+        self.generation = 0
+        self.evictions = 0
+        self.rows: dict[bytes, int] = {}
+        self.free: list[int] = []
+        self._vectors: np.memmap | None = None
+        self._digests: np.memmap | None = None
+        self._access: np.memmap | None = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.directory / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._thread_lock = threading.Lock()
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    @contextlib.contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        """Hold the store's file lock (shared or exclusive) with the rows up to date."""
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, operation)
+            try:
+                self._refresh()
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Reread the row table if another process wrote since this one last read it."""
+        try:
+            meta = json.loads(self.meta_path.read_text())
+        except FileNotFoundError:
+            return
+        if meta.get("generation", 0) == self.generation and self.ndim is not None:
+            return
+        self.ndim = meta["ndim"]
+        self.count = meta["count"]
+        self.clock = max(self.clock, meta["clock"])
+        self.generation = meta.get("generation", 0)
+        if meta["capacity"] != self.capacity:
+            self._open(meta["capacity"])
+
+        digests = self._digests[: self.count]
+        used = np.flatnonzero(digests.any(axis=1))
+        self.rows = {bytes(digests[row]): int(row) for row in used}
+        self.free = sorted(set(range(self.count)) - set(self.rows.values()), reverse=True)
+
+    def _open(self, capacity: int) -> None:
+        """Map the files with room for ``capacity`` rows, growing them if needed."""
+        for name, row_bytes in (
+            ("vectors.f32", 4 * self.ndim),
+            ("digests.bin", DIGEST_SIZE),
+            ("access.i64", 8),
+        ):
+            path = self.directory / name
+            path.touch()
+            if path.stat().st_size < capacity * row_bytes:
+                os.truncate(path, capacity * row_bytes)
+        self._vectors = np.memmap(
+            self.directory / "vectors.f32", np.float32, "r+", shape=(capacity, self.ndim)
+        )
+        self._digests = np.memmap(
+            self.directory / "digests.bin", np.uint8, "r+", shape=(capacity, DIGEST_SIZE)
+        )
+        self._access = np.memmap(self.directory / "access.i64", np.int64, "r+", shape=(capacity,))
+        self.capacity = capacity
+
+    def get_many(self, digests: list[bytes]) -> list[np.ndarray | None]:
+        """Look up vectors by text digest, marking hits as recently used."""
+        found: list[np.ndarray | None] = []
+        with self._locked(fcntl.LOCK_SH):
+            for digest in digests:
+                row = self.rows.get(digest)
+                if row is None:
+                    found.append(None)
+                    continue
+                # Access times are advisory, so concurrent readers may write them
+                self.clock += 1
+                self._access[row] = self.clock
+                found.append(np.array(self._vectors[row]))
+        return found
+
+    def put_many(self, digests: list[bytes], vectors: list[list[float]]) -> None:
+        """Store vectors under their text digests, evicting old entries when full."""
+        with self._locked(fcntl.LOCK_EX):
+            if self.ndim is not None and self.capacity < self.max_entries:
+                self._open(self.max_entries)
+            self._evict_to(self.max_entries)
+            for digest, vector in zip(digests, vectors, strict=True):
+                if digest in self.rows:
+                    continue
+                if self.ndim is None:
+                    self.ndim = len(vector)
+                    self._open(self.max_entries)
+                if len(vector) != self.ndim:
+                    raise ValueError(f"Expected {self.ndim}-dimensional vectors, got {len(vector)}")
+
+                if len(self.rows) >= self.max_entries or (
+                    not self.free and self.count >= self.capacity
+                ):
+                    self._evict_to(
+                        self.max_entries - max(1, int(EVICTION_FRACTION * self.max_entries))
+                    )
+                if self.free:
+                    row = self.free.pop()
+                else:
+                    row = self.count
+                    self.count += 1
+
+                self.clock += 1
+                self._vectors[row] = vector
+                self._digests[row] = np.frombuffer(digest, dtype=np.uint8)
+                self._access[row] = self.clock
+                self.rows[digest] = row
+            if self.ndim is not None:
+                self._write_meta()
+
+    def _evict_to(self, size: int) -> None:
+        """Free the least recently used rows until at most ``size`` remain."""
+        excess = len(self.rows) - size
+        if excess <= 0:
+            return
+        live = np.fromiter(self.rows.values(), dtype=np.int64, count=len(self.rows))
+        victims = live[np.argsort(self._access[live], kind="stable")[:excess]]
+        for row in victims.tolist():
+            del self.rows[bytes(self._digests[row])]
+            self._digests[row] = 0
+            self.free.append(row)
+        self.evictions += excess
+        logger.info(f"Evicted {excess} embeddings from {self.directory.name}")
+
+    def _write_meta(self) -> None:
+        """Publish the row count and a new generation, so other processes reread the rows."""
+        self.generation += 1
+        meta = {
+            "ndim": self.ndim,
+            "capacity": self.capacity,
+            "count": self.count,
+            "clock": self.clock,
+            "generation": self.generation,
+        }
+        tmp_path = self.meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.meta_path)
+
+    def flush(self) -> None:
+        """Write mapped pages to disk; other processes already see them through the mapping."""
+        if self._vectors is None:
+            return
+        with self._thread_lock:
+            for array in (self._vectors, self._digests, self._access):
+                array.flush()
+
+    def nbytes(self) -> int:
+        """Bytes actually allocated on disk for this store."""
+        return sum(path.stat().st_blocks * 512 for path in self.directory.iterdir())
+
+
+class EmbeddingCache:
+    """
+    Embedding cache shared by every paper directory, with one store per model.
+
+    Worker processes may share a cache directory (see ``EmbeddingStore``).
+    """
+
+    def __init__(self, root: str | Path, max_entries: int = 100_000):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.stores: dict[str, EmbeddingStore] = {}
+        self.hits = 0
+        self.misses = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def store(self, model_name: str) -> EmbeddingStore:
+        store = self.stores.get(model_name)
+        if store is None:
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)[:64]
+            digest = hashlib.sha256(model_name.encode()).hexdigest()[:8]
+            store = EmbeddingStore(self.root / f"{slug}-{digest}", self.max_entries)
+            self.stores[model_name] = store
+        return store
+
+    def record(self, hits: int, misses: int) -> None:
+        self.hits += hits
+        self.misses += misses
+
+    def flush(self) -> None:
+        for store in self.stores.values():
+            store.flush()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "entries": sum(len(store.rows) for store in self.stores.values()),
+            "evictions": sum(store.evictions for store in self.stores.values()),
+            "disk_bytes": sum(store.nbytes() for store in self.stores.values() if store.ndim),
+            "max_entries_per_model": self.max_entries,
+        }
@@ -0,0 +1,196 @@
+"""
+Log sinks that keep writing off the event loop.
+
+``QueuedLogSink`` takes loguru messages on a bounded queue and writes them from a
+background thread, joining whatever has queued up into one write. In JSON mode
+records are also serialized on that thread, one JSON object per line.
+
+``LogFilter`` applies per-route log levels and samples the routine records of
+successful requests; records at warning level and above, and the records of
+failed requests, are always kept. Both read the ``path`` and ``correlation_id``
+that the logging middleware adds to every record made while handling a request.
+"""
+
+import atexit
+import json
+import queue
+import sys
+import threading
+import traceback
+from functools import lru_cache
+from typing import IO, Any
+
+from loguru import logger
+
+WARNING_LEVEL = 30
+ERROR_LEVEL = 40
+
+
+class LogFilter:
+    """
+    Decide which records reach the sink.
+
+    Args:
+        level: Minimum level of records outside any configured route
+        route_levels: Minimum levels by request path prefix (longest prefix wins)
+        sample_ratio: Fraction of requests whose info and debug records are kept
+    """
+
+    def __init__(self, level: str, route_levels: dict[str, str], sample_ratio: float = 1.0):
+        self.level = logger.level(level.upper()).no
+        self.route_levels = sorted(
+            ((prefix, logger.level(name.upper()).no) for prefix, name in route_levels.items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        # Correlation ids are uuid4 hex strings, so their first 8 digits are uniform
+        self.sample_below = int(sample_ratio * 0x100000000)
+        self.sample_ratio = sample_ratio
+        self.level_for = lru_cache(maxsize=1024)(self._level_for)
+
+    @property
+    def min_level(self) -> int:
+        """The lowest level any record can pass with."""
+        return min([self.level, *(level for _, level in self.route_levels)])
+
+    def _level_for(self, path: str | None) -> int:
+        if path is not None:
+            for prefix, level in self.route_levels:
+                if path.startswith(prefix):
+                    return level
+        return self.level
+
+    def __call__(self, record: dict) -> bool:
+        level = record["level"].no
+        extra = record["extra"]
+        if level < self.level_for(extra.get("path")):
+            return False
+        if level >= WARNING_LEVEL or self.sample_ratio >= 1.0:
+            return True
+        if extra.get("status_code", 0) >= 400:
+            return True
+        correlation_id = extra.get("correlation_id")
+        return correlation_id is None or int(correlation_id[:8], 16) < self.sample_below
+
+
+def json_line(record: dict) -> str:
+    """Serialize a loguru record as one JSON line."""
+    document = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        **record["extra"],
+    }
+    if record["exception"] is not None:
+        document["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    return json.dumps(document, default=str, separators=(",", ":")) + "\n"
+
+
+class QueuedLogSink:
+    """
+    A loguru stream sink writing from a background thread in batches.
+
+    Logging only formats the record and puts it on a queue. When the queue is
+    full, records below error level are dropped (and counted) rather than
+    blocking the caller.
+
+    Args:
+        stream: Where the batches are written
+        serialize: Write records as JSON lines rather than the formatted message
+        max_queue: Records held before dropping
+        batch_size: Most records joined into one write
+    """
+
+    def __init__(
+        self,
+        stream: IO[str] | None = None,
+        serialize: bool = False,
+        max_queue: int = 10_000,
+        batch_size: int = 256,
+    ):
+        self.stream = stream or sys.stderr
+        self.serialize = serialize
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, message) -> None:
+        item = message.record if self.serialize else str(message)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if message.record["level"].no < ERROR_LEVEL:
+                self.dropped += 1
+                return
+            self._queue.put(item)
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = items[-1] is None
+            lines = [item for item in items if item is not None]
+            if lines:
+                if self.serialize:
+                    lines = [json_line(record) for record in lines]
+                try:
+                    self.stream.write("".join(lines))
+                    self.stream.flush()
+                except Exception:
+                    self.dropped += len(lines)
+                else:
+                    self.written += len(lines)
+            if stopping:
+                return
+
+    def stop(self) -> None:
+        """Write everything queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        atexit.unregister(self.stop)
+
+    def stats(self) -> dict[str, Any]:
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+
+def configure_logging(settings) -> QueuedLogSink | None:
+    """
+    Replace loguru's sinks with one configured from the application settings.
+
+    Returns:
+        The queued sink, or ``None`` when records are written synchronously
+    """
+    log_filter = LogFilter(settings.log_level, settings.log_route_levels, settings.log_sample_ratio)
+    sink: QueuedLogSink | None = None
+    target: Any = sys.stderr
+    if settings.log_json:
+        target = lambda message: sys.stderr.write(json_line(message.record))  # noqa: E731
+    if settings.log_async:
+        sink = QueuedLogSink(
+            sys.stderr,
+            serialize=settings.log_json,
+            max_queue=settings.log_queue_size,
+            batch_size=settings.log_batch_size,
+        )
+        target = sink
+    logger.remove()
+    logger.add(
+        target,
+        format="{message}" if settings.log_json else settings.log_format,
+        level=log_filter.min_level,
+        filter=log_filter,
+        colorize=not settings.log_json,
+    )
+    return sink
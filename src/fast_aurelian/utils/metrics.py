@@ -0,0 +1,289 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Metric children are created once per label set and then updated in place, so
+recording a sample is a dict lookup at most and usually just an attribute update
+on a child held by the caller.
+"""
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Index builds and agent runs take far longer than a typical request
+LONG_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+
+class Value:
+    """A counter or gauge sample."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class HistogramValue:
+    """Bucketed observations; ``counts`` holds per-bucket (not cumulative) counts."""
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metric:
+    """A named metric family whose children are keyed by label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.children: dict[tuple[str, ...], Any] = {}
+        if not labelnames:
+            self.labels()
+
+    def labels(self, *values: str) -> Any:
+        """Get the child for a label set, creating it on first use."""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = HistogramValue(self.buckets) if self.kind == "histogram" else Value()
+            self.children[values] = child
+        return child
+
+    def preallocate(self, label_sets: Iterable[tuple[str, ...]]) -> None:
+        for values in label_sets:
+            self.labels(*values)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self.children.items():
+            if self.kind != "histogram":
+                labels = _format_labels(self.labelnames, values)
+                lines.append(f"{self.name}{labels} {_format_number(child.value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*child.buckets, float("inf")), child.counts, strict=True):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_number(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_number(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metric families rendered together."""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def _add(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Metric:
+        return self._add(Metric(name, documentation, "counter", labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Metric:
+        return self._add(Metric(name, documentation, "gauge", labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Metric:
+        return self._add(Metric(name, documentation, "histogram", labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class AppMetrics(MetricsRegistry):
+    """The metrics exported by Fast-Aurelian on ``/metrics``."""
+
+    STAGES = ("answer", "retrieval", "generation", "batch_embedding", "agent", "index_build")
+    INDEX_CHANGES = ("added", "updated", "removed", "skipped")
+    CACHES = ("answer", "embedding", "download")
+
+    def __init__(self):
+        super().__init__()
+        self.http_duration = self.histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route, including admission queueing",
+            ("route", "method"),
+        )
+        self.http_responses = self.counter(
+            "http_responses_total",
+            "HTTP responses by route and status class",
+            ("route", "method", "status"),
+        )
+        self.http_in_flight = self.gauge(
+            "http_requests_in_flight", "HTTP requests currently being handled", ("route",)
+        )
+
+        self.stage_duration = self.histogram(
+            "paperqa_stage_duration_seconds",
+            "Time spent in each PaperQA pipeline stage",
+            ("stage",),
+            LONG_BUCKETS,
+        )
+        self.stage_duration.preallocate((stage,) for stage in self.STAGES)
+
+        self.llm_requests = self.counter(
+            "llm_requests_total", "LLM and embedding API calls", ("model", "call_type", "outcome")
+        )
+        self.llm_duration = self.histogram(
+            "llm_request_duration_seconds",
+            "LLM and embedding API call latency",
+            ("model", "call_type"),
+        )
+        self.llm_tokens = self.counter(
+            "llm_tokens_total", "Tokens used by LLM and embedding calls", ("model", "kind")
+        )
+
+        self.index_builds = self.counter("paperqa_index_builds_total", "Index builds", ("outcome",))
+        self.index_builds.preallocate([("success",), ("failure",)])
+        self.index_documents = self.counter(
+            "paperqa_index_documents_total", "Documents seen by index builds", ("change",)
+        )
+        self.index_documents.preallocate((change,) for change in self.INDEX_CHANGES)
+
+        self.cache_hits = self.counter("paperqa_cache_hits_total", "Cache hits", ("cache",))
+        self.cache_misses = self.counter("paperqa_cache_misses_total", "Cache misses", ("cache",))
+        self.cache_hit_ratio = self.gauge(
+            "paperqa_cache_hit_ratio", "Fraction of cache lookups that hit", ("cache",)
+        )
+        for metric in (self.cache_hits, self.cache_misses, self.cache_hit_ratio):
+            metric.preallocate((cache,) for cache in self.CACHES)
+        self.coalesced = self.counter(
+            "paperqa_coalesced_total", "Requests that joined an identical in-flight run", ("kind",)
+        )
+        self.coalesced.preallocate([("query",), ("index",)])
+        self.query_tiers = self.counter(
+            "paperqa_query_tier_total", "Queries started at each adaptive tier", ("route", "tier")
+        )
+        self.query_tier_level = self.gauge(
+            "paperqa_query_tier_level", "Current adaptive tier (0 is full quality)", ("route",)
+        )
+
+        self.admission_active = self.gauge(
+            "admission_active_requests", "Requests holding an admission slot", ("route_class",)
+        )
+        self.admission_queued = self.gauge(
+            "admission_queued_requests", "Requests waiting for an admission slot", ("route_class",)
+        )
+        self.admission_rejected = self.counter(
+            "admission_rejected_total", "Requests turned away with a full queue", ("route_class",)
+        )
+        self.admission_timed_out = self.counter(
+            "admission_timed_out_total",
+            "Requests that gave up waiting for a slot",
+            ("route_class",),
+        )
+        self.deadline_exceeded = self.counter(
+            "admission_deadline_exceeded_total", "Requests cut off at their deadline"
+        )
+
+    def record_llm_call(
+        self,
+        model: str,
+        call_type: str,
+        outcome: str,
+        duration: float | None = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        calls: int = 1,
+    ) -> None:
+        self.llm_requests.labels(model, call_type, outcome).inc(calls)
+        if duration is not None:
+            self.llm_duration.labels(model, call_type).observe(duration)
+        if prompt_tokens:
+            self.llm_tokens.labels(model, "prompt").inc(prompt_tokens)
+        if completion_tokens:
+            self.llm_tokens.labels(model, "completion").inc(completion_tokens)
+
+    def record_index_build(self, result: dict, duration: float) -> None:
+        self.stage_duration.labels("index_build").observe(duration)
+        self.index_builds.labels("success" if result.get("success") else "failure").inc()
+        for change, count in (result.get("changes") or {}).items():
+            if change in self.INDEX_CHANGES:
+                self.index_documents.labels(change).inc(count)
+
+    def update_service(self, stats: dict) -> None:
+        """Copy PaperQA service cache and coalescing counters, taken at scrape time."""
+        for cache in self.CACHES:
+            cache_stats = stats.get(f"{cache}_cache") or {}
+            hits, misses = cache_stats.get("hits", 0), cache_stats.get("misses", 0)
+            self.cache_hits.labels(cache).set(hits)
+            self.cache_misses.labels(cache).set(misses)
+            self.cache_hit_ratio.labels(cache).set(hits / (hits + misses) if hits + misses else 0)
+        for kind, flight_stats in stats.get("coalescing", {}).items():
+            self.coalesced.labels(kind).set(flight_stats["coalesced"])
+
+    def update_admission(self, stats: dict) -> None:
+        """Copy admission controller counters, taken at scrape time."""
+        for name, limiter in (("global", stats["global"]), *stats["routes"].items()):
+            self.admission_active.labels(name).set(limiter["active"])
+            self.admission_queued.labels(name).set(limiter["queued"])
+            self.admission_rejected.labels(name).set(limiter["rejected"])
+            self.admission_timed_out.labels(name).set(limiter["timed_out"])
+        self.deadline_exceeded.labels().set(stats["deadline_exceeded"])
+
+
+@lru_cache
+def get_metrics() -> AppMetrics:
+    """Get the process-wide metrics registry."""
+    return AppMetrics()
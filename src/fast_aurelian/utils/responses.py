@@ -0,0 +1,80 @@
+"""
+Compact JSON responses and opaque paging cursors.
+
+Route results are serialized by orjson without whitespace, which is several
+times faster than the standard library encoder on large listings and answers.
+Cursors are URL-safe base64 JSON, so clients pass them back without knowing
+what position they encode.
+"""
+
+import base64
+import binascii
+from typing import Any
+
+import orjson
+from pydantic_core import to_jsonable_python
+from starlette.responses import Response
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    return to_jsonable_python(value, fallback=str)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON, falling back to pydantic's encoding for other types."""
+    return orjson.dumps(content, default=_default, option=JSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """A JSON response serialized by orjson."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class CursorError(ValueError):
+    """Raised for a paging cursor that was not issued by this service."""
+
+
+class StaleCursorError(Exception):
+    """Raised for a paging cursor issued before the data it pages through changed."""
+
+
+def encode_cursor(position: dict[str, Any]) -> str:
+    """Encode a paging position as an opaque cursor."""
+    return base64.urlsafe_b64encode(dumps(position)).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, **fields: type | tuple[type, ...]) -> dict[str, Any]:
+    """
+    Decode a cursor made by ``encode_cursor``.
+
+    Args:
+        cursor: The cursor a client passed back
+        **fields: Fields the position must hold, with their types; integers must
+            not be negative
+
+    Raises:
+        CursorError: The cursor is malformed, lacks a field or holds a value of
+            the wrong type
+    """
+    try:
+        position = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise CursorError("Invalid cursor") from e
+    if not isinstance(position, dict) or not all(
+        field in position and _valid(position[field], types) for field, types in fields.items()
+    ):
+        raise CursorError("Invalid cursor")
+    return position
+
+
+def _valid(value: Any, types: type | tuple[type, ...]) -> bool:
+    # bool is an int subclass, but never a position
+    if isinstance(value, bool) or not isinstance(value, types):
+        return False
+    return not isinstance(value, int) or value >= 0
@@ -0,0 +1,88 @@
+"""
+Helpers for streaming progress out of long-running coroutines.
+"""
+
+import asyncio
+import contextlib
+import json
+from collections.abc import AsyncIterator, Awaitable
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+
+from .responses import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Queue sentinel marking the end of the producing task
+_DONE = object()
+
+
+class EventStream:
+    """
+    Bridge callbacks fired inside a running coroutine to an async iterator of events.
+
+    Callbacks call ``emit`` from within the coroutine; ``run`` drives the coroutine
+    as a task and yields ``(event, data)`` pairs as they arrive. If the consumer
+    stops iterating (e.g. the client disconnected) the task is cancelled.
+    """
+
+    def __init__(self, heartbeat: float | None = 15.0):
+        self.heartbeat = heartbeat
+        self.result: Any = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(self, event: str, data: Any = None) -> None:
+        self._queue.put_nowait((event, data))
+
+    async def run(self, coro: Awaitable[Any]) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Run a coroutine, yielding the events it emits until it finishes.
+
+        Args:
+            coro: The work to run; its return value is stored on ``result``
+
+        Returns:
+            Async iterator of (event, data) pairs, with ``("ping", None)`` sent
+            after ``heartbeat`` idle seconds to keep connections alive
+        """
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(lambda _: self._queue.put_nowait(_DONE))
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), self.heartbeat)
+                except TimeoutError:
+                    yield "ping", None
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+            self.result = task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+
+def format_sse(event: str, data: Any = None) -> str:
+    """
+    Encode an event in the Server-Sent Events wire format.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        The encoded event, including the terminating blank line
+    """
+    if event == "ping":
+        return ": ping\n\n"
+    payload = json.dumps(to_jsonable_python(data, fallback=str))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def format_ndjson(item: Any) -> bytes:
+    """Encode one item as a line of newline-delimited JSON."""
+    return dumps(item) + b"\n"
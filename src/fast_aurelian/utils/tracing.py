@@ -0,0 +1,393 @@
+"""
+Minimal request tracing with OTLP/JSON export.
+
+Spans are carried in a context variable, so work started under a request (tasks,
+threads via ``asyncio.to_thread``, LiteLLM callbacks) records its spans in that
+request's trace. Finished spans are buffered and exported in batches, either to a
+JSON Lines file of OTLP ``ExportTraceServiceRequest`` documents (readable by the
+OpenTelemetry collector's ``otlpjsonfile`` receiver) or to an OTLP/HTTP endpoint
+using the JSON encoding.
+
+When tracing is off, or a request was not sampled, entering a span costs a
+context variable lookup.
+"""
+
+import asyncio
+import contextlib
+import functools
+import inspect
+import json
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        start_ns: int | None = None,
+        attributes: dict[str, Any] | None = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = 0
+        self.attributes = {k: v for k, v in (attributes or {}).items() if v is not None}
+        self.status = STATUS_UNSET
+        self.message = ""
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes (``None`` values are left out)."""
+        self.attributes.update((k, v) for k, v in attributes.items() if v is not None)
+
+    def fail(self, error: BaseException | str) -> None:
+        self.status = STATUS_ERROR
+        self.message = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": otlp_attributes(self.attributes),
+            "status": {"code": self.status, **({"message": self.message} if self.message else {})},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class NoopSpan:
+    """Stands in for spans of unsampled traces, and marks them as unsampled."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def fail(self, error: BaseException | str) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+_current: ContextVar[Span | NoopSpan | None] = ContextVar("current_span", default=None)
+
+
+def otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, list | tuple):
+        return {"arrayValue": {"values": [otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": otlp_value(value)} for key, value in attributes.items()]
+
+
+def otlp_request(spans: list[Span], service_name: str) -> dict[str, Any]:
+    """Wrap spans in an OTLP ``ExportTraceServiceRequest`` (JSON encoding)."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "fast_aurelian"},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """Sends batches of finished spans somewhere."""
+
+    async def export(self, spans: list[Span], service_name: str) -> None:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class JsonFileExporter(SpanExporter):
+    """Append each batch to a file as one line of OTLP/JSON."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    async def export(self, spans: list[Span], service_name: str) -> None:
+        line = json.dumps(otlp_request(spans, service_name), separators=(",", ":")) + "\n"
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(line)
+
+
+class OtlpHttpExporter(SpanExporter):
+    """POST each batch to an OTLP/HTTP traces endpoint, JSON encoded."""
+
+    def __init__(self, endpoint: str, timeout: float = 10.0):
+        self.endpoint = endpoint
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, spans: list[Span], service_name: str) -> None:
+        response = await self.client.post(self.endpoint, json=otlp_request(spans, service_name))
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class Tracer:
+    """
+    Creates spans and exports them in batches.
+
+    Args:
+        exporter: Where finished spans go; ``None`` disables tracing
+        sample_ratio: Fraction of traces recorded, decided when a trace starts
+        max_queue: Finished spans buffered between exports; extra spans are dropped
+        service_name: Reported as the OTLP ``service.name`` resource attribute
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        sample_ratio: float = 1.0,
+        max_queue: int = 10_000,
+        service_name: str = "fast-aurelian",
+    ):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.service_name = service_name
+        self._finished: deque[Span] = deque()
+        self.max_queue = max_queue
+        self.exported = 0
+        self.dropped = 0
+        self.failed_exports = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def recording(self) -> bool:
+        """Whether spans started here would be recorded."""
+        current = _current.get()
+        return self.enabled and current is not NOOP_SPAN
+
+    def start_span(
+        self,
+        name: str,
+        trace_id: str | None = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        start_ns: int | None = None,
+        **attributes: Any,
+    ) -> Span | NoopSpan:
+        """
+        Start a span under the current one, or a new (possibly unsampled) trace.
+
+        The span does not become current; use ``span`` or ``enter`` for that.
+        """
+        parent = _current.get()
+        if not self.enabled or parent is NOOP_SPAN:
+            return NOOP_SPAN
+        if parent is None:
+            if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+                return NOOP_SPAN
+            return Span(name, trace_id or os.urandom(16).hex(), None, kind, start_ns, attributes)
+        return Span(name, parent.trace_id, parent.span_id, kind, start_ns, attributes)
+
+    def end_span(self, span: Span | NoopSpan, end_ns: int | None = None) -> None:
+        if isinstance(span, NoopSpan):
+            return
+        span.end_ns = end_ns or time.time_ns()
+        if len(self._finished) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._finished.append(span)
+
+    def enter(self, name: str, **attributes: Any) -> tuple[Span | NoopSpan, Token]:
+        """Start a span and make it current until ``exit``."""
+        span = self.start_span(name, **attributes)
+        return span, _current.set(span)
+
+    def exit(self, span: Span | NoopSpan, token: Token) -> None:
+        # Fails when exited from another context than the one it was entered in
+        with contextlib.suppress(ValueError):
+            _current.reset(token)
+        self.end_span(span)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | NoopSpan]:
+        """Run a block in a new span, recording any exception raised in it."""
+        if not self.enabled or _current.get() is NOOP_SPAN:
+            yield NOOP_SPAN
+            return
+        span, token = self.enter(name, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            self.exit(span, token)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """Record an operation that already finished as a span under the current one."""
+        if self.recording() and _current.get() is not None:
+            self.end_span(self.start_span(name, start_ns=start_ns, **attributes), end_ns)
+
+    async def flush(self) -> None:
+        """Export every buffered span."""
+        while self._finished and self.exporter is not None:
+            batch = [self._finished.popleft() for _ in range(min(512, len(self._finished)))]
+            try:
+                await self.exporter.export(batch, self.service_name)
+                self.exported += len(batch)
+            except Exception as e:
+                self.failed_exports += 1
+                self.dropped += len(batch)
+                logger.warning(f"Could not export {len(batch)} spans: {e}")
+                return
+
+    async def run(self, interval: float) -> None:
+        """Export buffered spans every ``interval`` seconds until cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            await self.flush()
+            if self.exporter is not None:
+                await self.exporter.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_ratio": self.sample_ratio,
+            "buffered": len(self._finished),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed_exports": self.failed_exports,
+        }
+
+
+def current_span() -> Span | NoopSpan:
+    """The current span, or a no-op span outside a recorded trace."""
+    return _current.get() or NOOP_SPAN
+
+
+def traced(name: str, *arguments: str) -> Callable:
+    """
+    Run an async function in a span named ``name``.
+
+    Args:
+        name: Span name
+        *arguments: Names of the function's arguments recorded as span attributes
+    """
+
+    def decorate(function: Callable) -> Callable:
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.recording():
+                return await function(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            with tracer.span(name, **{argument: bound.get(argument) for argument in arguments}):
+                return await function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def trace_agent_tools(agent: Any) -> None:
+    """
+    Run each tool of a pydantic-ai agent in a ``tool <name>`` span.
+
+    pydantic-ai only reports tool runs to OpenTelemetry, so the tool functions
+    are wrapped in place; wrapping twice is a no-op.
+    """
+    for tool in getattr(agent, "_function_tools", {}).values():
+        function = tool.function
+        if getattr(function, "__traced__", False) or not inspect.iscoroutinefunction(function):
+            continue
+
+        def wrap(function: Callable, name: str) -> Callable:
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with get_tracer().span(f"tool {name}", tool=name):
+                    return await function(*args, **kwargs)
+
+            wrapper.__traced__ = True
+            return wrapper
+
+        tool.function = wrap(function, tool.name)
+
+
+@lru_cache
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer, configured from the application settings."""
+    from ..config import get_settings
+
+    settings = get_settings()
+    exporter: SpanExporter | None = None
+    if settings.tracing_exporter == "file":
+        exporter = JsonFileExporter(settings.tracing_file)
+    elif settings.tracing_exporter == "otlp":
+        exporter = OtlpHttpExporter(settings.tracing_otlp_endpoint)
+    return Tracer(
+        exporter,
+        sample_ratio=settings.tracing_sample_ratio,
+        max_queue=settings.tracing_max_queue,
+        service_name=settings.app_name.lower(),
+    )
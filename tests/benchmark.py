@@ -0,0 +1,449 @@
+"""
+Benchmark and load-test suite for the PaperQA endpoints.
+
+Runs the app in-process against the offline LLM stand-in (or recorded exchanges)
+and generated corpora, and measures:
+
+- index build throughput (documents/second) at each corpus size
+- ``/query`` latency percentiles and throughput at each concurrency level
+- ``/list`` and ``/status`` latency as the collection grows
+- the per-request memory high-water mark of each endpoint
+
+Results are written as JSON so runs on different commits can be compared::
+
+    uv run python -m tests.benchmark --output base.json
+    uv run python -m tests.benchmark --sizes 10,100 --concurrency 1,8,64 --output head.json
+    uv run python -m tests.benchmark compare base.json head.json --threshold 0.1
+
+``compare`` exits with status 1 when any shared metric regressed by more than the
+threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+API = "/api/paperqa"
+DEFAULT_SIZES = (10, 1_000, 10_000)
+DEFAULT_CONCURRENCY = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+# Metric name suffixes where a larger value is better; all others (latencies, bytes) are costs
+HIGHER_IS_BETTER = ("docs_per_sec", "throughput_rps", "success_ratio")
+
+SYLLABLES = (
+    "ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "pre", "gen", "tor", "lin",
+    "ase", "ox", "cy", "phy", "zym", "ide", "ol", "mer", "bio", "neu", "cal", "tro",
+)  # fmt: skip
+
+
+def percentiles(values: list[float]) -> dict[str, float | None]:
+    """Summarize samples with nearest-rank percentiles (``None`` without samples)."""
+    ordered = sorted(values)
+
+    def rank(fraction: float) -> float | None:
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+    return {
+        "p50": rank(0.50),
+        "p90": rank(0.90),
+        "p99": rank(0.99),
+        "max": ordered[-1] if ordered else None,
+        "mean": sum(ordered) / len(ordered) if ordered else None,
+    }
+
+
+def latency_summary(seconds: list[float]) -> dict[str, float | None]:
+    """Latency percentiles in milliseconds."""
+    return {
+        f"{name}_ms": round(value * 1000, 3) if value is not None else None
+        for name, value in percentiles(seconds).items()
+    }
+
+
+def vocabulary(rng: random.Random, size: int = 400) -> list[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def generate_corpus(directory: Path, count: int, words: int = 800, seed: int = 0) -> list[str]:
+    """
+    Write ``count`` synthetic text papers into a directory.
+
+    Papers are deterministic for a (count, seed) pair but differ between corpus
+    sizes, so a larger corpus never reuses a smaller one's cached embeddings.
+
+    Args:
+        directory: Where to write the papers (created if needed)
+        count: Number of papers
+        words: Approximate words per paper
+        seed: Seed for the generated text
+
+    Returns:
+        Questions about the corpus' topics, for querying it
+    """
+    rng = random.Random(f"{seed}-{count}")
+    vocab = vocabulary(rng)
+    directory.mkdir(parents=True, exist_ok=True)
+    for number in range(count):
+        topic = rng.sample(vocab, 3)
+        sentences = [f"On {topic[0]} {topic[1]} and {topic[2]}."]
+        written = 0
+        while written < words:
+            sentence = rng.sample(vocab, rng.randint(8, 16)) + rng.sample(topic, 1)
+            sentences.append(" ".join(sentence).capitalize() + ".")
+            written += len(sentence)
+        (directory / f"paper_{number:05d}.txt").write_text(" ".join(sentences))
+    return [
+        f"What is known about {a} and {b}?" for a, b in (rng.sample(vocab, 2) for _ in range(64))
+    ]
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def max_rss_bytes() -> int:
+    """The process' resident set size high-water mark."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and in bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+async def timed(client, method: str, url: str, **kwargs) -> tuple[float, Any]:
+    """Send a request, returning how long it took and the response."""
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return time.perf_counter() - started, response
+
+
+async def bench_index(client, directory: Path) -> dict[str, Any]:
+    """Build a corpus' index from scratch, then again with nothing changed."""
+    documents = len(list(directory.glob("*.txt")))
+    body = {"directory": str(directory), "wait": True}
+    seconds, response = await timed(client, "POST", f"{API}/index", json=body)
+    if response.status_code != 200:
+        raise RuntimeError(f"Indexing {directory} failed: {response.text}")
+    rebuild_seconds, _ = await timed(client, "POST", f"{API}/index", json=body)
+    return {
+        "documents": documents,
+        "indexed": response.json().get("indexed_chunks_count"),
+        "seconds": round(seconds, 3),
+        "docs_per_sec": round(documents / seconds, 3),
+        "rebuild_seconds": round(rebuild_seconds, 3),
+    }
+
+
+async def bench_listing(client, directory: Path, repeats: int) -> dict[str, Any]:
+    """Time ``/list`` and ``/status`` for a directory: the first call, then warm calls."""
+    measured: dict[str, Any] = {"documents": len(list(directory.glob("*.txt")))}
+    for endpoint in ("list", "status"):
+        url = f"{API}/{endpoint}"
+        params = {"directory": str(directory)}
+        first, _ = await timed(client, "GET", url, params=params)
+        samples = [(await timed(client, "GET", url, params=params))[0] for _ in range(repeats)]
+        measured[endpoint] = {"first_ms": round(first * 1000, 3), **latency_summary(samples)}
+    return measured
+
+
+async def bench_queries(
+    client, directory: Path, questions: list[str], concurrency: int, requests: int
+) -> dict[str, Any]:
+    """
+    Send ``requests`` distinct questions to ``/query`` from ``concurrency`` workers.
+
+    Every question is unique, so answers come from the agent rather than the cache.
+    Rejected or failed requests are counted by status code, and their latencies
+    are kept out of the percentiles.
+    """
+    pending = iter(range(requests))
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    errors: Counter[str] = Counter()
+
+    async def worker() -> None:
+        for number in pending:
+            question = f"{questions[number % len(questions)]} (c{concurrency}-{number})"
+            seconds, response = await timed(
+                client,
+                "POST",
+                f"{API}/query",
+                json={"query": question, "directory": str(directory)},
+            )
+            statuses[response.status_code] += 1
+            if response.status_code == 200:
+                latencies.append(seconds)
+            else:
+                errors[response.text[:300]] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3),
+        "success_ratio": round(len(latencies) / requests, 4),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        **latency_summary(latencies),
+        "errors": [{"detail": detail, "count": count} for detail, count in errors.most_common(5)],
+    }
+
+
+async def bench_memory(
+    client, directory: Path, questions: list[str], repeats: int
+) -> list[dict[str, Any]]:
+    """
+    Measure each endpoint's per-request Python memory high-water mark.
+
+    Requests run one at a time under ``tracemalloc``, so each peak belongs to a
+    single request; the figures are bytes allocated above the level before it.
+    """
+    calls = {
+        "query": lambda n: (
+            "POST",
+            f"{API}/query",
+            {"json": {"query": f"{questions[n]} (memory-{n})", "directory": str(directory)}},
+        ),
+        "evidence": lambda n: (
+            "POST",
+            f"{API}/evidence",
+            {"json": {"query": questions[n], "directory": str(directory)}},
+        ),
+        "list": lambda _: ("GET", f"{API}/list", {"params": {"directory": str(directory)}}),
+        "status": lambda _: ("GET", f"{API}/status", {"params": {"directory": str(directory)}}),
+    }
+    measured = []
+    tracemalloc.start()
+    try:
+        for endpoint, call in calls.items():
+            peaks = []
+            for number in range(repeats):
+                method, url, kwargs = call(number % len(questions))
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                await client.request(method, url, **kwargs)
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+            measured.append(
+                {
+                    "endpoint": endpoint,
+                    "documents": len(list(directory.glob("*.txt"))),
+                    "peak_bytes_p50": int(percentiles(peaks)["p50"]),
+                    "peak_bytes_max": max(peaks),
+                }
+            )
+    finally:
+        tracemalloc.stop()
+    return measured
+
+
+def configure_environment(args: argparse.Namespace, workdir: Path) -> None:
+    """Point the app at the stand-in provider before it is imported."""
+    os.environ["FAST_AURELIAN_LLM_PROVIDER"] = args.provider
+    os.environ["FAST_AURELIAN_LLM_STANDIN_LATENCY"] = str(args.standin_latency)
+    os.environ["FAST_AURELIAN_LLM_STANDIN_TOKENS_PER_SECOND"] = str(args.standin_tokens_per_second)
+    if args.recording_dir:
+        os.environ["FAST_AURELIAN_LLM_RECORDING_DIR"] = str(Path(args.recording_dir).resolve())
+    # Answer cache hits would measure the cache rather than the endpoints
+    os.environ["FAST_AURELIAN_ANSWER_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("FAST_AURELIAN_LOG_LEVEL", "error")
+    logging.getLogger("LiteLLM").setLevel(logging.ERROR)
+    # The service keeps its default papers directory (and job store) under the cwd
+    os.chdir(workdir)
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+async def run_benchmarks(args: argparse.Namespace, workdir: Path) -> dict[str, Any]:
+    configure_environment(args, workdir)
+    import httpx
+
+    from src.fast_aurelian.config import get_settings
+    from src.fast_aurelian.main import app
+
+    results: dict[str, Any] = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "provider": args.provider,
+            "standin_latency": args.standin_latency,
+            "standin_tokens_per_second": args.standin_tokens_per_second,
+            "sizes": args.sizes,
+            "concurrency": args.concurrency,
+            "query_concurrency_limit": get_settings().query_concurrency_limit,
+            "admission_queue_size": get_settings().admission_queue_size,
+        },
+        "index": [],
+        "listing": [],
+        "query": [],
+        "memory": [],
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client,
+    ):
+        # The first build starts the parse workers, which would skew the smallest corpus
+        generate_corpus(workdir / "corpus_warmup", 1, words=args.words, seed=args.seed)
+        started = time.perf_counter()
+        await bench_index(client, workdir / "corpus_warmup")
+        results["meta"]["cold_start_seconds"] = round(time.perf_counter() - started, 3)
+
+        corpora: dict[int, tuple[Path, list[str]]] = {}
+        for size in args.sizes:
+            directory = workdir / f"corpus_{size}"
+            questions = generate_corpus(directory, size, words=args.words, seed=args.seed)
+            corpora[size] = (directory, questions)
+            print(f"Indexing {size} documents...", file=sys.stderr)
+            results["index"].append(await bench_index(client, directory))
+            results["listing"].append(await bench_listing(client, directory, args.repeats))
+
+        directory, questions = corpora[max(args.sizes)]
+        for level in args.concurrency:
+            requests = max(level * args.requests_per_worker, args.min_requests)
+            print(f"Querying at concurrency {level} ({requests} requests)...", file=sys.stderr)
+            results["query"].append(
+                await bench_queries(client, directory, questions, level, requests)
+            )
+
+        print("Measuring per-request memory...", file=sys.stderr)
+        results["memory"] = await bench_memory(client, directory, questions, args.repeats)
+    results["meta"]["max_rss_bytes"] = max_rss_bytes()
+    return results
+
+
+def flatten(results: dict[str, Any]) -> dict[str, float]:
+    """Name every comparable number in a results file, e.g. ``query.c64.p99_ms``."""
+    metrics: dict[str, float] = {}
+    for run in results.get("index", []):
+        for key in ("docs_per_sec", "seconds", "rebuild_seconds"):
+            metrics[f"index.n{run['documents']}.{key}"] = run[key]
+    for run in results.get("listing", []):
+        for endpoint in ("list", "status"):
+            for key, value in run[endpoint].items():
+                metrics[f"{endpoint}.n{run['documents']}.{key}"] = value
+    for run in results.get("query", []):
+        for key in ("throughput_rps", "success_ratio", "p50_ms", "p90_ms", "p99_ms"):
+            metrics[f"query.c{run['concurrency']}.{key}"] = run[key]
+    for run in results.get("memory", []):
+        for key in ("peak_bytes_p50", "peak_bytes_max"):
+            metrics[f"memory.{run['endpoint']}.{key}"] = run[key]
+    return {name: value for name, value in metrics.items() if value is not None}
+
+
+def compare(base: dict[str, Any], head: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """
+    Compare the metrics two runs share.
+
+    Args:
+        base: Results of the reference run
+        head: Results of the run being checked
+        threshold: Relative change beyond which a worse metric is a regression
+
+    Returns:
+        One entry per shared metric with both values, the relative change and
+        whether it regressed
+    """
+    base_metrics, head_metrics = flatten(base), flatten(head)
+    rows = []
+    for name in sorted(base_metrics.keys() & head_metrics.keys()):
+        before, after = base_metrics[name], head_metrics[name]
+        change = (after - before) / before if before else 0.0
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        rows.append(
+            {
+                "metric": name,
+                "base": before,
+                "head": after,
+                "change": round(change, 4),
+                "regressed": worse > threshold,
+            }
+        )
+    return rows
+
+
+def parse_sizes(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="Run the benchmarks (the default)")
+    run.add_argument("--output", help="Write the JSON results here (default: stdout)")
+    run.add_argument("--workdir", help="Directory for corpora and indexes (default: a temp dir)")
+    run.add_argument("--sizes", type=parse_sizes, default=list(DEFAULT_SIZES))
+    run.add_argument("--concurrency", type=parse_sizes, default=list(DEFAULT_CONCURRENCY))
+    run.add_argument("--requests-per-worker", type=int, default=2)
+    run.add_argument("--min-requests", type=int, default=16)
+    run.add_argument("--repeats", type=int, default=20, help="Samples per listing/memory metric")
+    run.add_argument("--words", type=int, default=800, help="Words per generated paper")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--provider", choices=("standin", "replay"), default="standin")
+    run.add_argument("--recording-dir", help="Recorded exchanges to replay")
+    run.add_argument("--standin-latency", type=float, default=0.05)
+    run.add_argument("--standin-tokens-per-second", type=float, default=200.0)
+
+    diff = commands.add_parser("compare", help="Compare two results files")
+    diff.add_argument("base")
+    diff.add_argument("head")
+    diff.add_argument("--threshold", type=float, default=0.1)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("run", "compare", "-h", "--help"):
+        argv = ["run", *argv]
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        rows = compare(
+            json.loads(Path(args.base).read_text()),
+            json.loads(Path(args.head).read_text()),
+            args.threshold,
+        )
+        print(json.dumps(rows, indent=1))
+        return 1 if any(row["regressed"] for row in rows) else 0
+
+    output = Path(args.output).resolve() if args.output else None
+    with tempfile.TemporaryDirectory(prefix="fast-aurelian-bench-") as scratch:
+        workdir = Path(args.workdir or scratch).resolve()
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = asyncio.run(run_benchmarks(args, workdir))
+    text = json.dumps(results, indent=1)
+    if output:
+        output.write_text(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
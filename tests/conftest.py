@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from src.fast_aurelian.config import get_settings
+from tests.benchmark import generate_corpus
+
+STANDIN_ENVIRONMENT = {
+    "FAST_AURELIAN_LLM_PROVIDER": "standin",
+    "FAST_AURELIAN_LLM_STANDIN_LATENCY": "0",
+    "FAST_AURELIAN_LLM_STANDIN_TOKENS_PER_SECOND": "0",
+    "FAST_AURELIAN_INDEX_PARSE_WORKERS": "0",
+    "FAST_AURELIAN_EMBEDDING_CACHE_ENABLED": "false",
+    "FAST_AURELIAN_DOWNLOAD_STORE_ENABLED": "false",
+    "FAST_AURELIAN_WARMUP_INDEX": "false",
+    "FAST_AURELIAN_CATALOG_WATCH_ENABLED": "false",
+}
+
+
+@pytest.fixture
+def standin(tmp_path, monkeypatch):
+    """
+    Settings for running the service offline: the LLM stand-in and no background work.
+
+    Yields the monkeypatch fixture, for tests to adjust settings further before the
+    service reads them.
+    """
+    for name, value in STANDIN_ENVIRONMENT.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.chdir(tmp_path)
+    get_settings.cache_clear()
+    yield monkeypatch
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def papers(tmp_path):
+    """A directory of three generated papers."""
+    directory = tmp_path / "papers"
+    generate_corpus(directory, 3, words=120)
+    return directory
+
+
+@pytest.fixture
+def run_service(standin, papers):
+    """
+    Run a scenario against a PaperQAService over the generated papers.
+
+    Keyword arguments set further ``FAST_AURELIAN_`` settings first. The service
+    lives on one event loop, so each scenario runs in a single ``asyncio.run``.
+    """
+    from src.fast_aurelian.services.paperqa import PaperQAService
+
+    def run(scenario, **settings):
+        for name, value in settings.items():
+            standin.setenv(f"FAST_AURELIAN_{name.upper()}", str(value))
+        get_settings.cache_clear()
+
+        async def main():
+            service = PaperQAService(str(papers))
+            try:
+                return await scenario(service)
+            finally:
+                await service.aclose()
+
+        return asyncio.run(main())
+
+    return run
@@ -2,31 +2,51 @@ from fastapi.testclient import TestClient
 from src.fast_aurelian.main import app
 import tempfile
 import shutil
+import time
 from pathlib import Path
 
 
+def wait_for_job(client, job_id, timeout=600):
+    """Poll a background job until it finishes."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/paperqa/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(1)
+    raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+
+
 def test_paperqa_workflow():
     """Test the core PaperQA workflow: index → query → search."""
-    client = TestClient(app)
+    with TestClient(app) as client:
+        run_workflow(client)
+
+
+def run_workflow(client):
     test_dir = "./tests/papers"
     Path(test_dir).mkdir(exist_ok=True)
 
     print("\n=== PaperQA Workflow Test ===")
 
-    # 1. Index papers in directory
+    # 1. Index papers in directory (runs as a background job)
     print(f"\n1. Indexing papers in {test_dir}...")
     response = client.post("/api/paperqa/index", json={"directory": test_dir})
-    print(f"Index result: {response.json()}")
-    assert response.status_code == 200
-    
-    index_result = response.json()
+    print(f"Index job: {response.json()}")
+    assert response.status_code == 202
+
+    job = wait_for_job(client, response.json()["job_id"])
+    print(f"Index result: {job}")
+    assert job["status"] == "succeeded"
+
+    index_result = job["result"]
     assert index_result["success"] == True
     assert index_result["indexed_chunks_count"] > 0  # Should have indexed something
 
     # 2. Query the indexed papers  
     print(f"\n2. Querying indexed papers...")
     response = client.post("/api/paperqa/query", 
-                          json={"query": "What is this paper about?"})
+                          json={"query": "What is this paper about?", "directory": test_dir})
     print(f"Query result: {response.json()}")
     assert response.status_code == 200
     
@@ -37,7 +57,7 @@ def test_paperqa_workflow():
     # 3. Search for new papers online
     print(f"\n3. Searching for new papers...")
     response = client.post("/api/paperqa/search",
-                          json={"query": "machine learning", "max_papers": 2})
+                          json={"query": "machine learning", "max_papers": 2, "directory": test_dir})
     print(f"Search result: {response.json()}")
     assert response.status_code == 200
 
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from src.fast_aurelian.middleware.admission import ConcurrencyLimiter
+from src.fast_aurelian.services.adaptive import QueryTier, TierSelector
+
+REDUCED = QueryTier("reduced", evidence_k=5, answer_max_sources=3)
+MINIMAL = QueryTier("minimal", evidence_k=3, answer_max_sources=2, summary_llm="fast-model")
+
+
+def answer(selector: TierSelector, duration: float, count: int = 5) -> QueryTier:
+    for _ in range(count):
+        tier = selector.select()
+        selector.observe(tier, duration)
+    return selector.select()
+
+
+def test_tiers_step_down_under_slow_answers_and_recover():
+    selector = TierSelector("query", [REDUCED, MINIMAL], latency_target=10.0, window=5, cooldown=0)
+
+    assert answer(selector, 4.0) is selector.tiers[0]
+    assert answer(selector, 12.0) is REDUCED
+    assert answer(selector, 11.0) is MINIMAL
+    # Already at the cheapest tier
+    assert answer(selector, 11.0) is MINIMAL
+    assert answer(selector, 6.0) is MINIMAL
+    assert answer(selector, 3.0) is REDUCED
+    assert answer(selector, 2.0).name == "full"
+
+
+def test_queue_depth_alone_degrades_before_answers_slow_down():
+    selector = TierSelector("query", [REDUCED], latency_target=10.0, cooldown=0)
+    limiter = ConcurrencyLimiter("query", limit=2, max_queue=32)
+    limiter.avg_duration = 4.0
+    limiter._waiters.extend(object() for _ in range(6))
+    selector.limiter = limiter
+
+    assert selector.queue_wait() == 12.0
+    assert selector.select() is REDUCED
+
+
+def test_tier_caps_settings_without_raising_a_requests_own():
+    deps = SimpleNamespace(evidence_k=10, answer_max_sources=5, summary_llm="big", llm="big")
+
+    assert MINIMAL.overrides(deps, {}) == {
+        "evidence_k": 3,
+        "answer_max_sources": 2,
+        "summary_llm": "fast-model",
+    }
+    assert REDUCED.overrides(deps, {"evidence_k": 2}) == {"evidence_k": 2, "answer_max_sources": 3}
@@ -0,0 +1,93 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.fast_aurelian.api.admin import router
+from src.fast_aurelian.api.paperqa import get_paperqa_service
+from src.fast_aurelian.config import get_settings
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    get_settings.cache_clear()
+    yield monkeypatch
+    get_settings.cache_clear()
+
+
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_admin_routes_require_the_configured_token(settings):
+    settings.setenv("FAST_AURELIAN_ADMIN_TOKEN", "secret")
+    path = "/api/paperqa/admin/profiles/0123456789abcdef0123456789abcdef"
+
+    assert client().get(path).status_code == 401
+    assert client().get(path, headers={"X-Admin-Token": "wrong"}).status_code == 401
+    # Past the check, profiling is disabled
+    assert client().get(path, headers={"X-Admin-Token": "secret"}).status_code == 404
+
+
+def test_admin_routes_are_refused_without_a_token_unless_opened(settings):
+    settings.delenv("FAST_AURELIAN_ADMIN_TOKEN", raising=False)
+    settings.delenv("FAST_AURELIAN_ADMIN_OPEN", raising=False)
+    path = "/api/paperqa/admin/profiles/0123456789abcdef0123456789abcdef"
+    assert client().get(path).status_code == 403
+    assert client().get(path, headers={"X-Admin-Token": "secret"}).status_code == 403
+
+    settings.setenv("FAST_AURELIAN_ADMIN_OPEN", "true")
+    get_settings.cache_clear()
+    assert client().get(path).status_code == 404
+
+
+def test_snapshots_are_built_downloaded_and_loaded_from_allowed_sources(run_service, tmp_path):
+    sources = tmp_path / "snapshots"
+    sources.mkdir()
+    (sources / "corrupt.snapshot").write_bytes(b"not a snapshot")
+    copy = tmp_path / "copy"
+
+    async def scenario(service):
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_paperqa_service] = lambda: service
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test", headers={"X-Admin-Token": "secret"}
+        ) as client:
+            api = "/api/paperqa/admin"
+            unindexed = await client.post(f"{api}/snapshots", json={})
+            await service.index_papers()
+            built = (await client.post(f"{api}/snapshots", json={})).json()
+            downloaded = await client.get(f"{api}/snapshots/download")
+            (sources / "papers.snapshot").write_bytes(downloaded.content)
+
+            def load(source):
+                return client.post(
+                    f"{api}/snapshots/load", json={"source": str(source), "directory": str(copy)}
+                )
+
+            loaded = (await load(sources / "papers.snapshot")).json()
+            responses = {
+                "outside": await load(tmp_path / "papers.snapshot"),
+                "missing": await load(sources / "missing.snapshot"),
+                "corrupt": await load(sources / "corrupt.snapshot"),
+                "downloads": await client.get(f"{api}/downloads"),
+            }
+            evidence = await service.search_evidence("enzymes", str(copy))
+        return unindexed, built, loaded, responses, evidence
+
+    unindexed, built, loaded, responses, evidence = run_service(
+        scenario, snapshot_sources=f'["{sources}"]', admin_token="secret"
+    )
+    assert unindexed.status_code == 404
+    assert built["index_version"] and loaded["index_version"]
+    assert {name: response.status_code for name, response in responses.items()} == {
+        "outside": 403,
+        "missing": 404,
+        "corrupt": 422,
+        "downloads": 404,
+    }
+    assert evidence["total"] == 3
@@ -0,0 +1,97 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.fast_aurelian.middleware.admission import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+    ConcurrencyLimiter,
+    RouteClass,
+)
+
+
+def test_limiter_admits_waiters_in_order_and_bounds_the_queue():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", limit=1, max_queue=2)
+        await limiter.acquire(timeout=1)
+        order = []
+
+        async def waiter(name):
+            await limiter.acquire(timeout=1)
+            order.append(name)
+            limiter.release()
+
+        tasks = [asyncio.create_task(waiter(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        try:
+            await limiter.acquire(timeout=1)
+        except asyncio.QueueFull:
+            rejected = True
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order, rejected, limiter.active
+
+    order, rejected, active = asyncio.run(scenario())
+
+    assert order == ["first", "second"]
+    assert rejected
+    assert active == 0
+
+
+def make_app(controller):
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    cancelled = []
+
+    @app.get("/slow")
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    return app, cancelled
+
+
+def test_deadline_cancels_the_request():
+    controller = AdmissionController(
+        global_limit=4,
+        route_classes=[RouteClass("slow", ("/slow",), limit=1, timeout=0.05)],
+        default_timeout=None,
+    )
+    app, cancelled = make_app(controller)
+
+    with TestClient(app) as client:
+        response = client.get("/slow")
+        assert client.get("/fast").status_code == 200
+
+    assert response.status_code == 504
+    assert cancelled == [True]
+    assert controller.stats()["routes"]["slow"]["active"] == 0
+
+
+def test_full_route_queue_is_rejected_with_retry_after():
+    controller = AdmissionController(
+        global_limit=4,
+        route_classes=[RouteClass("slow", ("/slow",), limit=1, timeout=None)],
+        default_timeout=None,
+        max_queue=0,
+    )
+    app, _ = make_app(controller)
+
+    async def occupy():
+        await controller.class_limiters["slow"].acquire(timeout=None)
+
+    asyncio.run(occupy())
+    with TestClient(app) as client:
+        response = client.get("/slow")
+        assert client.get("/fast").status_code == 200
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
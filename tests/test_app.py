@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.fast_aurelian.api.paperqa import get_job_manager, get_paperqa_service
+from src.fast_aurelian.main import create_app
+
+
+@pytest.fixture
+def app_client(standin, papers):
+    """A client for the whole app, started over the generated papers."""
+    standin.setenv("PQA_HOME", str(papers))
+    standin.setenv("FAST_AURELIAN_LOG_ASYNC", "false")
+    get_job_manager.cache_clear()
+    get_paperqa_service.cache_clear()
+    with TestClient(create_app()) as client:
+        yield client
+    get_job_manager.cache_clear()
+    get_paperqa_service.cache_clear()
+
+
+def wait_until(check, message: str):
+    for _ in range(3000):
+        if result := check():
+            return result
+        time.sleep(0.01)
+    raise AssertionError(message)
+
+
+def test_app_reports_ready_once_warm_up_finishes(app_client):
+    def ready():
+        response = app_client.get("/ready")
+        return response.json() if response.status_code == 200 else None
+
+    report = wait_until(ready, "The app never became ready")
+    assert report["steps"] == ["service", "jobs"] and report["error"] is None
+
+    assert app_client.get("/health").json()["status"] == "healthy"
+    assert app_client.get("/").json()["agents"] == ["paperqa"]
+    status = app_client.get("/api/paperqa/status").json()
+    assert status["paper_count"] == 3 and not status["index_exists"]
+    # Served by the service warm-up built, so its stats are exported
+    assert 'paperqa_cache_misses_total{cache="answer"} 0' in app_client.get("/metrics").text
+
+
+def test_index_and_add_run_as_jobs_reported_through_the_job_routes(app_client, tmp_path):
+    api = "/api/paperqa"
+    response = app_client.post(f"{api}/index", json={})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["kind"] == "index" and job["status_url"] == f"{api}/jobs/{job['job_id']}"
+
+    def finished():
+        state = app_client.get(job["status_url"]).json()
+        return state if state["status"] in ("succeeded", "failed") else None
+
+    done = wait_until(finished, "The index job never finished")
+    assert done["status"] == "succeeded" and done["progress"]["files_total"] == 3
+    assert done["result"]["success"]
+    listed = app_client.get(f"{api}/jobs", params={"status": "succeeded"}).json()["jobs"]
+    assert [item["id"] for item in listed] == [job["job_id"]] and "result" not in listed[0]
+
+    paper = tmp_path / "added.txt"
+    paper.write_text("Enzymes catalyse reactions in living cells. " * 40)
+    added = app_client.post(f"{api}/add", json={"path": str(paper), "wait": True}).json()
+    assert added["success"]
+    assert app_client.get(f"{api}/status").json()["indexed_count"] == 4
+
+    assert app_client.get(f"{api}/jobs/missing").status_code == 404
+    assert app_client.post(f"{api}/jobs/missing/cancel").status_code == 404
+    finished = app_client.post(f"{api}/jobs/{job['job_id']}/cancel")
+    assert finished.status_code == 409
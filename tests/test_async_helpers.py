@@ -0,0 +1,37 @@
+import asyncio
+
+from src.fast_aurelian.utils.async_helpers import SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*[flights.do("key", work) for _ in range(5)])
+
+    assert asyncio.run(main()) == ["done"] * 5
+    assert len(runs) == 1
+    assert flights.stats() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_single_flight_keeps_running_while_other_waiters_remain():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.create_task(flights.do("key", work))
+        second = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
@@ -0,0 +1,51 @@
+from tests.benchmark import compare, generate_corpus, percentiles
+
+
+def test_generated_corpora_are_deterministic_per_size(tmp_path):
+    questions = generate_corpus(tmp_path / "a", 3, words=50)
+    assert generate_corpus(tmp_path / "b", 3, words=50) == questions
+    generate_corpus(tmp_path / "c", 4, words=50)
+
+    papers = sorted(path.name for path in (tmp_path / "a").iterdir())
+    assert papers == ["paper_00000.txt", "paper_00001.txt", "paper_00002.txt"]
+    first = (tmp_path / "a" / papers[0]).read_text()
+    assert first == (tmp_path / "b" / papers[0]).read_text()
+    assert first != (tmp_path / "c" / papers[0]).read_text()
+    assert len(first.split()) >= 50
+
+
+def test_compare_flags_regressions_in_the_worse_direction():
+    assert percentiles([]) == dict.fromkeys(("p50", "p90", "p99", "max", "mean"))
+    assert percentiles([float(n) for n in range(1, 101)])["p90"] == 90.0
+
+    def results(docs_per_sec: float, p99_ms: float) -> dict:
+        return {
+            "index": [
+                {
+                    "documents": 10,
+                    "docs_per_sec": docs_per_sec,
+                    "seconds": 1.0,
+                    "rebuild_seconds": 0,
+                }
+            ],
+            "query": [
+                {
+                    "concurrency": 8,
+                    "throughput_rps": 4.0,
+                    "success_ratio": 1.0,
+                    "p50_ms": 100.0,
+                    "p90_ms": 150.0,
+                    "p99_ms": p99_ms,
+                }
+            ],
+        }
+
+    rows = {row["metric"]: row for row in compare(results(10, 200), results(12, 260), 0.1)}
+    # Faster builds are an improvement, a slower tail is a regression
+    assert not rows["index.n10.docs_per_sec"]["regressed"]
+    assert rows["query.c8.p99_ms"]["regressed"] and rows["query.c8.p99_ms"]["change"] == 0.3
+    assert not rows["index.n10.rebuild_seconds"]["regressed"]
+    assert [name for name, row in rows.items() if row["regressed"]] == ["query.c8.p99_ms"]
+
+    slower = {row["metric"]: row for row in compare(results(10, 200), results(8, 200), 0.1)}
+    assert slower["index.n10.docs_per_sec"]["regressed"]
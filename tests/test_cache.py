@@ -0,0 +1,69 @@
+import asyncio
+import sqlite3
+import time
+
+from src.fast_aurelian.utils.cache import ResponseCache, SQLiteCache, TTLCache, make_cache_key
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("dir", "a", 1)
+    cache.set("dir", "b", 2)
+    assert cache.get("dir", "a") == 1
+    cache.set("dir", "c", 3)
+
+    assert cache.get("dir", "b") is None
+    assert cache.get("dir", "a") == 1
+    assert cache.get("dir", "c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=0.01)
+    cache.set("dir", "a", 1)
+    time.sleep(0.02)
+    assert cache.get("dir", "a") is None
+
+
+def test_response_cache_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "answers.sqlite"
+    key = make_cache_key("what is this paper about?", 5, 0.1, 10, "fingerprint")
+
+    async def populate():
+        cache = ResponseCache(path=path)
+        await cache.set("/papers", key, {"answer": "42"})
+
+    async def read_back():
+        cache = ResponseCache(path=path)
+        value = await cache.get("/papers", key)
+        await cache.invalidate("/papers")
+        return value, await cache.get("/papers", key), cache.stats()
+
+    asyncio.run(populate())
+    value, after_invalidate, stats = asyncio.run(read_back())
+
+    assert value == {"answer": "42"}
+    assert after_invalidate is None
+    assert stats["disk_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_disk_tier_keeps_namespaces_apart(tmp_path):
+    path = tmp_path / "answers.sqlite"
+    with sqlite3.connect(path) as conn:
+        # A cache file from before keys were scoped to their namespace
+        conn.execute(
+            "CREATE TABLE entries (namespace TEXT NOT NULL, key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+    conn.close()
+
+    cache = SQLiteCache(path, ttl=60)
+    cache.set("/a", "question", "answer a")
+    cache.set("/b", "question", "answer b")
+    assert (cache.get("/a", "question"), cache.get("/b", "question")) == ("answer a", "answer b")
+
+    expiring = SQLiteCache(path, ttl=-1)
+    expiring.set("/a", "question", "stale")
+    assert expiring.get("/a", "question") is None
+    assert cache.get("/b", "question") == "answer b"
+    assert len(cache) == 1
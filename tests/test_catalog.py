@@ -0,0 +1,43 @@
+import asyncio
+
+from src.fast_aurelian.services.catalog import DirectoryCatalog
+
+
+def test_catalog_follows_changes_and_reloads_index_on_fingerprint(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"a")
+    (tmp_path / ".download.part").write_bytes(b"partial")
+    fingerprint = ["-|-"]
+    loads = []
+
+    async def load_index():
+        loads.append(fingerprint[0])
+        return {"a.pdf": "complete"}
+
+    async def scenario():
+        catalog = DirectoryCatalog(tmp_path, lambda: fingerprint[0], load_index, watch=False)
+        first = await catalog.snapshot()
+        assert first["documents"]["all"] == ["a.pdf"]
+        assert first["indexed"] == {} and not first["index_exists"]
+        # Unchanged directory and index: the same snapshot, no index reads
+        assert await catalog.snapshot() is first and loads == []
+
+        fingerprint[0] = "1:10|2:20"
+        indexed = await catalog.snapshot()
+        assert indexed["indexed"] == {"a.pdf": "complete"} and indexed["index_exists"]
+        await catalog.snapshot()
+        assert loads == ["1:10|2:20"]
+
+        (tmp_path / "B.MD").write_text("b")
+        assert catalog.apply(tmp_path / "B.MD")
+        assert not catalog.apply(tmp_path / "B.MD")
+        assert not catalog.apply(tmp_path / "notes.docx")
+        assert (await catalog.snapshot())["documents"]["md"] == ["B.MD"]
+
+        # Changes that never arrived as notifications are picked up by a rescan
+        (tmp_path / "a.pdf").unlink()
+        assert await catalog.reconcile() == 1
+        return await catalog.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["documents"]["all"] == ["B.MD"]
+    assert snapshot["documents"]["pdf"] == []
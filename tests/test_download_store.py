@@ -0,0 +1,32 @@
+import hashlib
+
+from src.fast_aurelian.utils.download_store import DownloadStore, source_key
+
+
+def store_text(store, source, text):
+    part = store.root / f"{source[-1]}.part"
+    part.write_text(text)
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    return store.add([source], part, digest, "paper.pdf")
+
+
+def test_source_keys_normalize_dois_and_fragments():
+    assert source_key("https://doi.org/10.1000/ABC") == "doi:10.1000/abc"
+    assert source_key("doi:10.1000/abc") == source_key("10.1000/abc")
+    assert source_key("https://example.org/a.pdf#page=2") == "https://example.org/a.pdf"
+
+
+def test_documents_are_linked_and_evicted_least_recently_used(tmp_path):
+    store = DownloadStore(tmp_path / "store", max_bytes=10)
+    first = store_text(store, "https://doi.org/10.1000/a", "aaaa")
+    store_text(store, "https://example.org/b", "bbbb")
+
+    assert store.lookup("doi:10.1000/A").sha256 == first.sha256
+    assert store.place(first, tmp_path / "a.pdf") == "hardlink"
+    assert (tmp_path / "a.pdf").read_text() == "aaaa"
+
+    store_text(store, "https://example.org/c", "cccc")
+
+    assert store.lookup("https://example.org/b") is None
+    assert store.lookup("10.1000/a") is not None
+    assert store.usage()["objects"] == 2
@@ -0,0 +1,70 @@
+import asyncio
+import multiprocessing
+
+from src.fast_aurelian.services.embeddings import CachedEmbeddingModel
+from src.fast_aurelian.utils.embedding_cache import EmbeddingCache, EmbeddingStore, text_digest
+from tests.test_embeddings import CountingEmbeddingModel
+
+
+def test_store_persists_across_reload(tmp_path):
+    store = EmbeddingStore(tmp_path, max_entries=10)
+    store.put_many([text_digest("a"), text_digest("b")], [[1.0, 2.0], [3.0, 4.0]])
+    store.flush()
+
+    reloaded = EmbeddingStore(tmp_path, max_entries=10)
+    a, b, c = reloaded.get_many([text_digest("a"), text_digest("b"), text_digest("c")])
+
+    assert a.tolist() == [1.0, 2.0]
+    assert b.tolist() == [3.0, 4.0]
+    assert c is None
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = EmbeddingStore(tmp_path, max_entries=2)
+    store.put_many([text_digest("a"), text_digest("b")], [[1.0], [2.0]])
+    store.get_many([text_digest("a")])
+    store.put_many([text_digest("c")], [[3.0]])
+
+    a, b, c = store.get_many([text_digest(text) for text in "abc"])
+
+    assert a is not None and c is not None
+    assert b is None
+    assert store.evictions == 1
+
+
+def test_cached_model_only_embeds_misses(tmp_path):
+    inner = CountingEmbeddingModel(calls=[])
+    model = CachedEmbeddingModel.wrap(inner, EmbeddingCache(tmp_path))
+
+    first = asyncio.run(model.embed_documents(["a", "b"]))
+    second = asyncio.run(model.embed_documents(["b", "c"]))
+
+    assert second[0] == first[1]
+    assert inner.calls == [["a", "b"], ["c"]]
+    assert model.stats() == {"hits": 1, "misses": 3, "hit_ratio": 0.25}
+
+
+def put_range(directory, start: int) -> None:
+    store = EmbeddingStore(directory, max_entries=1000)
+    for n in range(start, start + 50):
+        store.put_many([text_digest(str(n))], [[float(n), 1.0]])
+
+
+def test_processes_share_a_store(tmp_path):
+    first = EmbeddingStore(tmp_path, max_entries=1000)
+    first.put_many([text_digest("a")], [[1.0, 2.0]])
+    second = EmbeddingStore(tmp_path, max_entries=1000)
+    assert second.get_many([text_digest("a")])[0].tolist() == [1.0, 2.0]
+
+    # Writers in other processes take turns and each sees the others' rows
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=put_range, args=(tmp_path, start)) for start in (0, 50)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0, 0]
+
+    vectors = first.get_many([text_digest(str(n)) for n in range(100)])
+    assert [vector[0] for vector in vectors] == [float(n) for n in range(100)]
+    assert len(first.rows) == 101
@@ -0,0 +1,29 @@
+import asyncio
+
+from lmi import EmbeddingModel
+
+from src.fast_aurelian.services.embeddings import PrecomputedEmbeddingModel
+
+
+class CountingEmbeddingModel(EmbeddingModel):
+    name: str = "counting"
+    calls: list[list[str]] = []
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+
+def test_precomputed_embeddings_batch_known_texts_and_delegate_the_rest():
+    async def scenario():
+        inner = CountingEmbeddingModel(calls=[])
+        model = await PrecomputedEmbeddingModel.for_texts(inner, ["a", "bb", "a"])
+        known = await model.embed_documents(["bb", "a"])
+        other = await model.embed_documents(["cccc", "a"])
+        return inner.calls, known, other
+
+    calls, known, other = asyncio.run(scenario())
+
+    assert calls == [["a", "bb"], ["cccc"]]
+    assert known == [[2.0], [1.0]]
+    assert other == [[4.0], [1.0]]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from paperqa.types import Doc, Text
+
+from src.fast_aurelian.services.evidence import EvidenceIndex, normalize
+
+
+def make_index(vectors: list[list[float]], documents: list[str]) -> EvidenceIndex:
+    docs = {name: Doc(docname=name, dockey=name, citation=name) for name in documents}
+    return EvidenceIndex(
+        search_index=None,
+        texts=[
+            Text(text=f"text {i}", name=f"chunk {i}", doc=docs[name])
+            for i, name in enumerate(documents)
+        ],
+        documents=np.asarray(documents, dtype=object),
+        matrix=normalize(np.asarray(vectors, dtype=np.float32)),
+        load_time=0.0,
+    )
+
+
+def test_evidence_ranking_pages_and_fuses_keyword_ranks():
+    index = make_index(
+        [[1, 0], [0.9, 0.1], [0.5, 0.5], [0, 1], [0.1, 0.9]],
+        ["a.pdf", "a.pdf", "b.pdf", "c.pdf", "c.pdf"],
+    )
+    query = np.array([2.0, 0.0])
+
+    everything = index.rank(query, limit=10)
+    assert [hit["chunk"] for hit in everything] == [f"chunk {i}" for i in (0, 1, 2, 4, 3)]
+    assert everything[0]["score"] == pytest.approx(1.0)
+    assert all(hit["keyword_rank"] is None for hit in everything)
+
+    # Pages are consecutive slices of the same ranking
+    pages = index.rank(query, limit=2) + index.rank(query, limit=2, offset=2)
+    assert pages == everything[:4]
+    assert index.rank(query, limit=2, offset=5) == []
+
+    # A strong keyword match lifts its document's chunks, scores stay cosine similarities
+    fused = index.rank(query, limit=3, keyword_ranks={"c.pdf": 0})
+    assert [hit["document"] for hit in fused][:1] == ["c.pdf"]
+    assert fused[0]["keyword_rank"] == 0 and fused[0]["score"] < 0.2
+
+    # Copies handed out carry the (normalized) embedding and leave the index untouched
+    text = index.text(1)
+    text.doc.docname = "renamed"
+    assert text.embedding == pytest.approx(normalize(np.array([0.9, 0.1])).tolist())
+    assert index.texts[1].doc.docname == "a.pdf" and index.texts[1].embedding is None
+
+    with pytest.raises(ValueError):
+        index.rank(np.array([1.0, 0.0, 0.0]), limit=1)
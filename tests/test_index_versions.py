@@ -0,0 +1,55 @@
+import asyncio
+import os
+
+from src.fast_aurelian.services.index_versions import IndexVersions
+
+
+async def build(versions: IndexVersions, name: str, discard: bool = False) -> str:
+    async with versions.writing() as write:
+        index = write.directory / "pqa_index"
+        (index / "docs").mkdir(parents=True, exist_ok=True)
+        (index / "docs" / f"{name}.zip").write_text(name)
+        (index / "files.zip").write_text(name)
+        if discard:
+            write.discard()
+    return write.version
+
+
+def test_readers_keep_their_version_until_released(tmp_path):
+    # Locks are per open file, so two instances behave like two worker processes
+    writer, reader = IndexVersions(tmp_path), IndexVersions(tmp_path)
+    first = asyncio.run(build(writer, "a"))
+
+    with reader.reading() as pinned:
+        assert pinned == first
+        second = asyncio.run(build(writer, "b"))
+        assert reader.current() == second
+        # The version being read survived collection, unchanged
+        assert (reader.directory(first) / "pqa_index" / "files.zip").read_text() == "a"
+        new_index = reader.directory(second) / "pqa_index"
+        assert (new_index / "files.zip").read_text() == "b"
+        # Unchanged documents are shared with the previous version, not copied
+        assert os.stat(new_index / "docs" / "a.zip").st_nlink == 2
+
+    assert writer.collect() == [first]
+    assert not reader.directory(first).exists()
+
+    discarded = asyncio.run(build(writer, "c", discard=True))
+    assert writer.current() == second
+    assert not writer.directory(discarded).exists()
+
+
+def test_unversioned_index_is_migrated_then_collected(tmp_path):
+    legacy = tmp_path / "pqa_index"
+    legacy.mkdir()
+    (legacy / "files.zip").write_text("legacy")
+    versions = IndexVersions(tmp_path)
+
+    with versions.reading() as pinned:
+        assert pinned is None
+    version = asyncio.run(build(versions, "new"))
+
+    index = versions.directory(version) / "pqa_index"
+    assert (index / "files.zip").read_text() == "new"
+    assert not legacy.exists()
+    assert versions.stats()["versions"] == [version]
@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+
+from src.fast_aurelian.services.ingest import BulkIngest, known_digests
+
+PAGES = {"/a.pdf": b"first paper", "/b": b"second paper", "/mirror/a.pdf": b"first paper"}
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path not in PAGES:
+        return httpx.Response(404)
+    return httpx.Response(
+        200, content=PAGES[request.url.path], headers={"content-type": "application/pdf"}
+    )
+
+
+def test_bulk_ingest_deduplicates_by_url_and_content(tmp_path):
+    (tmp_path / "old.pdf").write_bytes(b"second paper")
+    items = [
+        {"path": "https://example.org/a.pdf", "citation": "A, 2020"},
+        {"path": "https://example.org/a.pdf#page=2"},
+        {"path": "https://example.org/mirror/a.pdf"},
+        {"path": "https://example.org/b"},
+        {"path": "https://example.org/missing.pdf"},
+    ]
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            ingest = BulkIngest(tmp_path, client, known_digests(tmp_path, {}), concurrency=1)
+            return await ingest.run(items)
+
+    reports = asyncio.run(scenario())
+
+    statuses = [report["status"] for report in reports]
+    assert statuses == ["added", "duplicate", "duplicate", "exists", "failed"]
+    assert reports[0]["citation"] == "A, 2020"
+    assert reports[1]["duplicate_of"] == 0
+    assert reports[2]["file"] == "a.pdf"
+    assert reports[3]["file"] == "old.pdf"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.pdf", "old.pdf"]
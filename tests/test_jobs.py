@@ -0,0 +1,181 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from src.fast_aurelian.services.jobs import Job, JobManager, JobStatus, JobStore
+
+
+async def wait_for(manager: JobManager, job_id: str, *statuses: JobStatus) -> Job:
+    for _ in range(200):
+        job = await manager.get(job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} stayed {job.status}")
+
+
+def test_jobs_run_report_progress_and_fail_on_unsuccessful_results(tmp_path):
+    release = asyncio.Event()
+
+    async def index(job: Job):
+        job.update_progress(1, 2)
+        await release.wait()
+        return {"success": job.params["ok"], "message": "Error indexing documents: boom"}
+
+    async def scenario():
+        manager = JobManager(workers=1, store=JobStore(tmp_path / "jobs.sqlite"))
+        manager.register("index", index)
+        with pytest.raises(ValueError, match="Unknown job kind"):
+            await manager.submit("build")
+
+        ok = await manager.submit("index", ok=True)
+        failing = await manager.submit("index", ok=False)
+        running = await wait_for(manager, ok.id, JobStatus.RUNNING)
+        assert running.to_dict()["progress"] == {"files_done": 1, "files_total": 2}
+        assert (await manager.get(failing.id)).status == JobStatus.QUEUED
+
+        release.set()
+        done = await wait_for(manager, ok.id, JobStatus.SUCCEEDED)
+        assert done.result["success"] and done.error is None and done.duration >= 0
+        failed = await wait_for(manager, failing.id, JobStatus.FAILED)
+        assert failed.error == "Error indexing documents: boom"
+        assert [job.id for job in await manager.list_jobs("failed")] == [failing.id]
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_only_queued_jobs_can_be_cancelled(tmp_path):
+    async def scenario():
+        manager = JobManager(store=JobStore(tmp_path / "jobs.sqlite"))
+        manager.register("index", lambda _: asyncio.sleep(0, {"success": True}))
+        # Queued without workers running
+        job = Job(kind="index", params={})
+        manager.store.add(job)
+
+        assert (await manager.cancel(job.id)).status == JobStatus.CANCELLED
+        assert (await manager.get(job.id)).finished_at is not None
+        with pytest.raises(ValueError, match="cancelled and can no longer be cancelled"):
+            await manager.cancel(job.id)
+        with pytest.raises(KeyError):
+            await manager.cancel("missing")
+
+    asyncio.run(scenario())
+
+
+def test_workers_sharing_a_store_run_each_job_once(tmp_path):
+    runs = []
+
+    async def index(job: Job):
+        runs.append(job.id)
+        await asyncio.sleep(0.01)
+        return {"success": True}
+
+    async def scenario():
+        managers = [
+            JobManager(workers=2, store=JobStore(tmp_path / "jobs.sqlite"), poll_interval=0.01)
+            for _ in range(3)
+        ]
+        for manager in managers:
+            manager.register("index", index)
+            await manager.start()
+        jobs = [await managers[n % 3].submit("index") for n in range(12)]
+
+        # Every manager reports every job, whichever ran it
+        for job in jobs:
+            await wait_for(managers[0], job.id, JobStatus.SUCCEEDED)
+            assert (await managers[2].get(job.id)).status == JobStatus.SUCCEEDED
+        for manager in managers:
+            await manager.stop()
+
+    asyncio.run(scenario())
+    assert sorted(runs) == sorted(set(runs)) and len(runs) == 12
+
+
+def test_restart_resumes_queued_and_abandoned_jobs(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+    store = JobStore(path)
+    abandoned = Job(kind="index", params={})
+    queued = Job(kind="index", params={})
+    for job in (abandoned, queued):
+        store.add(job)
+    # A previous process claimed one and died without a heartbeat since
+    claimed = store.claim("dead-worker", stale_before=0)
+    assert claimed.id == abandoned.id and claimed.status == JobStatus.RUNNING
+    assert store.get(queued.id).status == JobStatus.QUEUED
+
+    async def scenario():
+        manager = JobManager(store=JobStore(path), lease=0.05, poll_interval=0.01)
+        manager.register("index", lambda _: asyncio.sleep(0, {"success": True}))
+        await manager.start()
+        for job in (abandoned, queued):
+            done = await wait_for(manager, job.id, JobStatus.SUCCEEDED)
+            assert done.started_at > claimed.started_at
+        await manager.stop()
+
+    time.sleep(0.1)
+    asyncio.run(scenario())
+
+
+def test_shutdown_leaves_the_running_job_queued(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+
+    async def scenario():
+        manager = JobManager(store=JobStore(path))
+        manager.register("index", lambda _: asyncio.sleep(60))
+        job = await manager.submit("index")
+        await wait_for(manager, job.id, JobStatus.RUNNING)
+        await manager.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    stored = JobStore(path).get(job.id)
+    assert stored.status == JobStatus.QUEUED and stored.started_at is None
+
+
+def test_a_worker_that_loses_its_claim_stops_running_the_job(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+    cancelled = asyncio.Event()
+    heartbeats = []
+
+    async def index(_):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def scenario():
+        store = JobStore(path)
+        update = store.update
+
+        def flaky_update(job: Job, owner: str) -> bool:
+            heartbeats.append(job.status)
+            if len(heartbeats) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return update(job, owner)
+
+        store.update = flaky_update
+        manager = JobManager(store=store, lease=1.0, poll_interval=0.01)
+        manager.register("index", index)
+        job = await manager.submit("index")
+        await wait_for(manager, job.id, JobStatus.RUNNING)
+        while len(heartbeats) < 3:
+            await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+
+        # Queued again and claimed by another worker, as if this one had stalled
+        assert JobStore(path).claim("other-worker", stale_before=time.time() + 1).id == job.id
+        async with asyncio.timeout(1):
+            await cancelled.wait()
+        await asyncio.sleep(0.05)
+        assert job.id not in manager.running
+        await manager.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    stored = JobStore(path).get(job.id)
+    assert stored.status == JobStatus.RUNNING and stored.result is None
+    assert heartbeats[-1] == JobStatus.RUNNING
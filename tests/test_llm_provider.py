@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import httpx
+
+from src.fast_aurelian.services.llm_provider import (
+    ExchangeLog,
+    RecordingTransport,
+    ReplayTransport,
+    StandinTransport,
+)
+
+CHAT_URL = "https://api.openai.com/v1/chat/completions"
+EMBEDDINGS_URL = "https://api.openai.com/v1/embeddings"
+
+
+def test_standin_is_deterministic_and_walks_agent_tools():
+    async def scenario():
+        standin = StandinTransport(latency=0, tokens_per_second=0, embedding_dim=64)
+        async with httpx.AsyncClient(transport=standin) as client:
+            texts = ["protein folding", "protein folding in cells", "galaxy orbits"]
+            embedded = await client.post(EMBEDDINGS_URL, json={"model": "e", "input": texts})
+            again = await client.post(EMBEDDINGS_URL, json={"model": "e", "input": texts})
+            assert embedded.content == again.content
+            vectors = [item["embedding"] for item in embedded.json()["data"]]
+            similarity = [
+                sum(a * b for a, b in zip(vectors[0], v, strict=True)) for v in vectors[1:]
+            ]
+            assert len(vectors[0]) == 64 and similarity[0] > similarity[1]
+
+            tools = [
+                {"type": "function", "function": {"name": name, "parameters": parameters}}
+                for name, parameters in [
+                    ("complete", {"properties": {"ok": {"type": "boolean"}}, "required": ["ok"]}),
+                    (
+                        "paper_search",
+                        {"properties": {"query": {"type": "string"}}, "required": ["query"]},
+                    ),
+                ]
+            ]
+            messages = [{"role": "user", "content": "What folds proteins?"}]
+            first = (
+                await client.post(CHAT_URL, json={"messages": messages, "tools": tools})
+            ).json()
+            call = first["choices"][0]["message"]["tool_calls"][0]["function"]
+            assert call["name"] == "paper_search"
+            assert json.loads(call["arguments"]) == {"query": "What folds proteins?"}
+
+            messages.append(first["choices"][0]["message"])
+            second = (
+                await client.post(CHAT_URL, json={"messages": messages, "tools": tools})
+            ).json()
+            assert (
+                second["choices"][0]["message"]["tool_calls"][0]["function"]["name"] == "complete"
+            )
+
+            streamed = await client.post(CHAT_URL, json={"messages": messages[:1], "stream": True})
+            assert streamed.text.endswith("data: [DONE]\n\n")
+
+    asyncio.run(scenario())
+
+
+def test_replay_serves_recorded_exchanges_byte_for_byte(tmp_path):
+    async def scenario():
+        upstream = StandinTransport(latency=0, tokens_per_second=0)
+        recorder = RecordingTransport(ExchangeLog(tmp_path), inner=upstream)
+        replayer = ReplayTransport(ExchangeLog(tmp_path))
+        body = {"model": "m", "messages": [{"role": "user", "content": "Hello"}], "stream": True}
+        async with httpx.AsyncClient(transport=recorder) as client:
+            recorded = await client.post(CHAT_URL, json=body)
+        async with httpx.AsyncClient(transport=replayer) as client:
+            # Key order does not matter, the network is never used
+            replayed = await client.post(CHAT_URL, json=dict(reversed(body.items())))
+            missing = await client.post(CHAT_URL, json={**body, "model": "other"})
+        assert replayed.content == recorded.content
+        assert replayed.headers["content-type"] == "text/event-stream"
+        assert missing.status_code == 404 and replayer.missed == 1
+        assert upstream.requests == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+import io
+import json
+import uuid
+
+from loguru import logger
+
+from src.fast_aurelian.utils.logs import LogFilter, QueuedLogSink
+
+
+def capture(log_filter: LogFilter) -> tuple[list, int]:
+    records = []
+    handler = logger.add(
+        lambda message: records.append(message.record),
+        level=log_filter.min_level,
+        filter=log_filter,
+    )
+    return records, handler
+
+
+def test_filter_applies_route_levels_and_samples_successful_requests():
+    log_filter = LogFilter("INFO", {"/health": "WARNING", "/api/paperqa/query": "DEBUG"}, 0.0)
+    records, handler = capture(log_filter)
+    try:
+        with logger.contextualize(path="/health", correlation_id=str(uuid.uuid4())):
+            logger.info("probe")
+            logger.warning("probe failing")
+        with logger.contextualize(path="/api/paperqa/query/stream", correlation_id="0" * 32):
+            logger.debug("unsampled")
+            logger.info("failed request", status_code=500)
+        logger.info("outside a request")
+    finally:
+        logger.remove(handler)
+
+    assert [record["message"] for record in records] == [
+        "probe failing",
+        "failed request",
+        "outside a request",
+    ]
+
+
+def test_queued_sink_writes_json_lines_and_drains_on_stop():
+    stream = io.StringIO()
+    sink = QueuedLogSink(stream, serialize=True, batch_size=8)
+    handler = logger.add(sink, format="{message}")
+    with logger.contextualize(correlation_id="abc"):
+        for n in range(20):
+            logger.info(f"record {n}")
+    logger.remove(handler)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == [f"record {n}" for n in range(20)]
+    assert lines[0]["correlation_id"] == "abc"
+    assert lines[0]["level"] == "INFO"
+    assert sink.stats() == {"queued": 0, "written": 20, "dropped": 0}
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.fast_aurelian.middleware.metrics import MetricsMiddleware
+from src.fast_aurelian.services.llm_metrics import LLMMetricsLogger
+from src.fast_aurelian.utils.metrics import AppMetrics, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+    child = latency.labels("/a")
+    for value in (0.05, 0.1, 0.5, 3):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+def test_middleware_labels_requests_by_route_template():
+    metrics = AppMetrics()
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware, metrics=metrics, router=app.router)
+    client = TestClient(app)
+    for item_id in ("a", "b", "missing"):
+        client.get(f"/items/{item_id}")
+    client.get("/nowhere")
+
+    route = "/items/{item_id}"
+    assert sum(metrics.http_duration.labels(route, "GET").counts) == 3
+    assert metrics.http_responses.labels(route, "GET", "2xx").value == 2
+    assert metrics.http_responses.labels(route, "GET", "4xx").value == 1
+    assert metrics.http_responses.labels("unmatched", "GET", "4xx").value == 1
+    assert metrics.http_in_flight.labels(route).value == 0
+
+
+def test_llm_calls_are_recorded_with_their_token_usage():
+    metrics = AppMetrics()
+    logger = LLMMetricsLogger(metrics)
+    start = datetime(2026, 1, 1)
+    end = start + timedelta(seconds=2)
+    response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=30, completion_tokens=5))
+
+    async def calls():
+        await logger.async_log_success_event({"model": "gpt"}, response, start, end)
+        await logger.async_log_failure_event({"model": "gpt"}, None, start, end)
+        await logger.async_log_success_event(
+            {"model": "emb", "call_type": "aembedding"}, response, start, end
+        )
+
+    asyncio.run(calls())
+    assert metrics.llm_requests.labels("gpt", "completion", "success").value == 1
+    assert metrics.llm_requests.labels("gpt", "completion", "failure").value == 1
+    assert metrics.llm_requests.labels("emb", "embedding", "success").value == 1
+    assert metrics.llm_tokens.labels("gpt", "prompt").value == 30
+    assert metrics.llm_tokens.labels("gpt", "completion").value == 5
+    assert sum(metrics.llm_duration.labels("gpt", "completion").counts) == 2
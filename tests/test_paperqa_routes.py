@@ -0,0 +1,195 @@
+from operator import itemgetter
+
+import httpx
+import numpy as np
+import orjson
+from fastapi import FastAPI
+
+from src.fast_aurelian.api.paperqa import get_paperqa_service, router
+from src.fast_aurelian.utils.responses import encode_cursor
+from tests.benchmark import generate_corpus
+
+
+def api(service) -> httpx.AsyncClient:
+    """A client for the PaperQA routes, served by the given service."""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_paperqa_service] = lambda: service
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_papers_are_listed_a_page_at_a_time_and_list_keeps_its_payload(run_service):
+    async def scenario(service):
+        async with api(service) as client:
+            legacy = await client.get("/api/paperqa/list")
+            first = (await client.get("/api/paperqa/papers", params={"limit": 2})).json()
+            second = await client.get(
+                "/api/paperqa/papers", params={"limit": 2, "cursor": first["next_cursor"]}
+            )
+            forged = await client.get(
+                "/api/paperqa/papers", params={"cursor": encode_cursor({"after": 5})}
+            )
+            stream = await client.get("/api/paperqa/papers/stream")
+        return legacy, first, second.json(), forged, stream
+
+    legacy, first, second, forged, stream = run_service(scenario)
+    names = ["paper_00000.txt", "paper_00001.txt", "paper_00002.txt"]
+
+    assert legacy.headers["deprecation"] == "true"
+    assert legacy.headers["link"] == '</api/paperqa/papers>; rel="successor-version"'
+    payload = legacy.json()
+    assert sorted(payload["files_in_directory"]) == names
+    assert sorted(payload["files_by_type"]["txt"]) == names
+    assert payload["document_counts"]["total"] == 3 and payload["indexed_papers"] == []
+
+    assert [paper["file"] for paper in first["papers"]] == names[:2]
+    assert first["total"] == 3 and first["document_counts"]["txt"] == 3
+    assert [paper["file"] for paper in second["papers"]] == names[2:]
+    assert second["next_cursor"] is None
+    assert second["papers"][0] == {"file": names[2], "type": "txt", "index_status": "not_indexed"}
+    assert forged.status_code == 400
+    assert [line for line in stream.text.splitlines() if names[1] in line]
+
+
+def event_names(body: str) -> list[str]:
+    return [line.removeprefix("event: ") for line in body.splitlines() if line.startswith("event:")]
+
+
+def test_query_and_agent_runs_stream_as_server_sent_events(run_service):
+    async def scenario(service):
+        await service.index_papers()
+        async with api(service) as client:
+            query = await client.post("/api/paperqa/query/stream", json={"query": "enzymes?"})
+            agent = await client.post(
+                "/api/paperqa/agent/stream",
+                json={"query": "Summarize the papers", "context": "for a review"},
+            )
+        return query, agent
+
+    query, agent = run_service(scenario)
+    assert query.headers["content-type"].startswith("text/event-stream")
+    events = event_names(query.text)
+    assert "token" in events and events[-2:] == ["result", "done"]
+    events = event_names(agent.text)
+    assert events[0] == "start" and "tool_call" in events and events[-2:] == ["result", "done"]
+
+
+def test_batches_answer_each_question_once_and_reuse_cached_answers(run_service):
+    questions = ["enzymes?", "proteins?", "membranes?"]
+
+    async def scenario(service):
+        await service.index_papers()
+        async with api(service) as client:
+            await client.post("/api/paperqa/query", json={"query": questions[0]})
+            batch = await client.post(
+                "/api/paperqa/query/batch", json={"queries": questions, "concurrency": 2}
+            )
+            too_many = await client.post(
+                "/api/paperqa/query/batch", json={"queries": [*questions, "cells?"]}
+            )
+        return batch, too_many
+
+    batch, too_many = run_service(scenario, batch_query_max_size=3)
+    assert batch.headers["content-type"] == "application/x-ndjson"
+    lines = sorted(
+        (orjson.loads(line) for line in batch.text.splitlines()), key=itemgetter("index")
+    )
+    assert [line["query"] for line in lines] == questions
+    assert all(line["success"] and line["result"]["answer"] for line in lines)
+    assert [bool(line.get("cached")) for line in lines] == [True, False, False]
+    assert too_many.status_code == 422
+
+
+def test_federated_queries_merge_evidence_and_report_missing_directories(run_service, tmp_path):
+    shard = tmp_path / "shard"
+    generate_corpus(shard, 2, words=120)
+    directories = [None, str(shard), str(tmp_path / "missing")]
+
+    async def scenario(service):
+        directories[0] = service.papers_dir
+        for directory in directories[:2]:
+            await service.index_papers(directory)
+        async with api(service) as client:
+            answer = await client.post(
+                "/api/paperqa/query/federated",
+                json={"query": "enzymes?", "directories": directories, "evidence_k": 6},
+            )
+            too_many = await client.post(
+                "/api/paperqa/query/federated",
+                json={"query": "enzymes?", "directories": [*directories, str(shard)]},
+            )
+        return answer.json(), too_many
+
+    result, too_many = run_service(scenario, federated_max_shards=3)
+    assert [shard["status"] for shard in result["shards"]] == ["ok", "ok", "missing"]
+    assert {hit["directory"] for hit in result["evidence"]} == set(directories[:2])
+    assert len(result["evidence"]) <= 6 and result["session"]["answer"]
+    assert too_many.status_code == 422
+
+
+def test_evidence_pages_follow_cursors_until_the_index_changes(run_service, papers):
+    async def scenario(service):
+        await service.index_papers()
+        async with api(service) as client:
+            request = {"query": "enzymes", "limit": 2, "keyword": True}
+            first = (await client.post("/api/paperqa/evidence", json=request)).json()
+            second = await client.post(
+                "/api/paperqa/evidence", json={**request, "cursor": first["next_cursor"]}
+            )
+            forged = await client.post(
+                "/api/paperqa/evidence",
+                json={**request, "cursor": encode_cursor({"offset": "2", "index_version": None})},
+            )
+            (papers / "added.txt").write_text("Enzymes catalyse reactions. " * 40)
+            await service.index_papers()
+            stale = await client.post(
+                "/api/paperqa/evidence", json={**request, "cursor": first["next_cursor"]}
+            )
+
+            async def embed_with_another_model(*_):
+                return np.ones(3, dtype=np.float32)
+
+            service.query_embeddings.embed = embed_with_another_model
+            mismatched = await client.post("/api/paperqa/evidence", json=request)
+        return first, second.json(), forged, stale, mismatched
+
+    first, second, forged, stale, mismatched = run_service(scenario)
+    assert first["total"] == 3 and len(first["results"]) == 2 and first["next_offset"] == 2
+    assert second["offset"] == 2 and len(second["results"]) == 1
+    assert second["next_cursor"] is None
+    seen = [result["document"] for result in first["results"] + second["results"]]
+    assert len(set(seen)) == 3
+    assert forged.status_code == 400
+    assert stale.status_code == 409
+    assert mismatched.status_code == 500 and "dimensions" in mismatched.json()["detail"]
+
+
+def test_bulk_adds_skip_repeated_papers_and_index_once(run_service, papers, tmp_path):
+    new = tmp_path / "new.txt"
+    new.write_text("Enzymes catalyse reactions in living cells. " * 40)
+    copy = tmp_path / "copy.txt"
+    copy.write_bytes((papers / "paper_00000.txt").read_bytes())
+    items = [
+        {"path": str(new), "citation": "Smith, Enzymes, 2020"},
+        {"path": str(new)},
+        {"path": str(copy)},
+        {"path": str(tmp_path / "missing.txt")},
+    ]
+
+    async def scenario(service):
+        async with api(service) as client:
+            added = await client.post("/api/paperqa/add/bulk", json={"papers": items, "wait": True})
+            too_many = await client.post(
+                "/api/paperqa/add/bulk", json={"papers": [*items, items[0]], "wait": True}
+            )
+            evidence = await client.post("/api/paperqa/evidence", json={"query": "enzymes"})
+        return added.json(), too_many, evidence.json()
+
+    result, too_many, evidence = run_service(scenario, bulk_add_max_size=4)
+    statuses = [item["status"] for item in result["items"]]
+    assert statuses == ["added", "duplicate", "exists", "failed"]
+    assert result["counts"] == {"added": 1, "exists": 1, "duplicate": 1, "failed": 1}
+    assert result["index_result"]["success"]
+    citations = {hit["document"]: hit["citation"] for hit in evidence["results"]}
+    assert "Smith, Enzymes, 2020" in citations.values() and len(citations) == 4
+    assert too_many.status_code == 422
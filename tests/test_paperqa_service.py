@@ -0,0 +1,139 @@
+from pathlib import Path
+
+import pytest
+
+from src.fast_aurelian.services.paperqa import NO_PAPERS_RESPONSE, PaperContextPool
+
+
+def version_files(service) -> set[str]:
+    versions = service._get_context(None).index_versions
+    directory = versions.directory(versions.current())
+    return {str(path.relative_to(directory)) for path in directory.rglob("*")}
+
+
+def test_agent_runs_and_searches_leave_the_published_index_untouched(run_service):
+    async def scenario(service):
+        assert await service.search_papers("enzymes") == NO_PAPERS_RESPONSE
+        result = await service.index_papers()
+        assert result["success"] and result["index_version"]
+        before = version_files(service)
+
+        search = await service.search_papers("enzymes", max_papers=2)
+        assert search.session.answer
+        agent = await service.run_agent("What do the papers say about enzymes?")
+        assert agent.output
+        events = [event async for event, _ in service.stream_agent("Summarize the papers")]
+        assert "tool_call" in events and events[-1] == "result"
+
+        # No "answers" index is written into the pinned version
+        assert version_files(service) == before
+
+    run_service(scenario)
+
+
+def test_answers_are_cached_until_the_collection_changes(run_service, papers, tmp_path):
+    question = "What do the papers say about enzymes?"
+
+    async def scenario(service):
+        await service.index_papers()
+        first = await service.query_papers(question)
+        assert await service.query_papers(f"  {question.upper()} ") == first
+        await service.query_papers(question, max_sources=2)
+        stats = service.get_stats()["answer_cache"]
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+        (papers / "added.txt").write_text("Enzymes catalyse reactions. " * 40)
+        await service.index_papers()
+        await service.query_papers(question)
+        stats = service.get_stats()["answer_cache"]
+        assert stats["invalidations"] == 1 and stats["misses"] == 3
+        return first
+
+    answer_cache_path = tmp_path / "answers.sqlite"
+    first = run_service(scenario, answer_cache_path=answer_cache_path)
+    assert first["status"] == "success" and first["answer"]["question"] == question
+
+    async def restarted(service):
+        await service.query_papers(question)
+        return service.get_stats()["answer_cache"]
+
+    # A new process answers from the disk tier
+    stats = run_service(restarted, answer_cache_path=answer_cache_path)
+    assert stats["disk_hits"] == 1
+
+
+def test_status_reports_counts_and_upper_case_suffixes_are_indexed(run_service, papers):
+    (papers / "NOTES.HTML").write_text("<p>Enzymes catalyse reactions in living cells.</p>" * 40)
+
+    async def scenario(service):
+        await service.index_papers()
+        evidence = await service.search_evidence("enzymes", limit=20)
+        return await service.get_status(), await service.list_paper_page(), evidence
+
+    status, page, evidence = run_service(scenario)
+    assert "papers_found" not in status
+    assert status["paper_count"] == 4 and status["document_counts"]["html"] == 1
+    assert status["indexed_count"] == 4 and status["index_exists"]
+    notes = next(paper for paper in page["papers"] if paper["file"] == "NOTES.HTML")
+    assert notes == {"file": "NOTES.HTML", "type": "html", "index_status": "indexed"}
+    # Parsed as HTML, not as plain text
+    chunks = [result["excerpt"] for result in evidence["results"]]
+    assert any("Enzymes catalyse" in chunk for chunk in chunks)
+    assert not any("<p>" in chunk for chunk in chunks)
+
+
+@pytest.mark.usefixtures("standin")
+def test_context_pool_reuses_contexts_by_resolved_directory_and_evicts_the_oldest():
+    pool = PaperContextPool(maxsize=2)
+    first = pool.get("a")
+    assert pool.get(str(Path("a").resolve())) is first and "a" in pool
+    assert first.deps.paper_directory == str(Path("a").resolve())
+
+    second = pool.get("b")
+    assert second is not first and second.deps is not first.deps
+    pool.get("a")
+    # "b" is now the least recently used
+    pool.get("c")
+    assert len(pool) == 2 and "b" not in pool and pool.get("a") is first
+
+    pool.discard("a")
+    assert "a" not in pool and pool.get("a") is not first
+
+
+def test_reads_keep_their_index_version_while_builds_publish_newer_ones(run_service, papers):
+    async def scenario(service):
+        first = (await service.index_papers())["index_version"]
+        context = service._get_context(None)
+        versions = context.index_versions
+        with service._reading(context) as pinned:
+            (papers / "added.txt").write_text("Enzymes catalyse reactions. " * 40)
+            second = (await service.index_papers())["index_version"]
+            assert versions.current() == second != first
+            # The version being read survives the build that replaced it
+            assert versions.directory(first).is_dir()
+            assert pinned.index_fingerprint() != context.at_version(second).index_fingerprint()
+
+        (papers / "more.txt").write_text("Proteins fold into shapes. " * 40)
+        await service.index_papers()
+        return versions, first, second
+
+    versions, first, second = run_service(scenario)
+    # Collected by the next build once no longer read
+    assert not versions.directory(first).exists() and not versions.directory(second).exists()
+
+
+def test_emptying_the_directory_publishes_a_version_without_documents(run_service, papers):
+    for paper in sorted(papers.glob("*.txt"))[1:]:
+        paper.unlink()
+
+    async def scenario(service):
+        first = await service.index_papers()
+        (papers / "paper_00000.txt").unlink()
+        emptied = await service.index_papers()
+        return first, emptied, await service.get_status()
+
+    first, emptied, status = run_service(scenario)
+    assert first["changes"]["added"] == 1
+    assert emptied["success"] and emptied["changes"]["removed"] == 1
+    assert emptied["index_version"] != first["index_version"]
+    assert status["paper_count"] == 0 and status["indexed_count"] == 0
@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.fast_aurelian.middleware.compression import CompressionMiddleware, choose_encoding
+from src.fast_aurelian.utils.responses import (
+    CursorError,
+    FastJSONResponse,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def lines():
+    for n in range(3):
+        yield f'{{"n": {n}}}\n'
+
+
+app = Starlette(
+    routes=[
+        Route("/large", lambda _: FastJSONResponse({"papers": ["paper.pdf"] * 200})),
+        Route("/small", lambda _: FastJSONResponse({"ok": True})),
+        Route("/lines", lambda _: StreamingResponse(lines(), media_type="application/x-ndjson")),
+        Route("/events", lambda _: StreamingResponse(lines(), media_type="text/event-stream")),
+        Route(
+            "/text", lambda _: PlainTextResponse("x" * 2000, headers={"content-encoding": "x-test"})
+        ),
+    ]
+)
+app.add_middleware(CompressionMiddleware, min_size=500)
+
+
+def test_large_and_streamed_bodies_are_compressed():
+    client = TestClient(app)
+    headers = {"accept-encoding": "gzip"}
+
+    response = client.get("/large", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == {"papers": ["paper.pdf"] * 200}
+
+    with client.stream("GET", "/lines", headers=headers) as response:
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw).decode().splitlines() == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
+
+    # Small, server-sent and already encoded bodies pass through
+    for path in ("/small", "/events"):
+        assert "content-encoding" not in client.get(path, headers=headers).headers
+    assert client.get("/text", headers=headers).headers["content-encoding"] == "x-test"
+    assert "content-encoding" not in client.get("/large", headers={"accept-encoding": ""}).headers
+    assert choose_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert choose_encoding("identity") is None
+
+
+def test_cursors_round_trip_and_reject_tampering():
+    cursor = encode_cursor({"after": "paper ü.pdf"})
+    assert decode_cursor(cursor, after=str) == {"after": "paper ü.pdf"}
+    cursor = encode_cursor({"offset": 10, "index_version": None})
+    assert decode_cursor(cursor, offset=int, index_version=(str, type(None)))["offset"] == 10
+
+    for bad in ("not a cursor", encode_cursor({"offset": 3}), encode_cursor([1])):
+        with pytest.raises(CursorError):
+            decode_cursor(bad, after=str)
+    # Forged values of the wrong type or range
+    for position in ({"offset": "3"}, {"offset": -1}, {"offset": True}, {"offset": 1.5}):
+        with pytest.raises(CursorError):
+            decode_cursor(encode_cursor(position), offset=int)
+    with pytest.raises(CursorError):
+        decode_cursor(encode_cursor({"after": ["a"]}), after=str)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from paperqa.types import Doc, DocDetails
+
+from src.fast_aurelian.services.snapshot_sources import snapshot_source_allowed
+from src.fast_aurelian.services.snapshots import Snapshot, SnapshotError, write_snapshot
+
+from .test_evidence import make_index
+
+
+def write_index_files(index_path):
+    (index_path / "index").mkdir(parents=True)
+    (index_path / "index" / "meta.json").write_text("{}")
+    (index_path / "files.zip").write_bytes(b"file table")
+    (index_path / "index" / ".tantivy-writer.lock").write_text("")
+
+
+def test_snapshot_round_trips_evidence_and_index(tmp_path):
+    evidence = make_index([[1, 0], [0.5, 0.5], [0, 1]], ["a.pdf", "a.pdf", "b.pdf"])
+    details = DocDetails(docname="b", dockey="b", citation="b", title="B", doi="10.1/b")
+    evidence.texts[2] = evidence.texts[2].model_copy(update={"doc": details})
+    index_path = tmp_path / "version" / "pqa_index"
+    write_index_files(index_path)
+
+    header = write_snapshot(
+        tmp_path / "snapshot.pqasnap", evidence, index_path, {"embedding": "model|None"}
+    )
+    assert header["chunks"] == 3 and header["documents"] == 2
+
+    snapshot = Snapshot(tmp_path / "snapshot.pqasnap")
+    snapshot.verify()
+    loaded = snapshot.evidence_index(None)
+    query = np.array([0.2, 1.0])
+    assert loaded.rank(query, limit=3) == evidence.rank(query, limit=3)
+    assert isinstance(loaded.texts[2].doc, DocDetails) and loaded.texts[2].doc.doi == "10.1/b"
+    assert loaded.text(0).embedding == pytest.approx(evidence.matrix[0].tolist())
+
+    assert snapshot.extract_index(tmp_path / "replica") == 2
+    assert (tmp_path / "replica" / "files.zip").read_bytes() == b"file table"
+    assert not (tmp_path / "replica" / "index" / ".tantivy-writer.lock").exists()
+
+
+def test_corrupt_snapshot_fails_its_checksum(tmp_path):
+    evidence = make_index([[1, 0], [0, 1]], ["a.pdf", "b.pdf"])
+    index_path = tmp_path / "pqa_index"
+    write_index_files(index_path)
+    path = tmp_path / "snapshot.pqasnap"
+    header = write_snapshot(path, evidence, index_path, {})
+
+    data = bytearray(path.read_bytes())
+    data[header["sections"]["matrix"]["offset"]] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError, match="matrix"):
+        Snapshot(path).verify()
+
+    path.write_bytes(bytes(data[:-10]))
+    with pytest.raises(SnapshotError):
+        Snapshot(path)
+
+
+class Pickled(Doc):
+    """A document type snapshots do not know."""
+
+
+def test_unknown_document_type_is_not_a_valid_snapshot(tmp_path):
+    evidence = make_index([[1, 0]], ["a.pdf"])
+    doc = Pickled(docname="a", dockey="a", citation="a")
+    evidence.texts[0] = evidence.texts[0].model_copy(update={"doc": doc})
+    index_path = tmp_path / "pqa_index"
+    write_index_files(index_path)
+    write_snapshot(tmp_path / "snapshot.pqasnap", evidence, index_path, {})
+
+    with pytest.raises(SnapshotError, match="unknown document type 'Pickled'"):
+        Snapshot(tmp_path / "snapshot.pqasnap")
+
+
+def test_snapshots_load_only_from_allowed_sources(tmp_path):
+    allowed = ["https://primary:8002/api/paperqa/admin/snapshots", str(tmp_path / "snapshots")]
+    source = "https://primary:8002/api/paperqa/admin/snapshots/download?directory=papers"
+
+    assert snapshot_source_allowed(source, allowed)
+    assert snapshot_source_allowed(str(tmp_path / "snapshots" / "a.pqasnap"), allowed)
+    assert not snapshot_source_allowed(source, [])
+    for refused in (
+        "http://primary:8002/api/paperqa/admin/snapshots/download",
+        "https://primary:8002.example.com/api/paperqa/admin/snapshots/download",
+        "https://primary:8002/api/paperqa/admin/snapshots-other",
+        str(tmp_path / "snapshots" / ".." / "elsewhere.pqasnap"),
+        str(tmp_path / "snapshots-other" / "a.pqasnap"),
+    ):
+        assert not snapshot_source_allowed(refused, allowed), refused
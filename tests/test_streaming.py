@@ -0,0 +1,49 @@
+import asyncio
+
+from src.fast_aurelian.utils.streaming import EventStream, format_sse
+
+
+def test_event_stream_yields_events_then_result():
+    async def scenario():
+        stream = EventStream()
+
+        async def work():
+            stream.emit("token", {"text": "a"})
+            await asyncio.sleep(0)
+            stream.emit("token", {"text": "b"})
+            return "answer"
+
+        events = [event async for event in stream.run(work())]
+        return events, stream.result
+
+    events, result = asyncio.run(scenario())
+
+    assert events == [("token", {"text": "a"}), ("token", {"text": "b"})]
+    assert result == "answer"
+
+
+def test_event_stream_cancels_work_when_consumer_stops():
+    async def scenario():
+        stream = EventStream()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                while True:
+                    stream.emit("token", {"text": "x"})
+                    await asyncio.sleep(0.01)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        events = stream.run(work())
+        await anext(events)
+        await events.aclose()
+        return cancelled.is_set()
+
+    assert asyncio.run(scenario())
+
+
+def test_format_sse():
+    assert format_sse("token", {"text": "hi"}) == 'event: token\ndata: {"text": "hi"}\n\n'
+    assert format_sse("ping") == ": ping\n\n"
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.fast_aurelian.middleware.logging import logging_middleware
+from src.fast_aurelian.middleware.profiling import ProfilingMiddleware, find_profile
+from src.fast_aurelian.middleware.tracing import TracingMiddleware
+from src.fast_aurelian.utils.tracing import JsonFileExporter, SpanExporter, Tracer
+
+
+class MemoryExporter(SpanExporter):
+    def __init__(self):
+        self.batches = []
+
+    async def export(self, spans, _service_name):
+        self.batches.append(spans)
+
+
+def test_spans_nest_and_export_as_otlp_json(tmp_path):
+    tracer = Tracer(JsonFileExporter(tmp_path / "traces.jsonl"))
+
+    async def work():
+        with tracer.span("request") as root, tracer.span("child", directory="/papers"):
+            await asyncio.to_thread(lambda: None)
+            tracer.record("llm completion", 1, 2, model="stand-in")
+        await tracer.flush()
+        return root
+
+    root = asyncio.run(work())
+
+    [line] = (tmp_path / "traces.jsonl").read_text().splitlines()
+    spans = {
+        span["name"]: span
+        for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    }
+    assert {span["traceId"] for span in spans.values()} == {root.trace_id}
+    assert "parentSpanId" not in spans["request"]
+    assert spans["child"]["parentSpanId"] == spans["request"]["spanId"]
+    assert spans["llm completion"]["parentSpanId"] == spans["child"]["spanId"]
+    assert spans["child"]["attributes"] == [
+        {"key": "directory", "value": {"stringValue": "/papers"}}
+    ]
+
+
+def test_unsampled_traces_record_nothing():
+    exporter = MemoryExporter()
+    tracer = Tracer(exporter, sample_ratio=0.0)
+
+    async def work():
+        with tracer.span("request"), tracer.span("child"):
+            tracer.record("llm completion", 1, 2)
+        await tracer.flush()
+
+    asyncio.run(work())
+    assert exporter.batches == []
+
+
+def test_request_trace_is_named_by_correlation_id():
+    exporter = MemoryExporter()
+    tracer = Tracer(exporter)
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        with tracer.span("lookup"):
+            return {"id": item_id}
+
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    app.middleware("http")(logging_middleware)
+    client = TestClient(app)
+    response = client.get("/items/a")
+    asyncio.run(tracer.flush())
+
+    [spans] = exporter.batches
+    request_span = next(span for span in spans if span.parent_id is None)
+    assert request_span.name == "GET /items/{item_id}"
+    assert request_span.trace_id == uuid.UUID(response.headers["X-Correlation-ID"]).hex
+    assert request_span.attributes["http.response.status_code"] == 200
+    assert [span.name for span in spans if span.parent_id == request_span.span_id] == ["lookup"]
+
+
+def test_profiles_only_requests_with_the_token(tmp_path):
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"total": sum(range(1000))}
+
+    app.add_middleware(ProfilingMiddleware, directory=tmp_path, token="secret")
+    client = TestClient(app)
+
+    assert "X-Profile-ID" not in client.get("/work", headers={"X-Profile": "guess"}).headers
+    profile_id = client.get("/work?profile=secret").headers["X-Profile-ID"]
+    assert find_profile(tmp_path, profile_id) is not None
+    assert find_profile(tmp_path, "../secret") is None
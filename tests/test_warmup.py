@@ -0,0 +1,30 @@
+import asyncio
+
+from src.fast_aurelian.services.warmup import Warmup
+
+
+def test_warmup_reports_progress_and_failure():
+    async def load():
+        return {"indexed": True}
+
+    async def broken():
+        raise RuntimeError("no index")
+
+    warmup = Warmup([("load", load), ("index", broken), ("never", load)])
+    assert not warmup.ready and warmup.status == "pending"
+
+    asyncio.run(warmup.run())
+
+    report = warmup.report()
+    assert not report["ready"]
+    assert report["status"] == "failed"
+    assert report["error"] == "index: no index"
+    assert report["results"] == {"load": {"indexed": True}}
+    assert list(report["durations"]) == ["load"]
+
+
+def test_warmup_ready_after_all_steps():
+    warmup = Warmup([("noop", lambda: asyncio.sleep(0))])
+    asyncio.run(warmup.run())
+    assert warmup.ready
+    assert warmup.report()["current_step"] is None